@@ -0,0 +1,270 @@
+"""
+API JSON de lectura, versionada (`/api/v1/...`): timeline, explore, perfil y tweet.
+
+- Las filas salen de `.values()`: ni instancias de modelo ni plantillas. Cada
+  campo es una columna (o un JOIN) de la misma consulta; los likes usan el
+  contador desnormalizado `like_total`, como el feed HTML.
+- `?fields=id,content,user` limita los campos (`FIELDS`, `EXTRA_FIELDS`).
+  `images` y `liked` cuestan una consulta más por bloque de filas; solo se
+  hacen si se piden.
+- Paginación por cursor (keyset): `?after=` con el `next` de la respuesta
+  anterior y `?limit=` hasta `MAX_LIMIT`. Sin OFFSET, así cualquier página
+  cuesta lo mismo que la primera.
+- A partir de `STREAM_MIN` filas la respuesta sale en streaming, por bloques
+  de `CHUNK` filas, sin montar la lista entera en memoria.
+
+Solo tweets vivos: los archivados (core/archive.py) no salen en la API.
+"""
+import json
+from functools import wraps
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
+
+from .models import Comment, ExploreRank, Follow, Like, Tweet, TweetImage, UserProfile
+from .querybudget import query_budget
+from .threads import decode_cursor, encode_key
+from .views import _json_error
+
+# nombre en la API → columna de `.values()`
+FIELDS = {
+    'id': 'id',
+    'user': 'user__username',
+    'avatar': 'user__userprofile__avatar',
+    'content': 'content',
+    'mentions': 'mention_spans',
+    'created_at': 'created_at',
+    'likes': 'like_total',
+    'parent': 'parent_id',
+    'is_retweet': 'is_retweet',
+    'image': 'image',
+    'link': 'link_preview__url',
+}
+# Con una consulta aparte por bloque: imágenes de la galería y si el lector dio like.
+EXTRA_FIELDS = ('images', 'liked')
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 500
+STREAM_MIN = 100
+CHUNK = 100
+
+COMPACT = {'separators': (',', ':'), 'ensure_ascii': False}
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _dumps(obj):
+    return json.dumps(obj, **COMPACT)
+
+
+def _file_urls():
+    return {
+        'avatar': UserProfile._meta.get_field('avatar').storage.url,
+        'image': Tweet._meta.get_field('image').storage.url,
+        'images': TweetImage._meta.get_field('image').storage.url,
+    }
+
+
+def parse_fields(raw):
+    if not raw:
+        return [*FIELDS, *EXTRA_FIELDS]
+    fields = list(dict.fromkeys(f.strip() for f in raw.split(',') if f.strip()))
+    unknown = [f for f in fields if f not in FIELDS and f not in EXTRA_FIELDS]
+    if unknown:
+        raise ApiError(f"Campos desconocidos: {', '.join(unknown)}")
+    return fields
+
+
+def parse_limit(raw):
+    try:
+        return min(max(int(raw or DEFAULT_LIMIT), 1), MAX_LIMIT)
+    except ValueError:
+        raise ApiError('`limit` debe ser un número')
+
+
+# ------------------------------------------------------------- órdenes y cursores
+
+def by_date(qs, after):
+    """Más recientes primero; cursor `(created_at, id)` como en core/threads.py."""
+    if after:
+        key = decode_cursor(after)
+        if key is None:
+            raise ApiError('Cursor inválido')
+        created_at, pk = key
+        qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    return qs.order_by('-created_at', '-id'), ('created_at',), lambda row: encode_key(row['created_at'], row['id'])
+
+
+def by_rank(qs, after):
+    """Orden de `rank_explore`; cursor `r<posición>`."""
+    try:
+        rank = int(after[1:]) if after else 0
+    except ValueError:
+        raise ApiError('Cursor inválido')
+    qs = qs.filter(explore_rank__rank__gt=rank)
+    return qs.order_by('explore_rank__rank'), ('explore_rank__rank',), lambda row: f"r{row['explore_rank__rank']}"
+
+
+class Page:
+    """Filas de `qs` ya serializadas, por bloques; `next` queda fijado al agotarlas."""
+
+    def __init__(self, qs, fields, limit, viewer_id, cursor_of, cursor_columns):
+        self.fields = fields
+        self.limit = limit
+        self.viewer_id = viewer_id
+        self.cursor_of = cursor_of
+        self.base = [f for f in fields if f in FIELDS]
+        columns = dict.fromkeys(['id', *(FIELDS[f] for f in self.base), *cursor_columns])
+        self.rows = qs.values(*columns)[:limit + 1]
+        self.next = None
+
+    def chunks(self):
+        urls = _file_urls()
+        rows = self.rows.iterator(chunk_size=CHUNK)
+        emitted, last = 0, None
+        while chunk := list(islice(rows, CHUNK)):
+            if emitted + len(chunk) > self.limit:
+                chunk = chunk[:self.limit - emitted]
+                self.next = self.cursor_of(chunk[-1] if chunk else last)
+            if not chunk:
+                break
+            emitted += len(chunk)
+            last = chunk[-1]
+            yield self.serialize(chunk, urls)
+
+    def serialize(self, chunk, urls):
+        ids = [row['id'] for row in chunk]
+        images, liked = {}, set()
+        if 'images' in self.fields:
+            for tweet_id, name in TweetImage.objects.filter(tweet_id__in=ids).order_by('id').values_list('tweet_id', 'image'):
+                images.setdefault(tweet_id, []).append(urls['images'](name))
+        if 'liked' in self.fields:
+            liked = set(Like.objects.filter(user_id=self.viewer_id, tweet_id__in=ids).values_list('tweet_id', flat=True))
+
+        out = []
+        for row in chunk:
+            item = {}
+            for field in self.fields:
+                if field == 'images':
+                    item[field] = images.get(row['id'], [])
+                elif field == 'liked':
+                    item[field] = row['id'] in liked
+                else:
+                    value = row[FIELDS[field]]
+                    if field in urls:
+                        value = urls[field](value) if value else None
+                    elif field == 'created_at':
+                        value = value.isoformat()
+                    item[field] = value
+            out.append(item)
+        return out
+
+
+def respond(page, stream, **head):
+    if not stream:
+        data = [row for chunk in page.chunks() for row in chunk]
+        return JsonResponse({**head, 'data': data, 'next': page.next}, json_dumps_params=COMPACT)
+
+    def body():
+        yield _dumps(head)[:-1] + (',' if head else '') + '"data":['
+        sep = ''
+        for chunk in page.chunks():
+            yield sep + ','.join(map(_dumps, chunk))
+            sep = ','
+        yield '],"next":' + _dumps(page.next) + '}'
+
+    return StreamingHttpResponse(body(), content_type='application/json')
+
+
+def _page(request, qs, order):
+    fields = parse_fields(request.GET.get('fields'))
+    limit = parse_limit(request.GET.get('limit'))
+    qs, cursor_columns, cursor_of = order(qs, request.GET.get('after'))
+    return Page(qs, fields, limit, request.user.id, cursor_of, cursor_columns), limit >= STREAM_MIN
+
+
+def api_view(view):
+    """Solo GET, sesión obligatoria (401 en JSON) y `ApiError` → respuesta de error."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return _json_error('Método no permitido', 405, headers={'Allow': 'GET'})
+        if not request.user.is_authenticated:
+            return _json_error('Autenticación requerida', 401)
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as exc:
+            return _json_error(str(exc), exc.status)
+    return wrapper
+
+
+# ------------------------------------------------------------- vistas
+
+@query_budget(queries=6, time_ms=100)
+@api_view
+def timeline(request):
+    # Mismo filtro que el timeline HTML, con los seguidos como subconsulta.
+    following = Follow.objects.filter(follower=request.user).values('following_id')
+    qs = Tweet.objects.filter(Q(user=request.user) | Q(user_id__in=following))
+    return respond(*_page(request, qs, by_date))
+
+
+@query_budget(queries=7, time_ms=100)
+@api_view
+def explore(request):
+    after = request.GET.get('after') or ''
+    ranked = after.startswith('r') if after else ExploreRank.objects.exists()
+    # Ranking aún sin calcular: lo más reciente, como la página HTML.
+    page, stream = _page(request, Tweet.objects.all(), by_rank if ranked else by_date)
+    return respond(page, stream)
+
+
+@query_budget(queries=7, time_ms=100)
+@api_view
+def profile(request, username):
+    user = User.objects.filter(username=username).values('id', 'username', 'userprofile__bio', 'userprofile__avatar').first()
+    if user is None:
+        raise ApiError('No existe el usuario', 404)
+    avatar = user['userprofile__avatar']
+    page, stream = _page(request, Tweet.objects.filter(user_id=user['id']), by_date)
+    return respond(page, stream, user={
+        'username': user['username'],
+        'bio': user['userprofile__bio'] or '',
+        'avatar': _file_urls()['avatar'](avatar) if avatar else None,
+    })
+
+
+@query_budget(queries=7, time_ms=100)
+@api_view
+def tweet(request, pk):
+    """El tweet y sus respuestas, de la más antigua a la más reciente (cursor como en el HTML)."""
+    fields = parse_fields(request.GET.get('fields'))
+    page = Page(Tweet.objects.filter(pk=pk), fields, 1, request.user.id, None, ())
+    rows = [row for chunk in page.chunks() for row in chunk]
+    if not rows:
+        raise ApiError('No existe la publicación', 404)
+
+    limit = parse_limit(request.GET.get('limit'))
+    replies = Comment.objects.filter(tweet_id=pk).order_by('created_at', 'id')
+    after = request.GET.get('after')
+    if after:
+        key = decode_cursor(after)
+        if key is None:
+            raise ApiError('Cursor inválido')
+        replies = replies.filter(Q(created_at__gt=key[0]) | Q(created_at=key[0], id__gt=key[1]))
+    replies = list(replies.values('id', 'user__username', 'content', 'created_at')[:limit + 1])
+    next_cursor = encode_key(replies[limit - 1]['created_at'], replies[limit - 1]['id']) if len(replies) > limit else None
+    return JsonResponse({
+        'data': rows[0],
+        'replies': [
+            {'id': r['id'], 'user': r['user__username'], 'content': r['content'], 'created_at': r['created_at'].isoformat()}
+            for r in replies[:limit]
+        ],
+        'next': next_cursor,
+    }, json_dumps_params=COMPACT)
@@ -4,4 +4,9 @@ class CoreConfig(AppConfig):
     name = 'core'
 
     def ready(self):
+        from django.db.backends.signals import connection_created
+
         from . import signals  # noqa
+        from .db import apply_sqlite_pragmas
+
+        connection_created.connect(apply_sqlite_pragmas, dispatch_uid="core.sqlite_pragmas")
@@ -0,0 +1,177 @@
+"""
+Archivo de filas antiguas (`manage.py archive`).
+
+Casi todas las lecturas tocan los últimos días, pero los índices y el VACUUM
+de `Tweet`, `Like` y `Notification` crecen con todo el historial. Este módulo
+mueve lo viejo a tablas de archivo (`ArchivedTweet`, `ArchivedLike`,
+`ArchivedNotification`) y borra las notificaciones leídas pasada la retención.
+
+Un tweet solo se archiva si está "frío": es anterior al corte, no tuvo
+actividad después (likes, comentarios, respuestas, notificaciones) y todas sus
+respuestas/retweets también se archivan. Sus likes, comentarios e imágenes se
+van con él: las claves foráneas de las tablas vivas no pueden apuntar al archivo.
+
+Todo se decide en SQL, sin cargar la tabla en memoria: el recuento sale de un
+CTE recursivo (`blocked_ids`) y el archivo avanza por rangos de ids (`_leaves`).
+"""
+from django.db import transaction
+from django.db.models import Count, Exists, Max, Min, OuterRef
+from django.db.models.expressions import RawSQL
+
+from .models import (
+    ArchivedLike,
+    ArchivedNotification,
+    ArchivedTweet,
+    Comment,
+    ExploreRank,
+    Like,
+    Mention,
+    Notification,
+    Tweet,
+    TweetImage,
+)
+
+
+BLOCKED_SQL = """
+WITH RECURSIVE blocked(id) AS (
+  SELECT parent_id FROM {tweet} WHERE created_at >= %s AND parent_id IS NOT NULL
+  UNION SELECT tweet_id FROM {like} WHERE created_at >= %s
+  UNION SELECT tweet_id FROM {comment} WHERE created_at >= %s
+  UNION SELECT tweet_id FROM {notification} WHERE created_at >= %s AND tweet_id IS NOT NULL
+  UNION
+  SELECT t.parent_id FROM {tweet} t JOIN blocked b ON t.id = b.id WHERE t.parent_id IS NOT NULL
+)
+SELECT id FROM blocked
+"""
+
+
+def _recent(model, cutoff):
+    return model.objects.filter(tweet_id=OuterRef('pk'), created_at__gte=cutoff)
+
+
+def blocked_ids(cutoff):
+    """
+    Subconsulta con los tweets que no pueden irse: los que tienen actividad desde
+    `cutoff` (likes, comentarios, notificaciones, respuestas nuevas) y, subiendo
+    por `parent` con un CTE recursivo, todos sus antecesores.
+    """
+    sql = BLOCKED_SQL.format(
+        tweet=Tweet._meta.db_table, like=Like._meta.db_table,
+        comment=Comment._meta.db_table, notification=Notification._meta.db_table,
+    )
+    return RawSQL(sql, (cutoff,) * 4)
+
+
+def count_archivable(cutoff):
+    """Cuántos tweets anteriores a `cutoff` se archivarían (ver docstring del módulo)."""
+    return Tweet.objects.filter(created_at__lt=cutoff).exclude(id__in=blocked_ids(cutoff)).count()
+
+
+def _leaves(cutoff, low, high, limit):
+    """
+    Tweets fríos del rango `[low, high)` sin hijos vivos. Un hijo siempre tiene
+    id mayor que su padre: recorriendo los rangos de arriba abajo, cuando llega
+    el turno del padre sus hijos archivables ya se fueron.
+    """
+    return list(
+        Tweet.objects.filter(created_at__lt=cutoff, id__gte=low, id__lt=high)
+        .exclude(Exists(_recent(Like, cutoff)))
+        .exclude(Exists(_recent(Comment, cutoff)))
+        .exclude(Exists(_recent(Notification, cutoff)))
+        .exclude(Exists(Tweet.objects.filter(parent_id=OuterRef('pk'))))
+        .order_by('-id').values_list('id', flat=True)[:limit]
+    )
+
+
+def _archive_batch(ids):
+    tweets = list(
+        Tweet.objects.filter(id__in=ids).annotate(n_likes=Count('likes')).order_by()
+    )
+    images, comments = {}, {}
+    for tweet_id, path in TweetImage.objects.filter(tweet_id__in=ids).values_list('tweet_id', 'image'):
+        images.setdefault(tweet_id, []).append(path)
+    for c in Comment.objects.filter(tweet_id__in=ids).order_by('created_at'):
+        comments.setdefault(c.tweet_id, []).append(
+            {'user_id': c.user_id, 'content': c.content, 'created_at': c.created_at.isoformat()}
+        )
+
+    ArchivedTweet.objects.bulk_create(
+        [
+            ArchivedTweet(
+                id=t.id, user_id=t.user_id, parent_id=t.parent_id, is_retweet=t.is_retweet,
+                content=t.content, image=t.image.name or None, images=images.get(t.id, []),
+                image_width=t.image_width, image_height=t.image_height, image_color=t.image_color,
+                mention_spans=t.mention_spans,
+                comments=comments.get(t.id, []), link_preview_id=t.link_preview_id,
+                like_count=t.n_likes, created_at=t.created_at,
+            )
+            for t in tweets
+        ],
+        ignore_conflicts=True,
+    )
+    ArchivedLike.objects.bulk_create(
+        [
+            ArchivedLike(user_id=u, tweet_id=t, created_at=c)
+            for u, t, c in Like.objects.filter(tweet_id__in=ids).values_list('user_id', 'tweet_id', 'created_at')
+        ],
+        ignore_conflicts=True,
+    )
+
+    # Borrado directo: sin señales ni colector (todo lo dependiente ya está copiado;
+    # las menciones no se archivan, el texto conserva `mention_spans`).
+    for model in (ExploreRank, Mention, Like, Comment, TweetImage):
+        qs = model.objects.filter(tweet_id__in=ids)
+        qs._raw_delete(qs.db)
+    qs = Tweet.objects.filter(id__in=ids)
+    qs._raw_delete(qs.db)
+    return len(tweets)
+
+
+def archive_tweets(cutoff, batch_size=500):
+    """
+    Mueve al archivo los tweets fríos anteriores a `cutoff` (y sus likes), por
+    rangos de `batch_size` ids de mayor a menor. Un lote por transacción.
+    """
+    bounds = Tweet.objects.filter(created_at__lt=cutoff).aggregate(low=Min('id'), high=Max('id'))
+    if bounds['low'] is None:
+        return 0
+    moved, high = 0, bounds['high'] + 1
+    while high > bounds['low']:
+        low = max(high - batch_size, bounds['low'])
+        # Dentro del rango, cada pasada libera a los padres de la anterior.
+        while ids := _leaves(cutoff, low, high, batch_size):
+            with transaction.atomic():
+                moved += _archive_batch(ids)
+        high = low
+    return moved
+
+
+def archive_notifications(cutoff, batch_size=500):
+    """Mueve las notificaciones anteriores a `cutoff` a `ArchivedNotification`."""
+    moved = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                Notification.objects.filter(created_at__lt=cutoff).order_by('id')
+                .values_list('id', 'actor_id', 'recipient_id', 'verb', 'tweet_id', 'created_at', 'read')[:batch_size]
+            )
+            if not rows:
+                return moved
+            ArchivedNotification.objects.bulk_create([
+                ArchivedNotification(
+                    actor_id=a, recipient_id=r, verb=v, tweet_id=t, created_at=c, read=read,
+                )
+                for _, a, r, v, t, c, read in rows
+            ])
+            qs = Notification.objects.filter(id__in=[row[0] for row in rows])
+            qs._raw_delete(qs.db)
+        moved += len(rows)
+
+
+def purge_read_notifications(cutoff):
+    """Retención: borra las notificaciones leídas anteriores a `cutoff` (vivas y archivadas)."""
+    deleted = 0
+    for model in (Notification, ArchivedNotification):
+        qs = model.objects.filter(read=True, created_at__lt=cutoff)
+        deleted += qs._raw_delete(qs.db)
+    return deleted
@@ -0,0 +1,164 @@
+"""
+Vistas de lectura async para ASGI (`ASYNC_VIEWS`, activo por defecto en twittor/asgi.py).
+
+Mismas URLs, plantillas y presupuestos de consultas que sus equivalentes de
+core/views.py, pero con el ORM async: la petición no ocupa un hilo del servidor
+mientras espera. Las consultas independientes (perfil, seguimiento y tweets en
+`profile`; tweets y usuarios en `search`) se lanzan a la vez con `asyncio.gather`.
+
+Django ejecuta cada consulta async en el hilo `thread_sensitive` de la petición,
+así que con SQLite se solapan la espera y el trabajo en Python, no las
+consultas entre sí.
+
+Las plantillas se pintan en el bucle de eventos: todo lo que usan llega ya
+cargado (`select_related`, `prefetch_related` y listas evaluadas). Las
+escrituras (POST de timeline y profile) siguen en la vista síncrona.
+"""
+import asyncio
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.models import User
+from django.shortcuts import aget_object_or_404, render
+
+from . import views
+from .conditional import conditional, profile_state, timeline_state
+from .explore import after_rank as explore_after_rank
+from .forms import ProfileForm, TweetForm, TweetImageFormSet
+from .models import ArchivedTweet, Follow, Notification, Tweet, TweetImage, UserProfile
+from .querybudget import query_budget
+
+
+async def _viewer(request):
+    """Usuario de la petición, resuelto sin bloquear (la plantilla usa `request.user`)."""
+    request.user = await request.auser()
+    return request.user
+
+
+async def _list(qs):
+    return [obj async for obj in qs]
+
+
+async def _empty():
+    return {}
+
+
+def writes_with(sync_view):
+    """Los métodos que escriben van a `sync_view` (en un hilo, con sus decoradores)."""
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return await sync_to_async(sync_view)(request, *args, **kwargs)
+            return await view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _composer():
+    return {
+        'form': TweetForm(),
+        'formset': TweetImageFormSet(queryset=TweetImage.objects.none(), prefix='form'),
+    }
+
+
+@writes_with(views.timeline)
+@query_budget(queries=7, time_ms=250)
+@login_required
+@conditional(timeline_state)
+async def timeline(request):
+    user = await _viewer(request)
+    following_ids = await _list(
+        Follow.objects.filter(follower=user).values_list('following_id', flat=True)
+    )
+    rows = await _list(views._timeline_rows([user.id, *following_ids], request.GET.get('after')))
+    return render(request, 'core/timeline.html', {**views._timeline_page(rows), **_composer()})
+
+
+@query_budget(queries=5, time_ms=250)
+@login_required
+async def explore(request):
+    await _viewer(request)
+    after = explore_after_rank(request.GET.get('after'))
+    page = views._explore_page(await _list(views._explore_ranked(after)))
+    if not page['tweets'] and not after:
+        page = {'tweets': await _list(views._explore_latest()), 'next_cursor': None}
+    return render(request, 'core/timeline.html', {
+        **page,
+        **_composer(),
+    })
+
+
+@writes_with(views.profile)
+@query_budget(queries=9, time_ms=150)
+@login_required
+@conditional(profile_state)
+async def profile(request, username):
+    viewer = await _viewer(request)
+    user = await aget_object_or_404(User, username=username)
+    profile, is_following, keys = await asyncio.gather(
+        aget_object_or_404(UserProfile, user=user),
+        Follow.objects.filter(follower=viewer, following=user).aexists(),
+        _list(views._profile_keys(user, request.GET.get('after'))),
+    )
+    live_ids, archived_ids = views._profile_ids(keys, False), views._profile_ids(keys, True)
+    live, archived = await asyncio.gather(
+        Tweet.objects.select_related('user').ain_bulk(live_ids) if live_ids else _empty(),
+        ArchivedTweet.objects.select_related('user').ain_bulk(archived_ids) if archived_ids else _empty(),
+    )
+    tweets, next_cursor = views._profile_page(keys, live, archived)
+    is_me = viewer == user
+    return render(request, 'core/profile.html', {
+        'profile_user': user,
+        'profile': profile,
+        'is_me': is_me,
+        'is_following': is_following,
+        'tweets': tweets,
+        'next_cursor': next_cursor,
+        'form': ProfileForm(instance=profile) if is_me else None,
+    })
+
+
+@query_budget(queries=5, time_ms=250)
+@login_required
+async def search(request):
+    await _viewer(request)
+    q = request.GET.get('q', '').strip()
+    tweets, users = [], []
+    if q:
+        tweets_qs, users_qs = views._search_querysets(q)
+        tweets, users = await asyncio.gather(_list(tweets_qs), _list(users_qs))
+    return render(request, 'core/search.html', {'q': q, 'tweets': tweets, 'users': users})
+
+
+@query_budget(queries=4, time_ms=250)
+@login_required
+async def tag(request, tag):
+    await _viewer(request)
+    tweets = await _list(views._tag_queryset(tag))
+    return render(request, 'core/tag.html', {'tag': tag, 'tweets': tweets})
+
+
+@query_budget(queries=5, time_ms=100)
+@login_required
+async def notifications(request):
+    user = await _viewer(request)
+    notifs = await _list(
+        Notification.objects.filter(recipient=user)
+        .select_related('actor', 'actor__userprofile', 'tweet')
+        .order_by('-created_at')[:50]
+    )
+    await Notification.objects.filter(recipient=user, read=False).aupdate(read=True)
+    return render(request, 'core/notifications.html', {'notifs': notifs})
+
+
+@query_budget(queries=4, time_ms=150)
+@login_required
+async def trending_links(request):
+    """
+    Muestra los dominios más compartidos en los últimos 24 h.
+    """
+    await _viewer(request)
+    urls = await _list(views._recent_link_urls())
+    return render(request, 'core/trending.html', views._trending_context(urls))
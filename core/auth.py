@@ -0,0 +1,78 @@
+"""
+Usuario de la petición sin consultas: sesión y usuario (con su perfil) en caché.
+
+`CachedAuthenticationMiddleware` (core/middleware.py) sustituye al
+`AuthenticationMiddleware` de Django:
+
+- La sesión usa `core.sessions` (caché + escritura en la base de datos).
+- `get_user` / `aget_user` buscan `(hash de sesión, usuario)` en la caché. El
+  usuario se guarda con su `userprofile` ya cargado, así que tampoco consulta
+  la plantilla que lo use. Solo vale si el hash de la sesión coincide con el
+  guardado: una sesión anterior a un cambio de contraseña no lo aprovecha.
+- Si no está, Django carga y verifica el usuario como siempre y se guarda
+  `AUTH_USER_CACHE_SECONDS`.
+- `invalidate(user_id)` borra la entrada. core/signals.py la llama al guardar
+  `User` (contraseña, datos) o `UserProfile` (edición del perfil).
+
+Con la caché local de cada proceso (por defecto), los demás workers pueden
+servir el usuario anterior durante ese TTL; con una caché compartida
+(`TWITTOR_REDIS_URL`) la invalidación llega a todos a la vez.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import auth
+from django.core.cache import caches
+from django.db.models import prefetch_related_objects
+from django.utils.crypto import constant_time_compare
+
+
+def _cache():
+    return caches[getattr(settings, 'AUTH_USER_CACHE_ALIAS', 'default')]
+
+
+def _key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def _ttl():
+    return getattr(settings, 'AUTH_USER_CACHE_SECONDS', 60)
+
+
+def _hit(entry, session_hash):
+    if entry and session_hash and constant_time_compare(entry[0], session_hash):
+        return entry[1]
+    return None
+
+
+def get_user(request):
+    session = request.session
+    user_id = session.get(auth.SESSION_KEY)
+    if user_id is None or not _ttl():
+        return auth.get_user(request)
+    user = _hit(_cache().get(_key(user_id)), session.get(auth.HASH_SESSION_KEY))
+    if user is not None:
+        return user
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        prefetch_related_objects([user], 'userprofile')
+        _cache().set(_key(user.pk), (session[auth.HASH_SESSION_KEY], user), _ttl())
+    return user
+
+
+async def aget_user(request):
+    session = request.session
+    user_id = await session.aget(auth.SESSION_KEY)
+    if user_id is None or not _ttl():
+        return await auth.aget_user(request)
+    user = _hit(await _cache().aget(_key(user_id)), await session.aget(auth.HASH_SESSION_KEY))
+    if user is not None:
+        return user
+    user = await auth.aget_user(request)
+    if user.is_authenticated:
+        await sync_to_async(prefetch_related_objects)([user], 'userprofile')
+        await _cache().aset(_key(user.pk), (await session.aget(auth.HASH_SESSION_KEY), user), _ttl())
+    return user
+
+
+def invalidate(user_id):
+    _cache().delete(_key(user_id))
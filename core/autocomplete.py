@@ -0,0 +1,155 @@
+"""
+Autocompletado de `@usuarios` y `#hashtags` en memoria (`/api/autocomplete/`).
+
+Cada proceso mantiene dos índices de prefijos (`PrefixIndex`): una lista ordenada
+de claves en minúsculas (búsqueda binaria del rango que empieza por el prefijo) y
+un dict clave → (texto, puntuación). Los usuarios puntúan por seguidores y los
+hashtags por usos en los últimos `AUTOCOMPLETE_TAG_DAYS` días.
+
+- Se construye en la primera consulta (dos SELECT) y se reconstruye cada
+  `AUTOCOMPLETE_REFRESH_SECONDS` para recoger lo escrito por otros procesos.
+- Entre medias se actualiza en caliente con señales: altas de usuario, tweets
+  nuevos (sus hashtags) y follow/unfollow.
+- El top-k de cada prefijo se cachea; una actualización solo invalida los
+  prefijos de la clave que cambia.
+"""
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Tweet
+from .templatetags.extras import HASHTAG_RE
+
+MAX_RESULTS = 10
+SENTINEL = '\U0010ffff'  # mayor que cualquier carácter: fin del rango de un prefijo
+
+
+class PrefixIndex:
+    def __init__(self, entries=()):
+        """`entries`: iterable de (texto, puntuación)."""
+        self._entries = {}
+        for text, score in entries:
+            key = text.lower()
+            if key not in self._entries or score > self._entries[key][1]:
+                self._entries[key] = (text, score)
+        self._keys = sorted(self._entries)
+        self._top = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def search(self, prefix, limit=MAX_RESULTS):
+        """[(texto, puntuación)] de las claves que empiezan por `prefix`, mejores primero."""
+        prefix = prefix.lower()
+        cached = self._top.get(prefix)
+        if cached is not None and len(cached) >= limit:
+            return cached[:limit]
+        keys = self._keys
+        lo = bisect_left(keys, prefix)
+        hi = bisect_left(keys, prefix + SENTINEL, lo)
+        entries = self._entries
+        top = heapq.nlargest(
+            MAX_RESULTS, (entries[k] for k in keys[lo:hi]), key=lambda e: (e[1], -len(e[0])),
+        )
+        self._top[prefix] = top
+        return top[:limit]
+
+    def add(self, text, delta=0):
+        """Alta de `text` o suma `delta` a su puntuación."""
+        key = text.lower()
+        with self._lock:
+            current = self._entries.get(key)
+            if current is None:
+                self._entries[key] = (text, max(delta, 0))  # antes que la clave: los lectores no ven huecos
+                insort(self._keys, key)
+            elif delta:
+                self._entries[key] = (text, max(current[1] + delta, 0))
+            else:
+                return
+            for i in range(len(key) + 1):
+                self._top.pop(key[:i], None)
+
+
+# ------------------------------------------------------------- índices del proceso
+
+_lock = threading.Lock()
+_state = {'users': None, 'tags': None, 'usernames': {}, 'built': 0.0}
+
+
+def build_users():
+    """(índice, {id: username}): el dict traduce los `following_id` de Follow sin consultar."""
+    rows = list(
+        User.objects.filter(is_active=True).annotate(n=Count('followers')).values_list('id', 'username', 'n')
+    )
+    return PrefixIndex((name, n) for _, name, n in rows), {pk: name for pk, name, _ in rows}
+
+
+def build_tags():
+    since = timezone.now() - timedelta(days=getattr(settings, 'AUTOCOMPLETE_TAG_DAYS', 7))
+    counts = {}
+    contents = (
+        Tweet.objects.filter(created_at__gte=since, is_retweet=False, content__contains='#')
+        .values_list('content', flat=True)
+    )
+    for content in contents.iterator(chunk_size=5000):
+        for m in HASHTAG_RE.finditer(content):
+            tag = m.group('tag')[1:]
+            counts[tag] = counts.get(tag, 0) + 1
+    return PrefixIndex(counts.items())
+
+
+def indexes():
+    """(usuarios, hashtags), reconstruidos si han caducado."""
+    ttl = getattr(settings, 'AUTOCOMPLETE_REFRESH_SECONDS', 300)
+    if _state['users'] is None or time.monotonic() - _state['built'] > ttl:
+        with _lock:
+            if _state['users'] is None or time.monotonic() - _state['built'] > ttl:
+                users, usernames = build_users()
+                _state.update(users=users, tags=build_tags(), usernames=usernames, built=time.monotonic())
+    return _state['users'], _state['tags']
+
+
+def reset():
+    with _lock:
+        _state.update(users=None, tags=None, usernames={}, built=0.0)
+
+
+def suggest(query, limit=MAX_RESULTS):
+    """Sugerencias para `@pre` (usuarios), `#pre` (hashtags) o `pre` (ambos)."""
+    users, tags = indexes()
+    if query.startswith('@'):
+        return [{'type': 'user', 'value': u, 'score': n} for u, n in users.search(query[1:], limit)]
+    if query.startswith('#'):
+        return [{'type': 'tag', 'value': t, 'score': n} for t, n in tags.search(query[1:], limit)]
+    return (
+        [{'type': 'user', 'value': u, 'score': n} for u, n in users.search(query, limit)]
+        + [{'type': 'tag', 'value': t, 'score': n} for t, n in tags.search(query, limit)]
+    )[:limit]
+
+
+# ------------------------------------------------------------- actualización en caliente
+
+def on_user_created(user_id, username):
+    if _state['users'] is not None:
+        _state['usernames'][user_id] = username
+        _state['users'].add(username)
+
+
+def on_tweet_created(content):
+    if _state['tags'] is not None:
+        for m in HASHTAG_RE.finditer(content or ''):
+            _state['tags'].add(m.group('tag')[1:], 1)
+
+
+def on_follow(user_id, delta):
+    username = _state['usernames'].get(user_id)
+    if _state['users'] is not None and username is not None:
+        _state['users'].add(username, delta)
@@ -0,0 +1,564 @@
+"""
+Benchmarks de extremo a extremo para las vistas calientes.
+
+Siembra datasets a varias escalas con `seed --shape realistic`, recorre las
+vistas con el cliente de pruebas de Django y registra percentiles de
+latencia, número de consultas y pico de memoria por vista. Los resultados
+se comparan contra un JSON de referencia (`benchmarks/baseline.json`):
+una regresión hace fallar la ejecución.
+
+Se usa desde `python manage.py bench` o desde pytest (`core/tests/test_bench.py`).
+"""
+import json
+import statistics
+import time
+import tracemalloc
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+BASELINE_PATH = Path(settings.BASE_DIR) / "benchmarks" / "baseline.json"
+
+SCALES = {
+    "small": {"users": 60, "tweets": 600},
+    "medium": {"users": 400, "tweets": 8000},
+    "large": {"users": 3000, "tweets": 100000},
+}
+
+# Holgura por defecto sobre la referencia: latencia y memoria dependen de la máquina,
+# el número de consultas no (dataset determinista), así que no tiene holgura.
+DEFAULT_TOLERANCE = 0.25
+# La latencia se compara por la mediana (el p95 de pocas iteraciones es casi el máximo
+# y salta con cualquier pausa del sistema), con un margen absoluto para las vistas de
+# pocos milisegundos.
+LATENCY_KEY = "p50_ms"
+LATENCY_SLACK_MS = 1.0
+# Cada vista se mide en varias rondas y se queda la de menor mediana: el ruido de la
+# máquina solo suma latencia, una regresión real aparece en todas las rondas.
+DEFAULT_RUNS = 3
+
+
+def seed_scale(scale, seed=42):
+    """Puebla la base de datos actual con la escala indicada (datos deterministas)."""
+    params = SCALES[scale]
+    call_command(
+        "seed", fresh=True, avatars=False, shape="realistic", seed=seed,
+        users=params["users"], tweets=params["tweets"], stdout=StringIO(),
+    )
+
+
+def pick_context():
+    """Elige espectador, perfil, tweet y etiqueta representativos del dataset."""
+    from django.contrib.auth.models import User
+    from core.models import Tweet
+
+    viewer = (
+        User.objects.filter(is_superuser=False)
+        .annotate(n=Count("following"))
+        .order_by("-n", "id")
+        .first()
+    )
+    celebrity = (
+        User.objects.annotate(n=Count("followers")).order_by("-n", "id").first()
+    )
+    tweet = (
+        Tweet.objects.filter(parent__isnull=True)
+        .annotate(n=Count("likes"))
+        .order_by("-n", "id")
+        .first()
+    )
+    return {"viewer": viewer, "celebrity": celebrity, "tweet": tweet, "tag": "Django", "q": "IA"}
+
+
+def scenarios(ctx):
+    """(nombre, método, url) de cada vista medida."""
+    return [
+        ("timeline", "get", reverse("timeline")),
+        ("explore", "get", reverse("explore")),
+        ("profile", "get", reverse("profile", args=[ctx["celebrity"].username])),
+        ("search", "get", reverse("search") + f"?q={ctx['q']}"),
+        ("tag", "get", reverse("tag", args=[ctx["tag"]])),
+        ("notifications", "get", reverse("notifications")),
+        ("like_toggle", "post", reverse("like_toggle", args=[ctx["tweet"].pk])),
+        ("trending_links", "get", reverse("trending_links")),
+    ]
+
+
+def percentile(values, p):
+    """Percentil por interpolación lineal (values no vacío)."""
+    data = sorted(values)
+    k = (len(data) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(data) - 1)
+    return data[lo] + (data[hi] - data[lo]) * (k - lo)
+
+
+def measure(client, method, url, iterations=20, warmup=3):
+    """Latencias (ms), consultas y pico de memoria (KiB) de una vista."""
+    call = getattr(client, method)
+    for _ in range(warmup):
+        call(url)
+
+    timings = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        resp = call(url)
+        timings.append((time.perf_counter() - t0) * 1000)
+    if resp.status_code >= 400:
+        raise RuntimeError(f"{url} respondió {resp.status_code}")
+
+    # Consultas y memoria en una pasada aparte: tracemalloc distorsiona la latencia.
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            call(url)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "p99_ms": round(percentile(timings, 99), 2),
+        "mean_ms": round(statistics.fmean(timings), 2),
+        "queries": len(queries.captured_queries),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run_scale(scale, iterations=20, warmup=3, seed=42, only=None, runs=DEFAULT_RUNS):
+    """Siembra `scale` y mide cada vista. Devuelve {vista: métricas}.
+
+    Con `runs` > 1 se queda, por vista, la ronda de menor mediana.
+    """
+    seed_scale(scale, seed=seed)
+    ctx = pick_context()
+    client = Client()
+    client.force_login(ctx["viewer"])
+    results = {}
+    # Se mide la vista, no el limitador: con 20 iteraciones búsqueda y tags darían 429.
+    with override_settings(RATE_LIMIT_ENABLED=False):
+        for name, method, url in scenarios(ctx):
+            if only and name not in only:
+                continue
+            rounds = [
+                measure(client, method, url, iterations=iterations, warmup=warmup)
+                for _ in range(max(runs, 1))
+            ]
+            results[name] = min(rounds, key=lambda m: m[LATENCY_KEY])
+    return results
+
+
+def load_baseline(path=BASELINE_PATH):
+    path = Path(path)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    """Fusiona `results` ({escala: {vista: métricas}}) en el JSON de referencia."""
+    path = Path(path)
+    data = load_baseline(path)
+    for scale, views in results.items():
+        data.setdefault(scale, {}).update(views)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Lista de regresiones (texto) de `results` frente a `baseline`.
+
+    - consultas: cualquier aumento es regresión;
+    - mediana y pico de memoria: regresión si superan la referencia × (1 + tolerance)
+      (la mediana, además, más `LATENCY_SLACK_MS`).
+    """
+    problems = []
+    for scale, views in results.items():
+        for view, got in views.items():
+            ref = baseline.get(scale, {}).get(view)
+            if not ref:
+                continue
+            if got["queries"] > ref["queries"]:
+                problems.append(f"{scale}/{view}: {got['queries']} consultas (referencia {ref['queries']})")
+            for key, slack in ((LATENCY_KEY, LATENCY_SLACK_MS), ("peak_kib", 0)):
+                limit = ref[key] * (1 + tolerance) + slack
+                if got[key] > limit:
+                    problems.append(f"{scale}/{view}: {key}={got[key]} > {limit:.1f} (referencia {ref[key]})")
+    return problems
+
+
+def format_table(results):
+    lines = [f"{'escala/vista':32} {'p50':>8} {'p95':>8} {'p99':>8} {'consultas':>10} {'pico KiB':>10}"]
+    for scale, views in results.items():
+        for view, m in views.items():
+            lines.append(
+                f"{scale + '/' + view:32} {m['p50_ms']:8.2f} {m['p95_ms']:8.2f} {m['p99_ms']:8.2f} "
+                f"{m['queries']:10d} {m['peak_kib']:10.1f}"
+            )
+    return "\n".join(lines)
+
+
+# ------------------------------------------------------ concurrencia de SQLite
+
+def _sqlite_worker(job):
+    """Proceso hijo (arranque `spawn`): simula un worker web con varios hilos.
+
+    Cada operación lee un tweet y da/quita like con su notificación, por el
+    mismo camino que `like_toggle` (`run_write` + `_toggle_like`). La base de
+    datos y el perfil llegan por el entorno heredado (`TWITTOR_DB_*`).
+    """
+    import random
+    import threading
+
+    threads, ops, user_ids, tweets, seed = job
+    import django
+    django.setup()
+    from django.db import OperationalError, connection as conn
+    from core.models import Notification, Tweet
+    from core.views import _toggle_like
+    from core.writequeue import get_write_queue, run_write
+
+    latencies, errors = [], []
+
+    def loop(n, rng):
+        for _ in range(n):
+            uid = rng.choice(user_ids)
+            tid, author = rng.choice(tweets)
+            t0 = time.perf_counter()
+            try:
+                Tweet.objects.filter(pk=tid).values("id", "content").first()
+                if run_write(_toggle_like, uid, tid) and uid != author:
+                    run_write(
+                        Notification.objects.create,
+                        actor_id=uid, recipient_id=author, verb="le gustó tu publicación", tweet_id=tid,
+                        wait=False,
+                    )
+            except OperationalError as exc:
+                errors.append(str(exc))
+            latencies.append((time.perf_counter() - t0) * 1000)
+        conn.close()
+
+    workers = [
+        threading.Thread(target=loop, args=(ops, random.Random(seed * 1000 + i)))
+        for i in range(threads)
+    ]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    q = get_write_queue()
+    if q is not None:
+        q.stop()
+    return {"elapsed": time.perf_counter() - start, "latencies": latencies, "errors": errors}
+
+
+def sqlite_concurrency(profiles=("dev", "production"), processes=4, threads=4, ops=200, users=50, tweets=300):
+    """Compara perfiles de SQLite con `processes`×`threads` escritores concurrentes.
+
+    Prepara una base de datos temporal (migrate + seed) y la copia para cada
+    perfil, de modo que todos parten del mismo estado. Devuelve {perfil: métricas}.
+    """
+    import multiprocessing
+    import os
+    import shutil
+    import sqlite3
+    import subprocess
+    import sys
+    import tempfile
+
+    manage = Path(settings.BASE_DIR) / "manage.py"
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="twittor-sqlite-") as tmp:
+        template = Path(tmp) / "template.sqlite3"
+        env = {**os.environ, "TWITTOR_DB_NAME": str(template), "TWITTOR_DB_PROFILE": "dev"}
+        subprocess.run([sys.executable, str(manage), "migrate", "-v0"], env=env, check=True)
+        subprocess.run(
+            [sys.executable, str(manage), "seed", "--users", str(users), "--tweets", str(tweets), "--no-avatars"],
+            env=env, check=True, stdout=subprocess.DEVNULL,
+        )
+        with sqlite3.connect(template) as db:
+            user_ids = [r[0] for r in db.execute("SELECT id FROM auth_user")]
+            tweet_rows = list(db.execute("SELECT id, user_id FROM core_tweet"))
+
+        ctx = multiprocessing.get_context("spawn")
+        for profile in profiles:
+            db_name = str(Path(tmp) / f"{profile}.sqlite3")
+            shutil.copy(template, db_name)
+            jobs = [(threads, ops, user_ids, tweet_rows, i + 1) for i in range(processes)]
+            # Los hijos leen los settings al desempaquetar la tarea (importan este
+            # módulo), así que la base de datos tiene que ir ya en su entorno.
+            saved = {k: os.environ.get(k) for k in ("TWITTOR_DB_NAME", "TWITTOR_DB_PROFILE")}
+            os.environ.update(TWITTOR_DB_NAME=db_name, TWITTOR_DB_PROFILE=profile)
+            try:
+                start = time.perf_counter()
+                with ctx.Pool(processes) as pool:
+                    parts = pool.map(_sqlite_worker, jobs)
+            finally:
+                for k, v in saved.items():
+                    if v is None:
+                        os.environ.pop(k, None)
+                    else:
+                        os.environ[k] = v
+            wall = time.perf_counter() - start
+            latencies = [x for p in parts for x in p["latencies"]]
+            errors = [e for p in parts for e in p["errors"]]
+            busy = max(p["elapsed"] for p in parts)
+            results[profile] = {
+                "operations": len(latencies),
+                "errors": len(errors),
+                "error_samples": sorted(set(errors))[:3],
+                "ops_per_s": round(len(latencies) / busy, 1) if busy else 0.0,
+                "p50_ms": round(percentile(latencies, 50), 2) if latencies else 0.0,
+                "p95_ms": round(percentile(latencies, 95), 2) if latencies else 0.0,
+                "p99_ms": round(percentile(latencies, 99), 2) if latencies else 0.0,
+                "wall_s": round(wall, 2),
+            }
+    return results
+
+
+# ------------------------------------------------- vistas síncronas frente a async
+
+READ_SCENARIOS = ("timeline", "explore", "profile", "search", "tag", "notifications", "trending_links")
+
+
+def _wsgi_get(app, factory, url, cookie):
+    """Petición GET completa al handler WSGI real (como un servidor con hilos)."""
+    status = []
+    environ = factory.get(url, HTTP_COOKIE=cookie).environ
+    response = app(environ, lambda s, headers, exc_info=None: status.append(int(s.split()[0])))
+    try:
+        for _ in response:
+            pass
+    finally:
+        response.close()  # request_finished: cierra la conexión como un servidor real
+    return status[0]
+
+
+async def _asgi_get(app, url, cookie, host="localhost"):
+    """Petición GET completa al handler ASGI real (como uvicorn)."""
+    import asyncio
+
+    path, _, query = url.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "root_path": "", "client": ("127.0.0.1", 50000), "server": (host, 80),
+        "headers": [(b"host", host.encode()), (b"cookie", cookie.encode())],
+    }
+    body_sent = asyncio.Event()
+    status = []
+
+    async def receive():
+        if not body_sent.is_set():
+            body_sent.set()
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.Event().wait()  # el cliente nunca se desconecta
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app(scope, receive, send)
+    return status[0]
+
+
+def _http_worker(job):
+    """Proceso hijo (arranque `spawn`): un servidor WSGI con hilos o uno ASGI.
+
+    `ASYNC_VIEWS` y la base de datos llegan por el entorno heredado. Cada uno de
+    los `concurrency` clientes pide `requests` páginas de lectura en bucle.
+    """
+    import asyncio
+    import itertools
+    from concurrent.futures import ThreadPoolExecutor
+
+    mode, concurrency, requests = job
+    import django
+    django.setup()
+    from django.test import Client, RequestFactory
+
+    ctx = pick_context()
+    client = Client()
+    client.force_login(ctx["viewer"])
+    cookie = "; ".join(f"{k}={v.value}" for k, v in client.cookies.items())
+    urls = [url for name, method, url in scenarios(ctx) if name in READ_SCENARIOS]
+
+    latencies, errors = [], []
+
+    def record(t0, status):
+        latencies.append((time.perf_counter() - t0) * 1000)
+        if status >= 400:
+            errors.append(status)
+
+    start = time.perf_counter()
+    if mode == "sync":
+        from django.core.wsgi import get_wsgi_application
+        app = get_wsgi_application()
+        factory = RequestFactory(SERVER_NAME="localhost")
+
+        def loop(offset):
+            for url in itertools.islice(itertools.cycle(urls), offset, offset + requests):
+                t0 = time.perf_counter()
+                record(t0, _wsgi_get(app, factory, url, cookie))
+
+        with ThreadPoolExecutor(concurrency) as pool:
+            list(pool.map(loop, range(concurrency)))
+    else:
+        from django.core.asgi import get_asgi_application
+        app = get_asgi_application()
+
+        async def loop(offset):
+            for url in itertools.islice(itertools.cycle(urls), offset, offset + requests):
+                t0 = time.perf_counter()
+                record(t0, await _asgi_get(app, url, cookie))
+
+        async def main():
+            await asyncio.gather(*(loop(i) for i in range(concurrency)))
+
+        asyncio.run(main())
+    return {"elapsed": time.perf_counter() - start, "latencies": latencies, "errors": errors}
+
+
+def async_throughput(modes=("sync", "async"), concurrency=16, requests=50, users=100, tweets=2000):
+    """Rendimiento de las vistas de lectura síncronas (WSGI + hilos) frente a async (ASGI).
+
+    Siembra una base de datos temporal y, para cada modo, lanza un proceso con
+    `concurrency` clientes concurrentes de `requests` peticiones cada uno.
+    Devuelve {modo: métricas}.
+    """
+    import multiprocessing
+    import os
+    import subprocess
+    import sys
+    import tempfile
+
+    manage = Path(settings.BASE_DIR) / "manage.py"
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="twittor-async-") as tmp:
+        db_name = str(Path(tmp) / "bench.sqlite3")
+        env = {**os.environ, "TWITTOR_DB_NAME": db_name}
+        subprocess.run([sys.executable, str(manage), "migrate", "-v0"], env=env, check=True)
+        subprocess.run(
+            [sys.executable, str(manage), "seed", "--users", str(users), "--tweets", str(tweets), "--no-avatars"],
+            env=env, check=True, stdout=subprocess.DEVNULL,
+        )
+
+        ctx = multiprocessing.get_context("spawn")
+        for mode in modes:
+            # Como en `sqlite_concurrency`: el hijo lee los settings del entorno.
+            overrides = {
+                "TWITTOR_DB_NAME": db_name,
+                "TWITTOR_ASYNC_VIEWS": "1" if mode == "async" else "0",
+                "TWITTOR_QUERY_BUDGET": "off",
+                "TWITTOR_PERF_SAMPLE_RATE": "0.05",
+            }
+            saved = {k: os.environ.get(k) for k in overrides}
+            os.environ.update(overrides)
+            try:
+                with ctx.Pool(1) as pool:
+                    part = pool.apply(_http_worker, ((mode, concurrency, requests),))
+            finally:
+                for k, v in saved.items():
+                    if v is None:
+                        os.environ.pop(k, None)
+                    else:
+                        os.environ[k] = v
+            latencies = part["latencies"]
+            results[mode] = {
+                "requests": len(latencies),
+                "errors": len(part["errors"]),
+                "req_per_s": round(len(latencies) / part["elapsed"], 1) if part["elapsed"] else 0.0,
+                "p50_ms": round(percentile(latencies, 50), 2) if latencies else 0.0,
+                "p95_ms": round(percentile(latencies, 95), 2) if latencies else 0.0,
+                "p99_ms": round(percentile(latencies, 99), 2) if latencies else 0.0,
+            }
+    return results
+
+
+# ------------------------------------------------- arranque del proceso
+
+# Código que ejecuta cada objetivo en un intérprete nuevo. Las apps incluyen el
+# URLconf (y con él todas las vistas): es lo que paga la primera petición.
+STARTUP_TARGETS = {
+    "wsgi": "from twittor.wsgi import application; from django.urls import get_resolver; get_resolver().url_patterns",
+    "asgi": "from twittor.asgi import application; from django.urls import get_resolver; get_resolver().url_patterns",
+    # Lo que paga cualquier `manage.py <comando>` (seed, archive, rank_explore...).
+    "command": "import django; django.setup()",
+}
+
+# Dependencias que solo se cargan al usarse (vistas previas de enlaces).
+LAZY_MODULES = ("requests", "bs4")
+
+DEFAULT_STARTUP_BUDGET_MS = 600
+
+
+def parse_importtime(text):
+    """Salida de `-X importtime` → [(módulo, propio_us, acumulado_us, nivel)]."""
+    rows = []
+    for line in text.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        level = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        rows.append((name.strip(), int(own), int(cumulative), level))
+    return rows
+
+
+def import_profile(target, runs=3):
+    """Importa `target` en un intérprete nuevo con `-X importtime`, `runs` veces.
+
+    Devuelve la ejecución más rápida: tiempo total de importación, módulos por
+    coste acumulado, coste propio sumado por paquete de primer nivel y qué
+    módulos de `LAZY_MODULES` se cargaron.
+    """
+    import os
+    import subprocess
+    import sys
+
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": "twittor.settings"}
+    best = None
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", STARTUP_TARGETS[target]],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+        )
+        rows = parse_importtime(proc.stderr)
+        total = sum(cumulative for _, _, cumulative, level in rows if level == 0)
+        if best is None or total < best[0]:
+            best = (total, rows)
+
+    total, rows = best
+    packages = {}
+    for name, own, _, _ in rows:
+        top = name.split(".")[0]
+        packages[top] = packages.get(top, 0) + own
+    loaded = {name for name, *_ in rows}
+    return {
+        "total_ms": round(total / 1000, 1),
+        "modules": [
+            {"module": name, "self_ms": round(own / 1000, 2), "cumulative_ms": round(cumulative / 1000, 2)}
+            for name, own, cumulative, _ in sorted(rows, key=lambda r: r[2], reverse=True)
+        ],
+        "packages": {k: round(v / 1000, 2) for k, v in sorted(packages.items(), key=lambda kv: kv[1], reverse=True)},
+        "lazy_loaded": [m for m in LAZY_MODULES if m in loaded],
+    }
+
+
+def check_startup(profiles, budget_ms=DEFAULT_STARTUP_BUDGET_MS):
+    """Problemas (lista de textos): objetivos sobre el presupuesto o que cargan dependencias perezosas."""
+    problems = []
+    for target, p in profiles.items():
+        if p["total_ms"] > budget_ms:
+            problems.append(f"{target}: {p['total_ms']:.0f} ms importando (presupuesto {budget_ms} ms)")
+        if p["lazy_loaded"]:
+            problems.append(f"{target}: carga al arrancar {', '.join(p['lazy_loaded'])}")
+    return problems
@@ -0,0 +1,165 @@
+"""
+GET condicional (ETag / Last-Modified) para timeline, perfil y detalle.
+
+Cada vista tiene un "estado" barato (una consulta de agregados) que cambia
+cuando cambia lo que pinta la página: tweets nuevos o borrados, contadores de
+likes, comentarios, citas del hilo, perfil editado, seguir/dejar de seguir. Si el cliente ya
+tiene esa versión (`If-None-Match`) se responde 304 sin ejecutar los querysets
+del feed ni renderizar la plantilla.
+
+Las páginas vivas no llevan `Last-Modified`: un like o un follow borrados no
+dejan fecha, así que ninguna marca de tiempo sigue a todo lo que entra en la
+ETag y `If-Modified-Since` daría 304 con la página ya cambiada. Solo los tweets
+archivados, que no cambian, lo envían.
+
+Las ETag incluyen al espectador (la página es personal), su sesión y su token
+CSRF (tras un logout/login la copia cacheada llevaría un `csrfmiddlewaretoken`
+caducado y el siguiente POST daría 403) y la versión de las plantillas, para que
+un despliegue invalide lo cacheado. Con mensajes pendientes (`messages`) no hay
+304: la página tiene que pintarlos.
+"""
+import hashlib
+from functools import lru_cache, wraps
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.models import User
+from django.db.models import Count, Exists, Max, OuterRef, Q, Sum
+from django.middleware.csrf import get_token
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .models import ArchivedTweet, Follow, Tweet
+from .threads import thread_ids
+
+
+@lru_cache(maxsize=None)
+def template_version():
+    """mtime más reciente de las plantillas del proyecto (igual en todos los workers)."""
+    newest = 0
+    for conf in settings.TEMPLATES:
+        for directory in conf.get('DIRS', []):
+            for path in Path(directory).rglob('*.html'):
+                newest = max(newest, int(path.stat().st_mtime))
+    return f'{newest:x}'
+
+
+def _memo(request, key, compute):
+    # ETag y Last-Modified salen del mismo estado: una sola consulta por petición.
+    cache = request.__dict__.setdefault('_conditional_state', {})
+    if key not in cache:
+        cache[key] = compute()
+    return cache[key]
+
+
+def _client_key(request):
+    """Huella de la sesión y del token CSRF: cambian con cada login."""
+    session = getattr(request, 'session', None)
+    # `get_token` fija ya el secreto que llevará la cookie de esta respuesta (las
+    # páginas tienen formularios): la siguiente petición da la misma huella.
+    get_token(request)
+    raw = f"{session.session_key if session is not None else ''}:{request.META.get('CSRF_COOKIE', '')}"
+    return hashlib.sha256(raw.encode()).hexdigest()[:12]
+
+
+def _pending_messages(request):
+    return bool(len(messages.get_messages(request)))
+
+
+def conditional(state_func):
+    """
+    Decorador: `state_func(request, *args, **kwargs)` devuelve `(etag, last_modified)`
+    (`last_modified` None si ninguna fecha sigue a la ETag) o None (la vista decide, p. ej. 404). Solo actúa en GET/HEAD.
+    """
+    def etag(request, *args, **kwargs):
+        state = _memo(request, 'state', lambda: state_func(request, *args, **kwargs))
+        if state is None:
+            return None
+        return f'{template_version()}-{request.user.pk}-{_client_key(request)}-{state[0]}'
+
+    def last_modified(request, *args, **kwargs):
+        state = _memo(request, 'state', lambda: state_func(request, *args, **kwargs))
+        return state[1] if state else None
+
+    def decorator(view):
+        guarded = condition(etag_func=etag, last_modified_func=last_modified)(view)
+
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD') or await sync_to_async(_pending_messages)(request):
+                    return await view(request, *args, **kwargs)
+                # `condition` llama a etag/last_modified sin await: el usuario y el
+                # estado se resuelven antes, en el hilo del ORM.
+                request.user = await request.auser()
+                await sync_to_async(_memo)(request, 'state', lambda: state_func(request, *args, **kwargs))
+                response = await guarded(request, *args, **kwargs)
+                patch_cache_control(response, private=True, no_cache=True)
+                return response
+        else:
+            @wraps(view)
+            def wrapper(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD') or _pending_messages(request):
+                    return view(request, *args, **kwargs)
+                response = guarded(request, *args, **kwargs)
+                # Siempre revalidar: la página es personal y cambia con cada like.
+                patch_cache_control(response, private=True, no_cache=True)
+                return response
+        return wrapper
+    return decorator
+
+
+# ------------------------------------------------------------- estados por vista
+
+def timeline_state(request):
+    following = Follow.objects.filter(follower=request.user).values('following_id')
+    agg = Tweet.objects.filter(Q(user=request.user) | Q(user_id__in=following)).aggregate(
+        last=Max('id'), n=Count('id'), likes=Sum('like_total'),
+        profiles=Max('user__userprofile__updated_at'),
+    )
+    etag = f"{agg['last']}.{agg['n']}.{agg['likes']}.{agg['profiles'] and agg['profiles'].timestamp()}"
+    return etag, None
+
+
+def profile_state(request, username):
+    row = (
+        User.objects.filter(username=username)
+        .annotate(
+            last=Max('tweet__id'), n=Count('tweet'),
+            followed=Exists(Follow.objects.filter(follower=request.user, following=OuterRef('pk'))),
+        )
+        .values('last', 'n', 'followed', 'userprofile__updated_at')
+        .first()
+    )
+    if row is None:
+        return None
+    updated = row['userprofile__updated_at']
+    etag = f"{row['last']}.{row['n']}.{int(row['followed'])}.{updated and updated.timestamp()}"
+    return etag, None
+
+
+def tweet_detail_state(request, pk):
+    row = (
+        Tweet.objects.filter(pk=pk)
+        .annotate(n=Count('comments'), last=Max('comments__id'))
+        .values('like_total', 'n', 'last', 'user__userprofile__updated_at')
+        .first()
+    )
+    if row is None:
+        # Los archivados no cambian; si tampoco está archivado, la vista da 404.
+        archived = ArchivedTweet.objects.filter(pk=pk).values_list('created_at', flat=True).first()
+        return (f'a{pk}', archived) if archived else None
+    updated = row['user__userprofile__updated_at']
+    # Antecesores y citas que pinta `load_thread`: citas nuevas, sus likes y sus autores.
+    thread = Tweet.objects.filter(id__in=thread_ids(pk)).aggregate(
+        n=Count('id'), last=Max('id'), likes=Sum('like_total'),
+        profiles=Max('user__userprofile__updated_at'),
+    )
+    profiles = thread['profiles']
+    etag = (
+        f"{row['like_total']}.{row['n']}.{row['last']}.{updated and updated.timestamp()}"
+        f".{thread['n']}.{thread['last']}.{thread['likes']}.{profiles and profiles.timestamp()}"
+    )
+    return etag, None
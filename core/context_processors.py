@@ -0,0 +1,22 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+
+PREBUILT_CSS_PATH = 'css/app.css'
+
+
+@lru_cache(maxsize=None)
+def asset_available(path):
+    """Si `{% static path %}` resuelve; con el manifiesto, un archivo que no está en él da 500."""
+    try:
+        staticfiles_storage.url(path)
+    except ValueError:
+        return False
+    return staticfiles_storage.exists(path) or bool(finders.find(path))
+
+
+def assets(request):
+    """`prebuilt_css`: base.html enlaza static/css/app.css (si existe) en vez del CDN de Tailwind."""
+    return {'prebuilt_css': settings.PREBUILT_CSS and asset_available(PREBUILT_CSS_PATH)}
@@ -0,0 +1,79 @@
+"""
+Ajustes de conexión y enrutado entre la base de datos principal y las réplicas.
+
+- `apply_sqlite_pragmas`: PRAGMA del perfil de producción en cada conexión nueva.
+- `ReplicaRouter`: lecturas a una réplica (`DATABASE_REPLICAS`), escrituras a
+  "default". `ReplicaRoutingMiddleware` fija la petición a la principal si es
+  una escritura o si el navegador escribió hace poco (read-your-writes).
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# Estado por petición (ContextVar: vale igual para hilos y para vistas async).
+_pinned = ContextVar("twittor_db_pinned", default=False)
+_wrote = ContextVar("twittor_db_wrote", default=False)
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Aplica `settings.SQLITE_PRAGMAS` a cada conexión SQLite nueva (señal connection_created)."""
+    if connection.vendor != "sqlite":
+        return
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", None)
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+@contextmanager
+def request_routing(pinned=False):
+    """Ámbito de una petición: `pinned` manda todas las lecturas a la principal.
+
+    Devuelve una función que dice si hubo escrituras dentro del ámbito.
+    """
+    pin_token = _pinned.set(pinned)
+    wrote_token = _wrote.set(False)
+    try:
+        yield _wrote.get
+    finally:
+        _pinned.reset(pin_token)
+        _wrote.reset(wrote_token)
+
+
+def pin_to_primary():
+    """Manda el resto de lecturas del ámbito actual a la principal."""
+    _pinned.set(True)
+
+
+class ReplicaRouter:
+    """Lecturas a una réplica al azar salvo que la petición esté fijada a "default"."""
+
+    def replicas(self):
+        return getattr(settings, "DATABASE_REPLICAS", [])
+
+    def db_for_read(self, model, **hints):
+        replicas = self.replicas()
+        if not replicas or _pinned.get():
+            return "default"
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        # Una escritura fija el resto de la petición: lo que se lea después
+        # tiene que incluirla.
+        _wrote.set(True)
+        _pinned.set(True)
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {"default", *self.replicas()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Las réplicas se copian de la principal; no se migran por separado.
+        return db not in self.replicas()
@@ -0,0 +1,106 @@
+"""
+Ranking de `explore` calculado fuera de la petición (`manage.py rank_explore`).
+
+Cada tweet reciente (últimas `window` horas, sin contar los retuits) puntúa
+
+    (1 + Σ peso · interacciones) · 0.5 ** (edad / vida_media)
+
+con likes (`Tweet.like_total`), comentarios, retuits y citas (hijos por `parent`).
+Tres consultas agregadas en total, una vez por ejecución y no por visita.
+
+Diversidad: el primer tramo del ranking lleva como mucho `per_author` tweets de
+cada autor; los que sobran van detrás, en orden de puntuación.
+
+El resultado se guarda en `ExploreRank` (clave primaria = posición) y la vista
+lee cada página a partir de la última posición leída (`?after=r<posición>`, como
+la API): una consulta indexada, y un tweet borrado no deja páginas cortas.
+"""
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Comment, ExploreRank, Tweet
+
+PAGE_SIZE = 50
+WEIGHTS = {'like': 1.0, 'comment': 2.0, 'retweet': 2.0, 'quote': 3.0}
+
+
+def option(name, default):
+    return getattr(settings, f'EXPLORE_{name}', default)
+
+
+def decay(age, half_life):
+    return 0.5 ** (age / half_life)
+
+
+def score_tweets(now, window, half_life):
+    """[(tweet_id, user_id, score)] de los tweets publicados en `window`."""
+    since = now - window
+    candidates = list(
+        Tweet.objects.filter(created_at__gte=since, is_retweet=False)
+        .values_list('id', 'user_id', 'created_at', 'like_total')
+    )
+    engagement = Counter()
+    for tweet_id, _, _, likes in candidates:
+        engagement[tweet_id] += WEIGHTS['like'] * likes
+    comments = (
+        Comment.objects.filter(tweet__created_at__gte=since)
+        .values_list('tweet_id').annotate(n=Count('id')).order_by()
+    )
+    for tweet_id, n in comments:
+        engagement[tweet_id] += WEIGHTS['comment'] * n
+    children = (
+        Tweet.objects.filter(parent__created_at__gte=since)
+        .values_list('parent_id', 'is_retweet').annotate(n=Count('id')).order_by()
+    )
+    for parent_id, is_retweet, n in children:
+        engagement[parent_id] += WEIGHTS['retweet' if is_retweet else 'quote'] * n
+
+    return [
+        (tweet_id, user_id, (1 + engagement[tweet_id]) * decay(now - created_at, half_life))
+        for tweet_id, user_id, created_at, _ in candidates
+    ]
+
+
+def diversify(scored, per_author, size):
+    """Las `size` mejores, con como mucho `per_author` por autor antes del resto."""
+    scored = sorted(scored, key=lambda row: row[2], reverse=True)
+    head, tail, seen = [], [], Counter()
+    for row in scored:
+        seen[row[1]] += 1
+        (head if seen[row[1]] <= per_author else tail).append(row)
+        if len(head) >= size:
+            break
+    return (head + tail)[:size]
+
+
+def rank(now=None, window=None, half_life=None, per_author=None, size=None):
+    """Recalcula `ExploreRank` en una transacción. Devuelve (guardados, candidatos)."""
+    now = now or timezone.now()
+    window = window or timedelta(hours=option('WINDOW_HOURS', 72))
+    half_life = half_life or timedelta(hours=option('HALF_LIFE_HOURS', 12))
+    scored = score_tweets(now, window, half_life)
+    ranked = diversify(scored, per_author or option('MAX_PER_AUTHOR', 3), size or option('SIZE', 500))
+    rows = [
+        ExploreRank(rank=i, tweet_id=tweet_id, score=score, computed_at=now)
+        for i, (tweet_id, _, score) in enumerate(ranked, 1)
+    ]
+    with transaction.atomic():
+        ExploreRank.objects.all().delete()
+        ExploreRank.objects.bulk_create(rows, batch_size=500)
+    return len(rows), len(scored)
+
+
+def after_rank(cursor):
+    """Posición tras la que sigue la página (cursor `r<posición>`); 0 si falta o no es válido."""
+    if not cursor or cursor[0] != 'r':
+        return 0
+    try:
+        return max(int(cursor[1:]), 0)
+    except ValueError:
+        return 0
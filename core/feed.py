@@ -0,0 +1,56 @@
+"""
+Montaje del timeline sobre la página ya cargada (sin consultas).
+
+`collapse_retweets` junta los retuits de un mismo tweet en una sola tarjeta
+("@ana, @beto y 3 más retwittearon"):
+
+- La tarjeta ocupa el sitio de la actividad más reciente del grupo (el
+  original o el último retuit), así el orden por fecha se mantiene.
+- Si el original está en la página, la tarjeta es el original (con sus
+  imágenes, likes y vista previa ya cargados) y los retuits desaparecen. Si
+  no, queda el retuit más reciente, que lo pinta como cita.
+- Los retuits de un mismo usuario cuentan una vez.
+
+Los tweets de la tarjeta llevan `retweeted_by` (usuarios, el más reciente
+primero) y `retweet_label`; el resto, `retweeted_by = []`.
+"""
+
+SHOWN_RETWEETERS = 2
+
+
+def retweet_label(users, shown=SHOWN_RETWEETERS):
+    names = [f'@{u.username}' for u in users]
+    if not names:
+        return ''
+    verb = 'retwitteó' if len(names) == 1 else 'retwittearon'
+    if len(names) > shown + 1:
+        head, tail = names[:shown], f'{len(names) - shown} más'
+    else:
+        head, tail = names[:-1], names[-1]
+    return f"{', '.join(head)} y {tail} {verb}" if head else f'{tail} {verb}'
+
+
+def collapse_retweets(tweets, shown=SHOWN_RETWEETERS):
+    """Lista de tweets en orden de pantalla → lista con los retuits agrupados."""
+    tweets = list(tweets)
+    originals = {t.pk: t for t in tweets if not t.is_retweet}
+    retweeters = {}  # parent_id → {user_id: user}, en orden de aparición
+    for t in tweets:
+        if t.is_retweet and t.parent_id:
+            retweeters.setdefault(t.parent_id, {}).setdefault(t.user_id, t.user)
+
+    result, placed = [], set()
+    for t in tweets:
+        key = t.parent_id if t.is_retweet and t.parent_id else t.pk
+        if key in placed:
+            continue
+        users = list(retweeters.get(key, {}).values())
+        if users and key in originals:
+            card = originals[key]  # el original, esté antes o después que sus retuits
+        else:
+            card = t
+        card.retweeted_by = users
+        card.retweet_label = retweet_label(users, shown)
+        placed.add(key)
+        result.append(card)
+    return result
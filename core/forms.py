@@ -2,6 +2,7 @@ from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 from django.forms import modelformset_factory
+from django.urls import reverse_lazy
 from image_cropping import ImageCropWidget
 
 from .models import Tweet, Comment, UserProfile, TweetImage
@@ -10,6 +11,8 @@ from .models import Tweet, Comment, UserProfile, TweetImage
 # ======================== ESTILOS BASE ========================
 BASE_INPUT = {'class': 'input'}
 BASE_AREA  = {'class': 'input min-h-[100px]'}
+# Sugerencias de @usuarios y #hashtags al escribir (static/app.js)
+AUTOCOMPLETE = {'data-autocomplete': reverse_lazy('api_autocomplete'), 'autocomplete': 'off'}
 BASE_FILE  = {'class': 'file-input'}
 
 
@@ -24,7 +27,8 @@ class TweetForm(forms.ModelForm):
             'content': forms.Textarea(attrs={
                 'rows': 3,
                 'placeholder': '¿Qué está pasando? (280 máx.)',
-                **BASE_AREA
+                **BASE_AREA,
+                **AUTOCOMPLETE,
             }),
         }
 
@@ -38,7 +42,8 @@ class CommentForm(forms.ModelForm):
             'content': forms.Textarea(attrs={
                 'rows': 2,
                 'placeholder': 'Escribe una respuesta…',
-                **BASE_AREA
+                **BASE_AREA,
+                **AUTOCOMPLETE,
             }),
         }
 
@@ -0,0 +1,136 @@
+"""
+Metadatos de imagen guardados al subir y `<img>` perezosas a partir de ellos.
+
+Al guardar un archivo nuevo (señal `pre_save`, ver core/signals.py) se leen con
+Pillow su ancho, alto (ya girado según EXIF) y color dominante, y se guardan en
+`<campo>_width`, `<campo>_height` y `<campo>_color`. Las plantillas pintan las
+imágenes con `{% lazy_img %}` (core/templatetags/extras.py): `width`/`height`
+reservan el hueco (sin saltos de maquetación), el color hace de marcador mientras
+llega la imagen, y `srcset` ofrece las miniaturas de `THUMBNAIL_ALIASES`. Los
+nombres de las miniaturas se calculan (`Thumbnailer.get_thumbnail_name`) sin
+tocar el storage ni Pillow durante el render; se generan al subir (core/signals.py)
+o, para las ya subidas, con `manage.py warm_thumbnails` tras el despliegue. `src`
+es siempre el archivo original, que existe seguro: las miniaturas solo van en `srcset`.
+"""
+from django.utils.html import format_html, format_html_join
+
+from .models import ArchivedTweet, Tweet, TweetImage
+
+# Rotaciones EXIF de 90°/270°: el navegador las muestra con ancho y alto intercambiados.
+ROTATED = {5, 6, 7, 8}
+
+# Los archivados conservan el archivo original: comparten alias y miniaturas.
+ALIAS_MODEL = {ArchivedTweet: Tweet}
+
+
+def meta_fields(field):
+    return [f'{field}_width', f'{field}_height', f'{field}_color']
+
+
+def probe(f):
+    """(ancho, alto, '#rrggbb') de un archivo de imagen; None si Pillow no puede leerlo."""
+    from PIL import Image
+
+    try:
+        f.seek(0)
+        with Image.open(f) as img:
+            width, height = img.size
+            if img.getexif().get(0x0112) in ROTATED:
+                width, height = height, width
+            img.draft('RGB', (64, 64))  # JPEG: decodifica ya reducido
+            small = img.convert('RGB')
+            small.thumbnail((64, 64))
+            palette = small.quantize(colors=5)
+            _, index = max(palette.getcolors())
+            r, g, b = palette.getpalette()[index * 3:index * 3 + 3]
+    except Exception:
+        return None
+    finally:
+        f.seek(0)
+    return width, height, f'#{r:02x}{g:02x}{b:02x}'
+
+
+def fill(instance, field, f=None):
+    """Rellena los metadatos de `instance.<field>` leyendo `f` (por defecto, el propio archivo)."""
+    fieldfile = getattr(instance, field)
+    meta = None
+    if fieldfile:
+        meta = probe(f if f is not None else fieldfile.file)
+    width, height, color = meta or (None, None, '')
+    setattr(instance, f'{field}_width', width)
+    setattr(instance, f'{field}_height', height)
+    setattr(instance, f'{field}_color', color)
+
+
+# ------------------------------------------------------------- render
+
+def _thumbnail(fieldfile, options):
+    from easy_thumbnails.files import get_thumbnailer
+
+    thumbnailer = get_thumbnailer(fieldfile)
+    return thumbnailer.thumbnail_storage.url(thumbnailer.get_thumbnail_name(options))
+
+
+def _scaled(width, height, options):
+    """Tamaño final de una miniatura sin upscale (el que calcula easy_thumbnails)."""
+    target_w, target_h = options['size']
+    if options.get('crop'):
+        return min(width, target_w or width), min(height, target_h or height)
+    scale = min(target_w / width if target_w else 1, target_h / height if target_h else 1, 1)
+    return max(round(width * scale), 1), max(round(height * scale), 1)
+
+
+def renditions(instance, field):
+    """
+    `{'src', 'srcset', 'width', 'height', 'color'}` para pintar `instance.<field>`;
+    None si no hay imagen. Solo usa columnas ya cargadas.
+    """
+    from .thumbnails import alias_options, cropped_options, target_label
+
+    fieldfile = getattr(instance, field)
+    if not fieldfile:
+        return None
+    width = getattr(instance, f'{field}_width', None)
+    height = getattr(instance, f'{field}_height', None)
+    color = getattr(instance, f'{field}_color', '')
+    if not (width and height):
+        # Sin metadatos (archivo ilegible o aún sin rellenar): la imagen tal cual.
+        return {'src': fieldfile.url, 'srcset': [], 'width': None, 'height': None, 'color': color}
+
+    model = ALIAS_MODEL.get(type(instance), type(instance))
+    if isinstance(instance, TweetImage):
+        # Recorte cuadrado de `{% cropped_thumbnail img 'cropping' %}`.
+        box = instance.cropping
+        options = cropped_options(TweetImage, 'cropping', box)
+        if box:
+            x0, y0, x1, y1 = map(int, box.split(','))
+            width, height = x1 - x0, y1 - y0
+        w, h = _scaled(width, height, options)
+        return {'src': fieldfile.url, 'srcset': [(w, _thumbnail(fieldfile, options))], 'width': w, 'height': h, 'color': color}
+
+    candidates = []
+    for options in alias_options(target_label(model, field)):
+        w, h = _scaled(width, height, options)
+        if options.get('crop'):
+            # Avatar: una sola miniatura recortada.
+            return {'src': fieldfile.url, 'srcset': [(w, _thumbnail(fieldfile, options))], 'width': w, 'height': h, 'color': color}
+        if w < width:
+            candidates.append((w, _thumbnail(fieldfile, options)))
+    srcset = sorted(set(candidates)) + [(width, fieldfile.url)]
+    return {'src': fieldfile.url, 'srcset': srcset, 'width': width, 'height': height, 'color': color}
+
+
+def lazy_img(instance, field, css='', alt='', sizes='', eager=False):
+    data = renditions(instance, field)
+    if data is None:
+        return ''
+    attrs = [('src', data['src']), ('alt', alt), ('class', css)]
+    if data['srcset']:
+        attrs.append(('srcset', ', '.join(f'{url} {w}w' for w, url in data['srcset'])))
+        attrs.append(('sizes', sizes or '100vw'))
+    if data['width']:
+        attrs += [('width', data['width']), ('height', data['height'])]
+    if data['color']:
+        attrs.append(('style', f"background-color: {data['color']}"))
+    attrs += [('loading', 'eager' if eager else 'lazy'), ('decoding', 'async')]
+    return format_html('<img{}>', format_html_join('', ' {}="{}"', attrs))
@@ -0,0 +1,75 @@
+"""
+Likes en lote e idempotentes (API JSON de core/views.py).
+
+Cada operación dice el estado final deseado (`liked=True/False`), no "alternar":
+repetirla no cambia nada, y los clientes pueden acumular acciones sin conexión
+y mandarlas juntas. Un lote se aplica en una sola transacción con
+`bulk_create(ignore_conflicts=True)`, un DELETE y un UPDATE de `Tweet.like_total`.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Like, Notification, Tweet
+
+MAX_BATCH = 500
+LIKE_VERB = 'le gustó tu publicación'
+
+
+def refresh_like_totals(tweet_ids=None):
+    """Recalcula `Tweet.like_total` de `tweet_ids` (o de todos) con un solo UPDATE.
+
+    Se cuenta de nuevo en vez de sumar deltas: el resultado es exacto aunque
+    dos peticiones toquen el mismo tweet a la vez.
+    """
+    counts = Like.objects.filter(tweet=OuterRef('pk')).values('tweet').annotate(c=Count('*')).values('c')
+    qs = Tweet.objects.all() if tweet_ids is None else Tweet.objects.filter(pk__in=tweet_ids)
+    return qs.update(like_total=Coalesce(Subquery(counts), Value(0)))
+
+
+def normalize_ops(ops):
+    """[(tweet_id, liked)] → {tweet_id: liked}; si un tweet se repite, gana la última."""
+    final = {}
+    for tweet_id, liked in ops:
+        final[int(tweet_id)] = bool(liked)
+    return final
+
+
+def apply_like_ops(user, ops):
+    """Aplica el lote `ops` de `user` y devuelve {tweet_id: {"liked", "likes"}}.
+
+    Los tweets que no existen se omiten del resultado. Las notificaciones solo
+    se crean para likes nuevos (repetir un PUT no vuelve a notificar): los lotes
+    del mismo usuario se serializan bloqueando su fila antes de leer sus likes,
+    así dos PUT a la vez no ven los dos el like como nuevo. `bulk_create` con
+    `ignore_conflicts` no dice qué filas insertó.
+    """
+    final = normalize_ops(ops)
+    with transaction.atomic():
+        # SELECT ... FOR UPDATE (en SQLite, BEGIN IMMEDIATE ya serializa las escrituras).
+        list(get_user_model().objects.select_for_update().filter(pk=user.pk).values_list('pk', flat=True))
+        authors = dict(Tweet.objects.filter(pk__in=final).values_list('pk', 'user_id'))
+        wanted = {t for t, liked in final.items() if liked and t in authors}
+        unwanted = [t for t, liked in final.items() if not liked and t in authors]
+
+        existing = set(
+            Like.objects.filter(user=user, tweet_id__in=wanted).values_list('tweet_id', flat=True)
+        )
+        new = sorted(wanted - existing)
+        if new:
+            Like.objects.bulk_create([Like(user=user, tweet_id=t) for t in new], ignore_conflicts=True)
+            Notification.objects.bulk_create([
+                Notification(actor=user, recipient_id=authors[t], verb=LIKE_VERB, tweet_id=t)
+                for t in new
+                if authors[t] != user.pk
+            ])
+        removed = 0
+        if unwanted:
+            removed, _ = Like.objects.filter(user=user, tweet_id__in=unwanted).delete()
+
+        if new or removed:
+            refresh_like_totals(list(authors))
+        totals = dict(Tweet.objects.filter(pk__in=authors).values_list('pk', 'like_total'))
+
+    return {t: {'liked': final[t], 'likes': totals[t]} for t in authors}
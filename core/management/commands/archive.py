@@ -0,0 +1,45 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from core import archive
+
+
+class Command(BaseCommand):
+    help = "Mueve tweets, likes y notificaciones antiguos a las tablas de archivo y aplica la retención de notificaciones."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=getattr(settings, "ARCHIVE_AFTER_DAYS", 180),
+                            help="Antigüedad (días) a partir de la cual se archiva")
+        parser.add_argument("--notification-retention", type=int,
+                            default=getattr(settings, "NOTIFICATION_RETENTION_DAYS", 30),
+                            help="Días que se conservan las notificaciones leídas")
+        parser.add_argument("--batch-size", type=int, default=500, help="Filas por transacción")
+        parser.add_argument("--dry-run", action="store_true", help="Solo cuenta lo que se archivaría")
+        parser.add_argument("--vacuum", action="store_true", help="VACUUM al terminar (SQLite)")
+
+    def handle(self, *args, **opts):
+        now = timezone.now()
+        cutoff = now - timedelta(days=opts["days"])
+        retention = now - timedelta(days=opts["notification_retention"])
+
+        if opts["dry_run"]:
+            count = archive.count_archivable(cutoff)
+            self.stdout.write(f"Se archivarían {count} tweets anteriores a {cutoff:%Y-%m-%d}.")
+            return
+
+        purged = archive.purge_read_notifications(retention)
+        # Primero las notificaciones: así ninguna fila viva apunta a los tweets que se van.
+        notes = archive.archive_notifications(cutoff, batch_size=opts["batch_size"])
+        tweets = archive.archive_tweets(cutoff, batch_size=opts["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Archivados {tweets} tweets y {notes} notificaciones; {purged} notificaciones leídas borradas."
+        ))
+
+        if opts["vacuum"] and connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute("VACUUM")
+            self.stdout.write("VACUUM completado.")
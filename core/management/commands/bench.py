@@ -0,0 +1,70 @@
+import json
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from core import benchmarks
+
+
+class Command(BaseCommand):
+    help = "Benchmark de las vistas calientes sobre datasets sembrados (base de datos de pruebas aislada)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scales", default="small", help=f"Escalas separadas por coma ({', '.join(benchmarks.SCALES)})")
+        parser.add_argument("--views", default="", help="Limita a estas vistas (separadas por coma)")
+        parser.add_argument("--iterations", type=int, default=20, help="Peticiones medidas por vista")
+        parser.add_argument("--runs", type=int, default=benchmarks.DEFAULT_RUNS, help="Rondas por vista (se usa la de menor mediana)")
+        parser.add_argument("--warmup", type=int, default=3, help="Peticiones de calentamiento por vista")
+        parser.add_argument("--seed", type=int, default=42, help="Semilla del dataset")
+        parser.add_argument("--baseline", default=str(benchmarks.BASELINE_PATH), help="JSON de referencia")
+        parser.add_argument("--tolerance", type=float, default=benchmarks.DEFAULT_TOLERANCE, help="Holgura relativa para latencia y memoria")
+        parser.add_argument("--update-baseline", action="store_true", help="Guarda los resultados como nueva referencia")
+        parser.add_argument("--json", dest="json_out", default="", help="Escribe los resultados en este archivo")
+
+    def handle(self, *args, **opts):
+        scales = [s.strip() for s in opts["scales"].split(",") if s.strip()]
+        unknown = [s for s in scales if s not in benchmarks.SCALES]
+        if unknown:
+            raise CommandError(f"Escalas desconocidas: {', '.join(unknown)}")
+        only = {v.strip() for v in opts["views"].split(",") if v.strip()} or None
+
+        # Nunca sembrar sobre la base de datos ni el MEDIA_ROOT reales
+        # (`seed --fresh` vacía avatars/ y tweets/).
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        media = tempfile.TemporaryDirectory(prefix="twittor-bench-")
+        isolated_media = override_settings(MEDIA_ROOT=media.name)
+        isolated_media.enable()
+        try:
+            results = {}
+            for scale in scales:
+                self.stdout.write(f"Midiendo escala {scale}...")
+                results[scale] = benchmarks.run_scale(
+                    scale, iterations=opts["iterations"], warmup=opts["warmup"],
+                    seed=opts["seed"], only=only, runs=opts["runs"],
+                )
+        finally:
+            isolated_media.disable()
+            media.cleanup()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(benchmarks.format_table(results))
+        if opts["json_out"]:
+            with open(opts["json_out"], "w", encoding="utf-8") as fh:
+                json.dump(results, fh, indent=2, sort_keys=True)
+
+        if opts["update_baseline"]:
+            benchmarks.save_baseline(results, opts["baseline"])
+            self.stdout.write(self.style.SUCCESS(f"Referencia actualizada: {opts['baseline']}"))
+            return
+
+        problems = benchmarks.compare(results, benchmarks.load_baseline(opts["baseline"]), opts["tolerance"])
+        if problems:
+            for p in problems:
+                self.stderr.write(p)
+            raise CommandError(f"{len(problems)} regresiones frente a la referencia")
+        self.stdout.write(self.style.SUCCESS("Sin regresiones frente a la referencia ✅"))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from core import benchmarks
+
+
+class Command(BaseCommand):
+    help = "Compara las vistas de lectura síncronas (WSGI con hilos) y async (ASGI) con clientes concurrentes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--modes", default="sync,async", help="Modos a comparar")
+        parser.add_argument("--concurrency", type=int, default=16, help="Clientes concurrentes (hilos en modo sync)")
+        parser.add_argument("--requests", type=int, default=50, help="Peticiones por cliente")
+        parser.add_argument("--users", type=int, default=100, help="Usuarios del dataset")
+        parser.add_argument("--tweets", type=int, default=2000, help="Tweets del dataset")
+
+    def handle(self, *args, **opts):
+        modes = [m.strip() for m in opts["modes"].split(",") if m.strip()]
+        results = benchmarks.async_throughput(
+            modes=modes, concurrency=opts["concurrency"], requests=opts["requests"],
+            users=opts["users"], tweets=opts["tweets"],
+        )
+        self.stdout.write(f"{'modo':8} {'req/s':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'errores':>8}")
+        for mode, m in results.items():
+            self.stdout.write(
+                f"{mode:8} {m['req_per_s']:9.1f} {m['p50_ms']:8.2f} {m['p95_ms']:8.2f} "
+                f"{m['p99_ms']:8.2f} {m['errors']:8d}"
+            )
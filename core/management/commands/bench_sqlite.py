@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from core import benchmarks
+
+
+class Command(BaseCommand):
+    help = "Compara perfiles de SQLite (dev vs production) con escritores concurrentes en varios procesos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profiles", default="dev,production", help="Perfiles a comparar (TWITTOR_DB_PROFILE)")
+        parser.add_argument("--processes", type=int, default=4, help="Procesos (simulan workers web)")
+        parser.add_argument("--threads", type=int, default=4, help="Hilos por proceso")
+        parser.add_argument("--ops", type=int, default=200, help="Operaciones por hilo")
+
+    def handle(self, *args, **opts):
+        profiles = [p.strip() for p in opts["profiles"].split(",") if p.strip()]
+        results = benchmarks.sqlite_concurrency(
+            profiles=profiles, processes=opts["processes"], threads=opts["threads"], ops=opts["ops"],
+        )
+        self.stdout.write(f"{'perfil':12} {'ops/s':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'errores':>8}")
+        for profile, m in results.items():
+            self.stdout.write(
+                f"{profile:12} {m['ops_per_s']:9.1f} {m['p50_ms']:8.2f} {m['p95_ms']:8.2f} "
+                f"{m['p99_ms']:8.2f} {m['errors']:8d}"
+            )
+            for sample in m["error_samples"]:
+                self.stdout.write(self.style.WARNING(f"  {profile}: {sample}"))
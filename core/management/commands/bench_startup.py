@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import benchmarks
+
+
+class Command(BaseCommand):
+    help = "Coste de importación al arrancar (WSGI, ASGI y comandos) con `-X importtime`, contra un presupuesto."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--targets", default=",".join(benchmarks.STARTUP_TARGETS), help="Objetivos a medir")
+        parser.add_argument("--runs", type=int, default=3, help="Ejecuciones por objetivo (se queda la más rápida)")
+        parser.add_argument("--top", type=int, default=15, help="Módulos a listar por coste acumulado")
+        parser.add_argument("--budget-ms", type=float, default=benchmarks.DEFAULT_STARTUP_BUDGET_MS,
+                            help="Tiempo máximo de importación por objetivo")
+
+    def handle(self, *args, **opts):
+        targets = [t.strip() for t in opts["targets"].split(",") if t.strip()]
+        unknown = [t for t in targets if t not in benchmarks.STARTUP_TARGETS]
+        if unknown:
+            raise CommandError(f"Objetivos desconocidos: {', '.join(unknown)}")
+
+        profiles = {}
+        for target in targets:
+            p = profiles[target] = benchmarks.import_profile(target, runs=opts["runs"])
+            self.stdout.write(f"\n{target}: {p['total_ms']:.1f} ms")
+            self.stdout.write(f"  {'acumulado':>10} {'propio':>8}  módulo")
+            for m in p["modules"][:opts["top"]]:
+                self.stdout.write(f"  {m['cumulative_ms']:10.1f} {m['self_ms']:8.1f}  {m['module']}")
+            heavy = ", ".join(f"{name} {ms:.0f}" for name, ms in list(p["packages"].items())[:8])
+            self.stdout.write(f"  por paquete (ms propios): {heavy}")
+
+        problems = benchmarks.check_startup(profiles, opts["budget_ms"])
+        if problems:
+            for problem in problems:
+                self.stderr.write(problem)
+            raise CommandError(f"{len(problems)} problemas de arranque")
+        self.stdout.write(self.style.SUCCESS(f"\nArranque dentro del presupuesto ({opts['budget_ms']:.0f} ms) ✅"))
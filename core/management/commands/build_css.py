@@ -0,0 +1,37 @@
+import shlex
+import subprocess
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Compila static/src/app.css con Tailwind → static/css/app.css (minificado, sin CDN en producción)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--watch", action="store_true", help="Recompila al cambiar plantillas")
+
+    def handle(self, *args, **opts):
+        base = Path(settings.BASE_DIR)
+        out = base / "static" / "css" / "app.css"
+        out.parent.mkdir(parents=True, exist_ok=True)
+        cmd = [
+            *shlex.split(settings.TAILWIND_CLI),
+            "-c", str(base / "tailwind.config.js"),
+            "-i", str(base / "static" / "src" / "app.css"),
+            "-o", str(out),
+            "--minify",
+        ]
+        if opts["watch"]:
+            cmd.append("--watch")
+        try:
+            subprocess.run(cmd, cwd=base, check=True)
+        except FileNotFoundError:
+            raise CommandError(
+                f"No se encontró el CLI de Tailwind ({settings.TAILWIND_CLI!r}). Instala `tailwindcss` "
+                "(binario standalone o `npm i -D tailwindcss@3`) o ajusta TAILWIND_CLI."
+            )
+        except subprocess.CalledProcessError as exc:
+            raise CommandError(f"Tailwind terminó con código {exc.returncode}")
+        self.stdout.write(self.style.SUCCESS(f"CSS generado: {out} ({out.stat().st_size / 1024:.1f} KiB)"))
@@ -0,0 +1,39 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from core import explore
+
+
+class Command(BaseCommand):
+    help = "Recalcula el ranking de explore (interacción con decaimiento temporal y tope por autor)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--window-hours", type=float, default=explore.option("WINDOW_HOURS", 72),
+                            help="Antigüedad máxima (horas) de los tweets candidatos")
+        parser.add_argument("--half-life", type=float, default=explore.option("HALF_LIFE_HOURS", 12),
+                            help="Horas en que la puntuación de un tweet se reduce a la mitad")
+        parser.add_argument("--per-author", type=int, default=explore.option("MAX_PER_AUTHOR", 3),
+                            help="Tweets de un mismo autor antes de pasar al final del ranking")
+        parser.add_argument("--size", type=int, default=explore.option("SIZE", 500),
+                            help="Posiciones que se guardan")
+        parser.add_argument("--every", type=int, default=0,
+                            help="Repite cada N segundos (0 = una sola vez, para cron)")
+
+    def handle(self, *args, **opts):
+        while True:
+            start = time.monotonic()
+            saved, candidates = explore.rank(
+                window=timedelta(hours=opts["window_hours"]),
+                half_life=timedelta(hours=opts["half_life"]),
+                per_author=opts["per_author"],
+                size=opts["size"],
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f"Ranking de explore: {saved} tweets de {candidates} candidatos "
+                f"en {(time.monotonic() - start) * 1000:.0f} ms."
+            ))
+            if not opts["every"]:
+                return
+            time.sleep(opts["every"])
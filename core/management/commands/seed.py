@@ -1,12 +1,17 @@
-
 import random
+import time
+from contextlib import nullcontext
 from io import BytesIO
 from pathlib import Path
+from urllib.parse import urlparse
 
 from django.conf import settings
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
 from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.core.management.base import BaseCommand
+from django.db import connections, transaction
 
 try:
     from faker import Faker
@@ -14,7 +19,22 @@ try:
 except Exception:
     HAVE_FAKER = False
 
-from core.models import UserProfile, Follow, Tweet, Like, Comment, Notification
+from core.models import (
+    Comment,
+    ExploreRank,
+    Follow,
+    Like,
+    LinkPreview,
+    Mention,
+    Notification,
+    Tweet,
+    TweetImage,
+    UserProfile,
+)
+from core.imagemeta import fill as fill_image_meta, meta_fields
+from core.likes import refresh_like_totals
+from core.mentions import VERB as MENTION_VERB, prepare as prepare_mentions, rows_for as mention_rows
+from core.workload import WORKLOADS, RealisticWorkload, explicit_timestamps
 
 WORDS = [
     "Django", "Tailwind", "IA", "Python", "MachineLearning", "DeepLearning", "Panamá",
@@ -37,24 +57,28 @@ PHRASES = [
 
 TIPS = ["usa virtualenv", "documenta funciones", "mide antes de optimizar", "usa pruebas unitarias", "aplica PEP8", "cuida la accesibilidad"]
 
-def rand_hashtags(k=2):
-    tags = random.sample(WORDS, k=k)
+def rand_hashtags(k=2, rng=random):
+    tags = rng.sample(WORDS, k=k)
     return " ".join(f"#{t}" for t in tags)
 
-def random_mention(usernames):
+def random_mention(usernames, rng=random):
     if not usernames:
         return ""
-    return " @" + random.choice(usernames)
+    return " @" + rng.choice(usernames)
 
 
-def make_avatar_png(initial: str, size=128):
-    """Genera un PNG simple con color de fondo aleatorio y la inicial centrada.
-    Compatible con Pillow 10+ (usa textbbox)."""
+def random_color(rng=random, lo=40, hi=200):
+    return (rng.randint(lo, hi), rng.randint(lo, hi), rng.randint(lo, hi))
+
+
+def render_avatar_png(initial: str, color, size=128):
+    """Genera los bytes de un PNG con fondo `color` y la inicial centrada.
+    Compatible con Pillow 10+ (usa textbbox). Devuelve None si no hay Pillow."""
     try:
         from PIL import Image, ImageDraw, ImageFont
     except Exception:
         return None
-    img = Image.new("RGB", (size, size), (random.randint(40,200), random.randint(40,200), random.randint(40,200)))
+    img = Image.new("RGB", (size, size), tuple(color))
     d = ImageDraw.Draw(img)
     text = (initial or '?')[0].upper()
     try:
@@ -75,11 +99,113 @@ def make_avatar_png(initial: str, size=128):
             tw = int(size * 0.5)
             th = int(size * 0.5)
     d.text(((size - tw)/2, (size - th)/2), text, fill=(255,255,255), font=font)
-    from io import BytesIO
     bio = BytesIO()
     img.save(bio, format="PNG")
-    from django.core.files.base import ContentFile
-    return ContentFile(bio.getvalue())
+    return bio.getvalue()
+
+
+def make_avatar_png(initial: str, size=128):
+    """Genera un PNG simple con color de fondo aleatorio y la inicial centrada."""
+    data = render_avatar_png(initial, random_color(), size=size)
+    return ContentFile(data) if data else None
+
+
+def render_tweet_png(topic: str, color):
+    """Imagen dummy 800x450 para una publicación (bytes PNG o None)."""
+    try:
+        from PIL import Image, ImageDraw
+    except Exception:
+        return None
+    img = Image.new("RGB", (800, 450), tuple(color))
+    d = ImageDraw.Draw(img)
+    d.text((20, 20), f"Demo {topic}", fill=(255,255,255))
+    buf = BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+# Los trabajos del pool deben ser funciones de módulo (picklables).
+def _avatar_job(job):
+    key, initial, color = job
+    return key, render_avatar_png(initial, color)
+
+
+def _tweet_image_job(job):
+    key, topic, color = job
+    return key, render_tweet_png(topic, color)
+
+
+def chunked(seq, size):
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+
+class Progress:
+    """Contador de progreso en una sola línea (`\\r`) con ritmo por segundo."""
+
+    def __init__(self, stdout, label, total):
+        self.stdout = stdout
+        self.label = label
+        self.total = total
+        self.done = 0
+        self.start = time.monotonic()
+        self.tty = getattr(stdout, "isatty", lambda: False)()
+
+    def update(self, n=1):
+        self.done += n
+        if self.tty:
+            self._write("\r")
+
+    def _write(self, prefix):
+        elapsed = max(time.monotonic() - self.start, 1e-6)
+        rate = self.done / elapsed
+        total = f"/{self.total}" if self.total else ""
+        self.stdout.write(
+            f"{prefix}  {self.label}: {self.done}{total} ({rate:,.0f}/s, {elapsed:.1f}s)",
+            ending="",
+        )
+        self.stdout.flush()
+
+    def finish(self):
+        self._write("\r" if self.tty else "")
+        self.stdout.write("")
+
+
+class BulkBuffer:
+    """Acumula instancias y las inserta con `bulk_create` al llenar un lote.
+
+    Mantiene acotada la memoria aunque se generen millones de filas: cada
+    lote va en su propia transacción (ver `Command.bulk_insert`).
+    """
+
+    def __init__(self, command, model, ignore_conflicts=False, progress=True):
+        self.command = command
+        self.model = model
+        self.ignore_conflicts = ignore_conflicts
+        self.progress = progress
+        self.pending = []
+        self.total = 0
+
+    def add(self, obj):
+        self.pending.append(obj)
+        if len(self.pending) >= self.command.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.command.bulk_insert(
+                self.model, self.pending,
+                ignore_conflicts=self.ignore_conflicts, progress=self.progress,
+            )
+            self.total += len(self.pending)
+            self.pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
 
 
 class Command(BaseCommand):
@@ -95,7 +221,100 @@ class Command(BaseCommand):
         parser.add_argument("--like_factor", type=float, default=0.25, help="Fracción de usuarios que podrían dar like a cada tweet")
         parser.add_argument("--comment_factor", type=float, default=0.20, help="Fracción de tweets que recibirán 1-3 comentarios")
         parser.add_argument("--images", action="store_true", help="Intenta generar imágenes dummy para algunos tweets")
+        parser.add_argument("--no-avatars", dest="avatars", action="store_false", help="No genera avatares PNG (más rápido)")
         parser.add_argument("--password", type=str, default="demo12345", help="Contraseña por defecto para usuarios demo")
+        parser.add_argument("--shape", choices=sorted(WORKLOADS), default="uniform", help="Forma de carga: uniform (clásica) o realistic (Zipf, ráfagas, virales)")
+        parser.add_argument("--seed", type=int, default=42, help="Semilla del generador (datasets reproducibles)")
+        parser.add_argument("--days", type=int, default=14, help="[realistic] Días de historia sobre los que repartir created_at")
+        parser.add_argument("--zipf", type=float, default=1.1, help="[realistic] Exponente de Zipf para seguidores y actividad")
+        parser.add_argument("--viral_ratio", type=float, default=0.01, help="[realistic] Fracción de tweets virales")
+        parser.add_argument("--link_ratio", type=float, default=0.4, help="[realistic] Fracción de tweets con enlace")
+        parser.add_argument("--batch-size", type=int, default=2000, help="Filas por bulk_create / transacción")
+        parser.add_argument("--workers", type=int, default=0, help="Procesos para generar avatares/imágenes (0 = sin pool)")
+        parser.add_argument("--max-follows", type=int, default=1000, help="Tope de cuentas seguidas por usuario")
+        parser.add_argument("--max-likes", type=int, default=200, help="Tope de likes por tweet (evita O(usuarios×tweets))")
+
+    # ------------------------------------------------------------------ helpers
+
+    def bulk_insert(self, model, objs, ignore_conflicts=False, progress=True):
+        """Inserta `objs` en lotes de `batch_size`, una transacción por lote."""
+        for batch in chunked(objs, self.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(batch, batch_size=self.batch_size, ignore_conflicts=ignore_conflicts)
+            if progress and self.progress:
+                self.progress.update(len(batch))
+        return objs
+
+    def bulk_update(self, model, objs, fields):
+        for batch in chunked(objs, self.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_update(batch, fields, batch_size=self.batch_size)
+
+    def phase(self, label, total):
+        self.progress = Progress(self.stdout, label, total)
+        return self.progress
+
+    def end_phase(self):
+        if self.progress:
+            self.progress.finish()
+        self.progress = None
+
+    def render_many(self, func, jobs):
+        """Ejecuta `func` sobre `jobs` (en un pool si `--workers` > 0) y produce (key, bytes).
+
+        Es un generador: el llamador guarda cada archivo al recibirlo, así no
+        se acumulan en memoria los bytes de todas las imágenes.
+        """
+        if not jobs:
+            return
+        self.phase("Renderizando imágenes", len(jobs))
+        if self.workers > 0:
+            import multiprocessing
+            # Las conexiones abiertas no deben heredarse en procesos hijos.
+            connections.close_all()
+            methods = multiprocessing.get_all_start_methods()
+            ctx = multiprocessing.get_context("fork" if "fork" in methods else None)
+            with ctx.Pool(self.workers) as pool:
+                for key, data in pool.imap_unordered(func, jobs, chunksize=16):
+                    self.progress.update()
+                    yield key, data
+        else:
+            for job in jobs:
+                key, data = func(job)
+                self.progress.update()
+                yield key, data
+        self.end_phase()
+
+    def store_file(self, model, field_name, instance, filename, data):
+        """
+        Guarda `data` en el storage con el `upload_to` del campo y devuelve el nombre final.
+        Rellena también los metadatos de imagen de `instance` (bulk_update no lanza señales).
+        """
+        field = model._meta.get_field(field_name)
+        name = field.generate_filename(instance, filename)
+        content = ContentFile(data)
+        setattr(instance, field_name, name)
+        fill_image_meta(instance, field_name, content)
+        return default_storage.save(name, content)
+
+    def wipe(self):
+        """Borra los datos de demo sin el colector de cascadas de Django (O(filas) en Python)."""
+        with transaction.atomic():
+            for model in (Notification, ExploreRank, Mention, Like, Comment, TweetImage, Tweet, Follow, UserProfile):
+                model.objects.all()._raw_delete(model.objects.db)
+            User.objects.filter(is_superuser=False).delete()
+
+        media = Path(settings.MEDIA_ROOT)
+        for sub in ["avatars", "tweets"]:
+            p = media / sub
+            p.mkdir(parents=True, exist_ok=True)
+            for f in p.glob("*"):
+                try:
+                    f.unlink()
+                except Exception:
+                    pass
+
+    # ------------------------------------------------------------------ handle
 
     def handle(self, *args, **opts):
         users_n = opts["users"]
@@ -107,154 +326,280 @@ class Command(BaseCommand):
         quote_ratio = max(0.0, min(0.9, opts["quote_ratio"]))
         like_factor = max(0.05, min(0.9, opts["like_factor"]))
         comment_factor = max(0.05, min(0.9, opts["comment_factor"]))
-
-        fake = Faker("es_ES") if HAVE_FAKER else None
-        random.seed(42)
+        max_likes = max(0, opts["max_likes"])
+        max_follows = max(1, opts["max_follows"])
+        self.batch_size = max(1, opts["batch_size"])
+        self.workers = max(0, opts["workers"])
+        self.progress = None
+
+        rng = random.Random(opts["seed"])
+        fake = None
+        if HAVE_FAKER:
+            Faker.seed(opts["seed"])
+            fake = Faker("es_ES")
 
         if fresh:
             self.stdout.write(self.style.WARNING("Borrando datos existentes..."))
-            Like.objects.all().delete()
-            Comment.objects.all().delete()
-            Tweet.objects.all().delete()
-            Follow.objects.all().delete()
-            Notification.objects.all().delete()
-            UserProfile.objects.all().delete()
-            User.objects.filter(is_superuser=False).delete()
-
-            media = Path(settings.MEDIA_ROOT)
-            for sub in ["avatars", "tweets"]:
-                p = media / sub
-                p.mkdir(parents=True, exist_ok=True)
-                for f in p.glob("*"):
-                    try:
-                        f.unlink()
-                    except Exception:
-                        pass
+            self.wipe()
 
         if opts["superuser"]:
             if not User.objects.filter(username="admin").exists():
                 User.objects.create_superuser("admin", "admin@example.com", "admin12345")
                 self.stdout.write(self.style.SUCCESS("Superusuario admin/admin12345 creado."))
 
+        # ---------------- Usuarios ----------------
         self.stdout.write(self.style.NOTICE("Creando usuarios..."))
+        # Un solo hash para todos: hashear por usuario domina el tiempo del seed.
+        hashed = make_password(password)
+        taken = set(User.objects.values_list("username", flat=True))
         usernames = []
-        users = []
+        new_users = []
         for i in range(users_n):
             if fake:
-                uname = fake.unique.user_name()[:20]
-                mail = fake.unique.email()
-                bio = fake.sentence(nb_words=8)
+                uname = fake.user_name()[:20]
+                mail = fake.email()
             else:
                 uname = f"user{i+1}"
                 mail = f"user{i+1}@example.com"
-                bio = "Bio de demostración"
-
-            if User.objects.filter(username=uname).exists():
+            if uname in taken:
                 uname = f"{uname[:15]}{i}"
-
-            u = User.objects.create_user(username=uname, email=mail, password=password)
-            profile, _ = UserProfile.objects.get_or_create(user=u)
-            profile.bio = bio
-            profile.save()
-
-            avatar_file = make_avatar_png(uname[:1])
-            if avatar_file:
-                profile.avatar.save(f"{uname}.png", avatar_file, save=True)
-
-            users.append(u)
+            taken.add(uname)
             usernames.append(uname)
+            new_users.append(User(username=uname, email=mail, password=hashed))
+
+        self.phase("usuarios", users_n)
+        self.bulk_insert(User, new_users)
+        self.end_phase()
+        users = new_users
+        if any(u.pk is None for u in users):
+            # Backends sin RETURNING en inserciones masivas: recuperar los ids por nombre.
+            users = []
+            for names in chunked(usernames, 500):
+                users.extend(User.objects.filter(username__in=names).only("id", "username"))
+        user_ids = [u.pk for u in users]
+        usernames_by_id = {u.pk: u.username for u in users}
+
+        # bulk_create no dispara post_save: los perfiles se crean aquí.
+        profiles = []
+        for u in users:
+            bio = fake.sentence(nb_words=8) if fake else "Bio de demostración"
+            profiles.append(UserProfile(user_id=u.pk, bio=bio))
+        self.phase("perfiles", len(profiles))
+        self.bulk_insert(UserProfile, profiles, ignore_conflicts=True)
+        self.end_phase()
 
         # Ensure all users (incl. superusers) have a profile
-        for uu in User.objects.all():
-            UserProfile.objects.get_or_create(user=uu)
+        missing = User.objects.filter(userprofile__isnull=True).values_list("id", flat=True)
+        self.bulk_insert(UserProfile, [UserProfile(user_id=uid) for uid in missing], ignore_conflicts=True)
+
+        if opts["avatars"]:
+            jobs = [(u.pk, u.username[:1], random_color(rng)) for u in users]
+            by_user = {p.user_id: p for p in UserProfile.objects.filter(user_id__in=user_ids).only("id", "user_id")}
+            changed = []
+            for uid, data in self.render_many(_avatar_job, jobs):
+                prof = by_user.get(uid)
+                if data and prof:
+                    prof.avatar = self.store_file(UserProfile, "avatar", prof, f"{usernames_by_id[uid]}.png", data)
+                    changed.append(prof)
+                if len(changed) >= self.batch_size:
+                    self.bulk_update(UserProfile, changed, ["avatar", *meta_fields("avatar")])
+                    changed = []
+            self.bulk_update(UserProfile, changed, ["avatar", *meta_fields("avatar")])
 
         self.stdout.write(self.style.SUCCESS(f"Usuarios creados: {len(users)} (pass: {password})"))
 
-        # Create follows
+        shape_cls = WORKLOADS[opts["shape"]]
+        shape_opts = dict(like_factor=like_factor, max_likes=max_likes, max_follows=max_follows)
+        if shape_cls is RealisticWorkload:
+            shape_opts.update(
+                zipf_s=opts["zipf"], days=max(1, opts["days"]),
+                viral_ratio=max(0.0, min(0.5, opts["viral_ratio"])),
+                link_ratio=max(0.0, min(1.0, opts["link_ratio"])),
+            )
+        shape = shape_cls(rng, user_ids, **shape_opts)
+        self.stdout.write(f"Forma de carga: {shape.name} (semilla {opts['seed']})")
+
+        stamps = explicit_timestamps(Tweet, Like, Comment, Notification) if shape.timestamps else nullcontext()
+        with stamps:
+            self.populate(
+                rng, shape, usernames,
+                tweets_n=tweets_n,
+                make_images=make_images,
+                retweet_ratio=retweet_ratio,
+                quote_ratio=quote_ratio,
+                comment_factor=comment_factor,
+            )
+
+        self.stdout.write(self.style.SUCCESS("Seeding completado ✅"))
+        self.stdout.write("Sugerencia: prueba /explore, /search/?q=IA, y /n/ para ver notificaciones.")
+
+    def populate(self, rng, shape, usernames, tweets_n, make_images, retweet_ratio, quote_ratio, comment_factor):
+        """Follows, publicaciones e interacciones según la forma de carga `shape`."""
+        user_ids = shape.user_ids
+
+        # ---------------- Follows ----------------
         self.stdout.write("Creando follows...")
-        for u in users:
-            k = min(max(3, len(users)//5), max(1, len(users)-1))
-            candidates = [x for x in users if x != u]
-            for v in random.sample(candidates, k=min(k, len(candidates))):
-                Follow.objects.get_or_create(follower=u, following=v)
+        self.phase("follows", None)
+        with BulkBuffer(self, Follow, ignore_conflicts=True) as follows:
+            for uid in user_ids:
+                for vid in shape.following(uid):
+                    follows.add(Follow(follower_id=uid, following_id=vid))
+        self.end_phase()
         self.stdout.write(self.style.SUCCESS("Follows listos."))
 
-        # Base tweets
-        self.stdout.write("Creando publicaciones...")
-        created_tweets = []
-        for i in range(tweets_n):
-            author = random.choice(users)
-            topic = random.choice(WORDS)
-            phrase = random.choice(PHRASES).format(topic=topic, tip=random.choice(TIPS))
-            text = f"{phrase} {rand_hashtags(random.randint(1,2))}{random_mention(usernames) if random.random()<0.25 else ''}"
-            tw = Tweet.objects.create(user=author, content=text)
-            created_tweets.append(tw)
-
-            if make_images and random.random() < 0.25:
-                try:
-                    from PIL import Image, ImageDraw
-                    img = Image.new("RGB", (800, 450), (random.randint(20,220), random.randint(20,220), random.randint(20,220)))
-                    d = ImageDraw.Draw(img)
-                    d.text((20, 20), f"Demo {topic}", fill=(255,255,255))
-                    buf = BytesIO()
-                    img.save(buf, format="PNG")
-                    tw.image.save(f"demo_{tw.pk}.png", ContentFile(buf.getvalue()), save=True)
-                except Exception:
-                    pass
+        # ---------------- Publicaciones base ----------------
+        # Las notificaciones se acumulan en su propio búfer durante todas las fases.
+        notifs = BulkBuffer(self, Notification, progress=False)
 
-        self.stdout.write(self.style.SUCCESS(f"Publicaciones base: {len(created_tweets)}"))
+        def notify(actor, recipient, verb, tweet_id, when):
+            notifs.add(Notification(actor_id=actor, recipient_id=recipient, verb=verb, tweet_id=tweet_id, created_at=when))
 
-        # Retweets
-        r_n = int(len(created_tweets) * retweet_ratio)
+        self.stdout.write("Creando publicaciones...")
+        tweet_ids = []
+        tweet_authors = []
+        tweet_times = []
+        image_jobs = []
+        times = shape.post_times(tweets_n)
+        self.phase("publicaciones", tweets_n)
+        for start in range(0, tweets_n, self.batch_size):
+            batch = []
+            topics = []
+            links = []
+            for i in range(start, min(start + self.batch_size, tweets_n)):
+                author = shape.author()
+                topic = rng.choice(WORDS)
+                phrase = rng.choice(PHRASES).format(topic=topic, tip=rng.choice(TIPS))
+                mention = random_mention(usernames, rng) if rng.random() < 0.25 else ''
+                text = f"{phrase} {rand_hashtags(rng.randint(1,2), rng)}{mention}"
+                url = shape.link()
+                if url:
+                    text = f"{text[:280 - len(url) - 1]} {url}"
+                batch.append(Tweet(user_id=author, content=text, created_at=times[i]))
+                topics.append(topic)
+                links.append(url)
+            previews = self.link_previews({u for u in links if u})
+            for tw, url in zip(batch, links):
+                if url:
+                    tw.link_preview_id = previews.get(url)
+            # Como al publicar: `mention_spans` para `linkify`, filas `Mention` y avisos,
+            # con una consulta de nombres por lote.
+            mentioned = prepare_mentions(batch)
+            with transaction.atomic():
+                Tweet.objects.bulk_create(batch, batch_size=self.batch_size)
+                Mention.objects.bulk_create(
+                    [row for tw in batch for row in mention_rows(tw, mentioned[id(tw)])],
+                    batch_size=self.batch_size, ignore_conflicts=True,
+                )
+            for tw in batch:
+                for uid in mentioned[id(tw)]:
+                    if uid != tw.user_id:
+                        notify(tw.user_id, uid, MENTION_VERB, tw.pk, tw.created_at)
+            for tw, topic in zip(batch, topics):
+                tweet_ids.append(tw.pk)
+                tweet_authors.append(tw.user_id)
+                tweet_times.append(tw.created_at)
+                if make_images and rng.random() < 0.25:
+                    image_jobs.append((tw.pk, topic, random_color(rng, 20, 220)))
+            self.progress.update(len(batch))
+        self.end_phase()
+        shape.mark_tweets(len(tweet_ids))
+
+        changed = []
+        for pk, data in self.render_many(_tweet_image_job, image_jobs):
+            if data:
+                tw = Tweet(pk=pk)
+                tw.image = self.store_file(Tweet, "image", tw, f"demo_{pk}.png", data)
+                changed.append(tw)
+            if len(changed) >= self.batch_size:
+                self.bulk_update(Tweet, changed, ["image", *meta_fields("image")])
+                changed = []
+        self.bulk_update(Tweet, changed, ["image", *meta_fields("image")])
+
+        self.stdout.write(self.style.SUCCESS(f"Publicaciones base: {len(tweet_ids)}"))
+
+        # ---------------- Retuits ----------------
+        r_n = int(len(tweet_ids) * retweet_ratio)
         self.stdout.write(f"Creando retuits: {r_n}")
-        for _ in range(r_n):
-            base = random.choice(created_tweets)
-            actor = random.choice(users)
-            if actor == base.user:
-                continue
-            if not Tweet.objects.filter(user=actor, parent=base, is_retweet=True).exists():
-                Tweet.objects.create(user=actor, parent=base, is_retweet=True, content="")
-                Notification.objects.create(actor=actor, recipient=base.user, verb="retwitteó tu publicación", tweet=base)
-
-        # Quotes
-        q_n = int(len(created_tweets) * quote_ratio)
+        seen = set()
+        self.phase("retuits", r_n)
+        with BulkBuffer(self, Tweet) as retweets:
+            for _ in range(r_n):
+                i = shape.base_index()
+                base, base_author = tweet_ids[i], tweet_authors[i]
+                actor = rng.choice(user_ids)
+                if actor == base_author or (actor, base) in seen:
+                    continue
+                seen.add((actor, base))
+                when = shape.reaction_time(tweet_times[i])
+                retweets.add(Tweet(user_id=actor, parent_id=base, is_retweet=True, content="", created_at=when))
+                notify(actor, base_author, "retwitteó tu publicación", base, when)
+        self.end_phase()
+        del seen
+
+        # ---------------- Citas ----------------
+        q_n = int(len(tweet_ids) * quote_ratio)
         self.stdout.write(f"Creando citas: {q_n}")
-        for _ in range(q_n):
-            base = random.choice(created_tweets)
-            actor = random.choice(users)
-            if actor == base.user:
-                continue
-            topic = random.choice(WORDS)
-            text = f"Mi opinión: {random.choice(PHRASES).format(topic=topic, tip=random.choice(TIPS))} {rand_hashtags(1)}"
-            Tweet.objects.create(user=actor, parent=base, is_retweet=False, content=text)
-            Notification.objects.create(actor=actor, recipient=base.user, verb="citó tu publicación", tweet=base)
-
-        # Likes
-        self.stdout.write("Añadiendo likes...")
-        for tw in created_tweets:
-            k = max(0, int(len(users)*like_factor*random.random()))
-            likers = random.sample(users, k=min(k, len(users)))
-            for u in likers:
-                if u == tw.user:
+        self.phase("citas", q_n)
+        with BulkBuffer(self, Tweet) as quotes:
+            for _ in range(q_n):
+                i = shape.base_index()
+                base, base_author = tweet_ids[i], tweet_authors[i]
+                actor = rng.choice(user_ids)
+                if actor == base_author:
                     continue
-                obj, created = Like.objects.get_or_create(user=u, tweet=tw)
-                if created:
-                    Notification.objects.create(actor=u, recipient=tw.user, verb="le gustó tu publicación", tweet=tw)
-
-        # Comments
-        self.stdout.write("Creando comentarios...")
-        for tw in created_tweets:
-            if random.random() < comment_factor:
-                c_count = random.randint(1, 3)
-                for _ in range(c_count):
-                    author = random.choice(users)
-                    if author == tw.user and random.random() < 0.5:
+                topic = rng.choice(WORDS)
+                text = f"Mi opinión: {rng.choice(PHRASES).format(topic=topic, tip=rng.choice(TIPS))} {rand_hashtags(1, rng)}"
+                when = shape.reaction_time(tweet_times[i])
+                quotes.add(Tweet(user_id=actor, parent_id=base, is_retweet=False, content=text, created_at=when))
+                notify(actor, base_author, "citó tu publicación", base, when)
+        self.end_phase()
+
+        # ---------------- Likes ----------------
+        self.stdout.write("Añadiendo likes...")
+        self.phase("likes", None)
+        with BulkBuffer(self, Like, ignore_conflicts=True) as likes:
+            for i, (tw_id, author) in enumerate(zip(tweet_ids, tweet_authors)):
+                k = shape.like_count(i)
+                # rng.sample garantiza pares (usuario, tweet) únicos: no hace falta get_or_create.
+                for u in rng.sample(user_ids, k=min(k, len(user_ids))):
+                    if u == author:
                         continue
-                    topic = random.choice(WORDS)
-                    text = f"Interesante. Sobre {topic}, yo {random.choice(['probé', 'leí', 'vi'])} algo similar."
-                    Comment.objects.create(user=author, tweet=tw, content=text)
-                    if author != tw.user:
-                        Notification.objects.create(actor=author, recipient=tw.user, verb="comentó tu publicación", tweet=tw)
-
-        self.stdout.write(self.style.SUCCESS("Seeding completado ✅"))
-        self.stdout.write("Sugerencia: prueba /explore, /search/?q=IA, y /n/ para ver notificaciones.")
+                    when = shape.reaction_time(tweet_times[i])
+                    likes.add(Like(user_id=u, tweet_id=tw_id, created_at=when))
+                    notify(u, author, "le gustó tu publicación", tw_id, when)
+        with transaction.atomic():
+            refresh_like_totals()
+        self.end_phase()
+
+        # ---------------- Comentarios ----------------
+        self.stdout.write("Creando comentarios...")
+        self.phase("comentarios", None)
+        with BulkBuffer(self, Comment) as comments:
+            for i, (tw_id, tw_author) in enumerate(zip(tweet_ids, tweet_authors)):
+                if rng.random() < comment_factor:
+                    c_count = rng.randint(1, 3)
+                    for _ in range(c_count):
+                        author = rng.choice(user_ids)
+                        if author == tw_author and rng.random() < 0.5:
+                            continue
+                        topic = rng.choice(WORDS)
+                        text = f"Interesante. Sobre {topic}, yo {rng.choice(['probé', 'leí', 'vi'])} algo similar."
+                        when = shape.reaction_time(tweet_times[i])
+                        comments.add(Comment(user_id=author, tweet_id=tw_id, content=text, created_at=when))
+                        if author != tw_author:
+                            notify(author, tw_author, "comentó tu publicación", tw_id, when)
+        self.end_phase()
+
+        notifs.flush()
+        self.stdout.write(self.style.SUCCESS(f"Notificaciones: {notifs.total}"))
+
+    def link_previews(self, urls):
+        """Crea (sin red) las vistas previas de `urls` y devuelve {url: id}."""
+        if not urls:
+            return {}
+        with transaction.atomic():
+            LinkPreview.objects.bulk_create(
+                [LinkPreview(url=u, title=urlparse(u).netloc) for u in sorted(urls)],
+                ignore_conflicts=True,
+            )
+        return dict(LinkPreview.objects.filter(url__in=urls).values_list("url", "id"))
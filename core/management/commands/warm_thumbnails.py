@@ -0,0 +1,74 @@
+import json
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core import thumbnails
+from core.management.commands.seed import Progress
+
+
+class Command(BaseCommand):
+    help = "Genera por adelantado las miniaturas de las imágenes existentes (pool de procesos, reanudable)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="Procesos del pool (0 = en este proceso)")
+        parser.add_argument("--checkpoint", default=str(Path(settings.BASE_DIR) / ".thumbnail_warmup.json"),
+                            help="Archivo de progreso para reanudar")
+        parser.add_argument("--restart", action="store_true", help="Ignora el checkpoint y empieza de cero")
+        parser.add_argument("--checkpoint-every", type=int, default=200,
+                            help="Guarda el progreso cada N archivos")
+
+    def handle(self, *args, **opts):
+        checkpoint = Path(opts["checkpoint"])
+        done = {}
+        if checkpoint.exists() and not opts["restart"]:
+            done = json.loads(checkpoint.read_text())
+            self.stdout.write(f"Reanudando desde {checkpoint}: {done}")
+
+        jobs = list(thumbnails.iter_jobs(after=done))
+        progress = Progress(self.stdout, "miniaturas", len(jobs))
+        stats = {"generated": 0, "existing": 0, "failed": 0}
+        start = time.monotonic()
+
+        def save():
+            checkpoint.write_text(json.dumps(done, indent=2, sort_keys=True))
+
+        try:
+            for i, (job, generated, existing, error) in enumerate(self.run(jobs, opts["workers"]), 1):
+                stats["generated"] += generated
+                stats["existing"] += existing
+                if error:
+                    stats["failed"] += 1
+                    self.stderr.write(f"\n{job.target} #{job.pk} ({job.name}): {error}")
+                # Resultados en orden (imap): el pk es el último completado de su destino.
+                done[job.target] = job.pk
+                progress.update()
+                if i % opts["checkpoint_every"] == 0:
+                    save()
+        finally:
+            save()
+            progress.finish()
+
+        elapsed = max(time.monotonic() - start, 1e-6)
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(jobs)} archivos en {elapsed:.1f}s ({len(jobs) / elapsed:,.1f}/s): "
+            f"{stats['generated']} miniaturas generadas ({stats['generated'] / elapsed:,.1f}/s), "
+            f"{stats['existing']} ya existían, {stats['failed']} errores."
+        ))
+
+    def run(self, jobs, workers):
+        if workers <= 0 or len(jobs) < 2:
+            yield from map(thumbnails.warm, jobs)
+            return
+        import multiprocessing
+        # Las conexiones abiertas no deben heredarse en procesos hijos.
+        connections.close_all()
+        methods = multiprocessing.get_all_start_methods()
+        ctx = multiprocessing.get_context("fork" if "fork" in methods else None)
+        with ctx.Pool(workers) as pool:
+            yield from pool.imap(thumbnails.warm, jobs, chunksize=8)
@@ -0,0 +1,160 @@
+"""
+Archivos subidos (MEDIA_ROOT): nombres por contenido y servido eficiente.
+
+- `ContentAddressedStorage`: cada subida se guarda como `<nombre>.<sha256[:12]>.<ext>`.
+  El mismo contenido produce el mismo nombre (se reutiliza el archivo) y un
+  nombre nunca cambia de contenido, así que se puede cachear como inmutable.
+- `serve_media`: ETag fuerte, `Cache-Control` inmutable para nombres por
+  contenido, peticiones `Range` (206/416) y descarga delegada al servidor web
+  (`X-Accel-Redirect` de nginx o `X-Sendfile` de Apache/lighttpd) si
+  `MEDIA_SENDFILE` está configurado. Si no, `FileResponse` en streaming
+  (con `wsgi.file_wrapper`, el servidor WSGI usa sendfile()).
+"""
+import hashlib
+import mimetypes
+import os
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_etags
+from django.views.static import was_modified_since
+
+from .staticfiles import HASHED_NAME_RE
+
+ONE_YEAR = 365 * 24 * 3600
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+DIGEST_SUFFIX_RE = re.compile(r'\.[0-9a-f]{12}$')
+BLOCK_SIZE = 64 * 1024
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    digest_length = 12
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+
+        stem, ext = os.path.splitext(name)
+        stem = DIGEST_SUFFIX_RE.sub('', stem)  # si ya venía con hash, no se duplica
+        suffix = f'.{digest.hexdigest()[:self.digest_length]}{ext.lower()}'
+        if max_length and len(stem) + len(suffix) > max_length:
+            stem = stem[:max_length - len(suffix)]
+        name = stem + suffix
+        if self.exists(name):
+            return name  # mismo contenido ya guardado
+        return super().save(name, content, max_length=max_length)
+
+
+def is_content_addressed(name):
+    return bool(HASHED_NAME_RE.search(name))
+
+
+def _etag(path, stat):
+    # Nombre por contenido: el propio hash. Si no, tamaño + mtime en ns (cambia al reescribir).
+    match = HASHED_NAME_RE.search(path)
+    if match:
+        return '"%s"' % match.group(0).split('.')[1]
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def _parse_range(header, size):
+    """(inicio, fin) inclusivo de un único rango; None si se ignora; ValueError si no es satisfacible."""
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None  # multirango o sintaxis desconocida: se responde completo (RFC 9110)
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:  # sufijo: los últimos N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(BLOCK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def serve_media(request, path):
+    try:
+        full = Path(safe_join(settings.MEDIA_ROOT, path))
+    except SuspiciousFileOperation:
+        raise Http404('Ruta no válida')
+    if not full.is_file():
+        raise Http404('No existe')
+
+    stat = full.stat()
+    etag = _etag(path, stat)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': (
+            f'public, max-age={ONE_YEAR}, immutable' if is_content_addressed(path)
+            else f'public, max-age={getattr(settings, "MEDIA_MAX_AGE", 3600)}'
+        ),
+    }
+
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        tags = parse_etags(if_none_match)
+        if '*' in tags or etag in tags:
+            return HttpResponseNotModified(headers=headers)
+    elif not was_modified_since(request.headers.get('If-Modified-Since'), stat.st_mtime):
+        return HttpResponseNotModified(headers=headers)
+
+    content_type = mimetypes.guess_type(full.name)[0] or 'application/octet-stream'
+
+    # Descarga delegada: el servidor web manda el archivo (y resuelve él los Range).
+    mode = getattr(settings, 'MEDIA_SENDFILE', None)
+    if mode == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type, headers=headers)
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_PREFIX.rstrip('/') + '/' + path
+        return response
+    if mode == 'x-sendfile':
+        response = HttpResponse(content_type=content_type, headers=headers)
+        response['X-Sendfile'] = str(full)
+        return response
+
+    range_header = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    if range_header and (not if_range or if_range == etag):
+        try:
+            byte_range = _parse_range(range_header, stat.st_size)
+        except ValueError:
+            response = HttpResponse(status=416, headers=headers)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+        if byte_range:
+            start, end = byte_range
+            length = end - start + 1
+            response = StreamingHttpResponse(
+                _read_range(full, start, length), status=206, content_type=content_type, headers=headers,
+            )
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+            response['Content-Length'] = str(length)
+            return response
+
+    return FileResponse(full.open('rb'), content_type=content_type, headers=headers)
@@ -0,0 +1,77 @@
+"""
+Menciones (@usuario) resueltas al escribir.
+
+- `prepare(objs)`: busca las menciones de varios tweets/comentarios y resuelve
+  todos los nombres en una sola consulta `username IN (...)`. Guarda en
+  `mention_spans` las posiciones `[inicio, fin]` de las que son usuarios reales:
+  `linkify` (core/templatetags/extras.py) las enlaza sin regex ni consultas.
+- `record(obj, mentioned)`: filas `Mention` (índice por usuario: "publicaciones
+  que me mencionan" sin `LIKE '%@nombre%'`) y notificaciones, ambas en bloque.
+"""
+import re
+
+from django.contrib.auth.models import User
+
+from .models import Comment, Mention, Notification
+from .writequeue import run_write
+
+# Letras, dígitos, '.', '_' y '-' (los nombres de usuario de Django sin '@' ni '+').
+MENTION_RE = re.compile(r'(?<![\w@])@([\w.-]+)')
+VERB = 'te mencionó'
+
+
+def parse(text):
+    """[(inicio, fin, nombre)] de cada `@nombre` de `text` (sin el punto final de una frase)."""
+    found = []
+    for m in MENTION_RE.finditer(text or ''):
+        name = m.group(1).rstrip('.-')
+        if name:
+            found.append((m.start(), m.start() + 1 + len(name), name))
+    return found
+
+
+def prepare(objs):
+    """
+    Rellena `mention_spans` de cada objeto (tweet o comentario) con una consulta en total.
+    Devuelve {id(obj): [user_id, ...]} para pasárselo a `record` tras guardar.
+    """
+    parsed = {id(obj): parse(obj.content) for obj in objs}
+    names = {name for found in parsed.values() for _, _, name in found}
+    users = dict(User.objects.filter(username__in=names).values_list('username', 'id')) if names else {}
+    mentioned = {}
+    for obj in objs:
+        spans, ids = [], []
+        for start, end, name in parsed[id(obj)]:
+            if name in users:
+                spans.append([start, end])
+                if users[name] not in ids:
+                    ids.append(users[name])
+        obj.mention_spans = spans
+        mentioned[id(obj)] = ids
+    return mentioned
+
+
+def rows_for(obj, user_ids):
+    tweet_id = obj.tweet_id if isinstance(obj, Comment) else obj.pk
+    comment_id = obj.pk if isinstance(obj, Comment) else None
+    return [
+        Mention(user_id=uid, tweet_id=tweet_id, comment_id=comment_id, created_at=obj.created_at)
+        for uid in user_ids
+    ]
+
+
+def record(obj, user_ids, notify=True):
+    """Guarda las menciones de `obj` (ya guardado) y avisa a los mencionados, salvo al autor."""
+    if not user_ids:
+        return
+    Mention.objects.bulk_create(rows_for(obj, user_ids), ignore_conflicts=True)
+    if not notify:
+        return
+    tweet_id = obj.tweet_id if isinstance(obj, Comment) else obj.pk
+    notifications = [
+        Notification(actor_id=obj.user_id, recipient_id=uid, verb=VERB, tweet_id=tweet_id)
+        for uid in user_ids if uid != obj.user_id
+    ]
+    if notifications:
+        # Como `_create_notification`: con la cola de escrituras activa se agrupa con otras.
+        run_write(Notification.objects.bulk_create, notifications, wait=False)
@@ -0,0 +1,216 @@
+"""
+Métricas de rendimiento en memoria del proceso.
+
+- `Histogram` / `Counter`: series con etiquetas, seguras entre hilos.
+- `timed(kind)`: suma la duración de un bloque al colector de la petición
+  activa (si la hay); lo usa `PerformanceMiddleware` para separar tiempo de
+  plantillas ("template") y de HTTP saliente ("http").
+- `metrics_view`: exporta todo en formato de texto de Prometheus.
+
+Cada proceso (worker de gunicorn/uvicorn) tiene su propio registro; el
+scraper de Prometheus debe apuntar a cada worker o agregarse aguas arriba.
+"""
+import bisect
+import hmac
+import ipaddress
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+# Segundos: de 1 ms a 10 s.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+
+
+def _label_str(names, values):
+    if not names:
+        return ""
+    parts = []
+    for n, v in zip(names, values):
+        v = str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{n}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for lv, value in items:
+            lines.append(f"{self.name}{_label_str(self.labels, lv)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            i = bisect.bisect_left(self.buckets, value)
+            if i < len(self.buckets):
+                series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((lv, (list(s[0]), s[1], s[2])) for lv, s in self._series.items())
+        names = self.labels + ("le",)
+        for lv, (counts, total, n) in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets, counts):
+                cumulative += c
+                lines.append(f"{self.name}_bucket{_label_str(names, lv + (bound,))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_label_str(names, lv + ('+Inf',))} {n}")
+            lines.append(f"{self.name}_sum{_label_str(self.labels, lv)} {total:.6f}")
+            lines.append(f"{self.name}_count{_label_str(self.labels, lv)} {n}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for m in self.metrics:
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.register(Counter(
+    "twittor_requests_total", "Peticiones atendidas (todas, muestreadas o no).", ("view", "status")))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "twittor_request_seconds", "Tiempo total por vista (muestreado).", ("view",)))
+DB_SECONDS = REGISTRY.register(Histogram(
+    "twittor_db_seconds", "Tiempo en SQL por petición (muestreado).", ("view",)))
+DB_QUERIES = REGISTRY.register(Histogram(
+    "twittor_db_queries", "Consultas SQL por petición (muestreado).", ("view",), buckets=QUERY_BUCKETS))
+TEMPLATE_SECONDS = REGISTRY.register(Histogram(
+    "twittor_template_seconds", "Tiempo de renderizado de plantillas por petición (muestreado).", ("view",)))
+HTTP_SECONDS = REGISTRY.register(Histogram(
+    "twittor_outbound_http_seconds", "Tiempo en HTTP saliente (vistas previas de enlaces) por petición (muestreado).", ("view",)))
+WRITE_FAILURES = REGISTRY.register(Counter(
+    "twittor_write_failures_total", "Escrituras sin espera (`run_write(wait=False)`) que fallaron.", ("op",)))
+
+
+# ------------------------------------------------------------- colector por petición
+
+_current = ContextVar("twittor_perf_timings", default=None)
+
+
+class Timings(dict):
+    """Segundos acumulados por tipo ("template", "http", ...) en la petición actual."""
+
+    def add(self, kind, seconds):
+        self[kind] = self.get(kind, 0.0) + seconds
+
+
+@contextmanager
+def collect():
+    timings = Timings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timed(kind):
+    """Suma la duración del bloque al colector activo. Sin colector, coste casi nulo."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(kind, time.perf_counter() - start)
+
+
+_installed = False
+
+
+def install_template_timer():
+    """Envuelve `Template.render` del backend de Django para medir el renderizado.
+
+    Solo se cuenta el render de nivel superior (el de `render()`/`render_to_string`);
+    los `{% include %}` quedan dentro de ese tiempo.
+    """
+    global _installed
+    if _installed:
+        return
+    from django.template.backends.django import Template
+
+    original = Template.render
+
+    @wraps(original)
+    def render(self, context=None, request=None):
+        with timed("template"):
+            return original(self, context, request)
+
+    Template.render = render
+    _installed = True
+
+
+# ------------------------------------------------------------------ exportación
+
+def _client_allowed(request):
+    """
+    Staff, `Authorization: Bearer <METRICS_TOKEN>` o una red de
+    `METRICS_ALLOWED_NETWORKS` (vacía por defecto: detrás de un proxy todo llega
+    desde 127.0.0.1, así que el loopback no sirve para distinguir a nadie).
+    """
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    token = getattr(settings, "METRICS_TOKEN", "")
+    scheme, _, given = request.META.get("HTTP_AUTHORIZATION", "").partition(" ")
+    if token and scheme.lower() == "bearer" and hmac.compare_digest(given.strip(), token):
+        return True
+    try:
+        ip = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return any(ip in ipaddress.ip_network(net) for net in getattr(settings, "METRICS_ALLOWED_NETWORKS", ()))
+
+
+def metrics_view(request):
+    """Exposición en formato de texto de Prometheus (ver `_client_allowed`)."""
+    if not _client_allowed(request):
+        return HttpResponseForbidden("Prohibido")
+    return HttpResponse(REGISTRY.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,274 @@
+import random
+import time
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.middleware.gzip import GZipMiddleware
+from django.utils.functional import SimpleLazyObject
+
+from . import auth, metrics, ratelimit
+from .db import request_routing
+from .querybudget import QueryRecorder
+
+
+class PerformanceMiddleware:
+    """
+    Mide cada petición muestreada: tiempo total, SQL (tiempo y número de
+    consultas), renderizado de plantillas y HTTP saliente. Alimenta los
+    histogramas de `core.metrics` y añade la cabecera `Server-Timing`.
+
+    `PERF_SAMPLE_RATE` (0..1) decide qué fracción se mide; el resto solo
+    incrementa el contador de peticiones, así el coste fijo es despreciable.
+
+    Funciona igual con WSGI y con ASGI (sin pasar las vistas async a un hilo).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, "PERF_SAMPLE_RATE", 1.0 if settings.DEBUG else 0.05)
+        metrics.install_template_timer()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def sampled(self):
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            response = self.get_response(request)
+            metrics.REQUESTS.inc(self.view_name(request), response.status_code)
+            return response
+
+        recorder = QueryRecorder(stacks=False)
+        start = time.perf_counter()
+        with metrics.collect() as timings, recorder.record():
+            response = self.get_response(request)
+        return self.finish(request, response, recorder, timings, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            response = await self.get_response(request)
+            metrics.REQUESTS.inc(self.view_name(request), response.status_code)
+            return response
+
+        recorder = QueryRecorder(stacks=False)
+        start = time.perf_counter()
+        with metrics.collect() as timings:
+            async with recorder.arecord():
+                response = await self.get_response(request)
+        return self.finish(request, response, recorder, timings, time.perf_counter() - start)
+
+    def finish(self, request, response, recorder, timings, total):
+        view = self.view_name(request)
+        db = recorder.time_ms / 1000
+        template = timings.get("template", 0.0)
+        http = timings.get("http", 0.0)
+        metrics.REQUESTS.inc(view, response.status_code)
+        metrics.REQUEST_SECONDS.observe(total, view)
+        metrics.DB_SECONDS.observe(db, view)
+        metrics.DB_QUERIES.observe(recorder.count, view)
+        metrics.TEMPLATE_SECONDS.observe(template, view)
+        if http:
+            metrics.HTTP_SECONDS.observe(http, view)
+
+        response["Server-Timing"] = ", ".join([
+            f"total;dur={total * 1000:.1f}",
+            f'db;dur={db * 1000:.1f};desc="{recorder.count} consultas"',
+            f"tpl;dur={template * 1000:.1f}",
+            f"http;dur={http * 1000:.1f}",
+        ])
+        return response
+
+    @staticmethod
+    def view_name(request):
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return "<sin_ruta>"
+        return match.view_name or f"{match.func.__module__}.{match.func.__qualname__}"
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Decide a qué base de datos van las lecturas de la petición (ver `core.db`).
+
+    Se fijan a la principal los métodos que escriben (POST, ...) y las peticiones
+    cuyo navegador escribió hace menos de `READ_YOUR_WRITES_SECONDS` (cookie con
+    la marca de tiempo). Si la petición escribe, se renueva la cookie: así el
+    autor ve su tweet nuevo en su timeline aunque la réplica vaya atrasada.
+    """
+
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.window = getattr(settings, "READ_YOUR_WRITES_SECONDS", 10)
+        self.cookie = getattr(settings, "READ_YOUR_WRITES_COOKIE", "twittor_rw")
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not getattr(settings, "DATABASE_REPLICAS", None):
+            return self.get_response(request)
+
+        unsafe = request.method not in self.SAFE_METHODS
+        with request_routing(pinned=unsafe or self.recently_wrote(request)) as wrote:
+            response = self.get_response(request)
+            self.remember_write(response, unsafe or wrote())
+        return response
+
+    async def __acall__(self, request):
+        if not getattr(settings, "DATABASE_REPLICAS", None):
+            return await self.get_response(request)
+
+        unsafe = request.method not in self.SAFE_METHODS
+        # ContextVar: sync_to_async copia el contexto al hilo del ORM y lo devuelve.
+        with request_routing(pinned=unsafe or self.recently_wrote(request)) as wrote:
+            response = await self.get_response(request)
+            self.remember_write(response, unsafe or wrote())
+        return response
+
+    def remember_write(self, response, wrote):
+        if wrote:
+            response.set_cookie(
+                self.cookie, f"{time.time():.0f}", max_age=self.window, httponly=True, samesite="Lax",
+            )
+
+    def recently_wrote(self, request):
+        try:
+            last = float(request.COOKIES[self.cookie])
+        except (KeyError, ValueError):
+            return False
+        return time.time() - last < self.window
+
+
+class AdmissionMiddleware:
+    """
+    Tope de peticiones en curso por proceso (`MAX_CONCURRENT_REQUESTS`, 0 = sin tope).
+    La que no cabe recibe un 503 con `Retry-After` al momento, sin hacer cola.
+    Va la primera: rechazar no cuesta ni sesión ni SQL. Ver `core.ratelimit`.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not ratelimit.admission.try_enter(ratelimit.max_concurrent()):
+            return ratelimit.overloaded()
+        try:
+            return self.get_response(request)
+        finally:
+            ratelimit.admission.leave()
+
+    async def __acall__(self, request):
+        if not ratelimit.admission.try_enter(ratelimit.max_concurrent()):
+            return ratelimit.overloaded()
+        try:
+            return await self.get_response(request)
+        finally:
+            ratelimit.admission.leave()
+
+
+class RateLimitMiddleware:
+    """
+    Límites de ritmo por usuario e IP según la clase del endpoint (likes, publicar,
+    buscar...): 429 con `Retry-After` al agotarse el cubo. Va después de
+    `AuthenticationMiddleware`; el usuario queda resuelto para la vista. Ver `core.ratelimit`.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        cls = self.endpoint_class(request)
+        if cls:
+            user_id = request.user.pk if request.user.is_authenticated else None
+            wait = ratelimit.check(cls, ratelimit.client_ip(request), user_id)
+            if wait:
+                return ratelimit.too_many(request, wait, cls)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        cls = self.endpoint_class(request)
+        if cls:
+            user = await request.auser()
+            user_id = user.pk if user.is_authenticated else None
+            if getattr(settings, "RATE_LIMIT_CACHE", None):
+                wait = await sync_to_async(ratelimit.check)(cls, ratelimit.client_ip(request), user_id)
+            else:
+                wait = ratelimit.check(cls, ratelimit.client_ip(request), user_id)
+            if wait:
+                return ratelimit.too_many(request, wait, cls)
+        return await self.get_response(request)
+
+    @staticmethod
+    def endpoint_class(request):
+        if not getattr(settings, "RATE_LIMIT_ENABLED", True):
+            return None
+        return ratelimit.endpoint_class(request)
+
+
+def _user(request):
+    if not hasattr(request, "_cached_user"):
+        request._cached_user = auth.get_user(request)
+    return request._cached_user
+
+
+async def _auser(request):
+    if not hasattr(request, "_acached_user"):
+        request._acached_user = await auth.aget_user(request)
+    return request._acached_user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """
+    `AuthenticationMiddleware` que resuelve `request.user` (y `auser()`) desde la
+    caché: ni consulta de usuario ni de perfil mientras la entrada siga viva y el
+    hash de la sesión coincida. Ver `core.auth`.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: _user(request))
+        request.auser = partial(_auser, request)
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    GZip negociado (`Accept-Encoding`) solo para respuestas de texto: HTML, JSON,
+    CSS/JS. Las imágenes ya van comprimidas y las respuestas parciales (206) o
+    precomprimidas (`Content-Encoding`) se dejan intactas.
+    """
+
+    COMPRESSIBLE_TYPES = (
+        "text/", "application/json", "application/javascript", "application/xml", "image/svg+xml",
+    )
+
+    def process_response(self, request, response):
+        if response.status_code == 206 or not response.get("Content-Type", "").startswith(self.COMPRESSIBLE_TYPES):
+            return response
+        return super().process_response(request, response)
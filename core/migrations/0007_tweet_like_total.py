@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:54
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_like_total(apps, schema_editor):
+    Tweet = apps.get_model('core', 'Tweet')
+    Like = apps.get_model('core', 'Like')
+    counts = Like.objects.filter(tweet=OuterRef('pk')).values('tweet').annotate(c=Count('*')).values('c')
+    Tweet.objects.update(like_total=Coalesce(Subquery(counts), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tweet',
+            name='like_total',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_like_total, migrations.RunPython.noop),
+    ]
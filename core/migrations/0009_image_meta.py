@@ -0,0 +1,97 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:09
+
+from django.db import migrations, models
+
+IMAGE_FIELDS = [('UserProfile', 'avatar'), ('Tweet', 'image'), ('TweetImage', 'image'), ('ArchivedTweet', 'image')]
+
+
+def backfill_image_meta(apps, schema_editor):
+    from django.core.files.storage import default_storage
+
+    from core.imagemeta import meta_fields, probe
+
+    for model_name, field in IMAGE_FIELDS:
+        model = apps.get_model('core', model_name)
+        changed = []
+        for obj in model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True}).only('pk', field):
+            try:
+                with default_storage.open(getattr(obj, field).name) as f:
+                    meta = probe(f)
+            except OSError:
+                meta = None  # archivo perdido: se pinta sin metadatos
+            if meta:
+                for name, value in zip(meta_fields(field), meta):
+                    setattr(obj, name, value)
+                changed.append(obj)
+        model.objects.bulk_update(changed, meta_fields(field), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_userprofile_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedtweet',
+            name='image_color',
+            field=models.CharField(blank=True, max_length=7),
+        ),
+        migrations.AddField(
+            model_name='archivedtweet',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedtweet',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tweet',
+            name='image_color',
+            field=models.CharField(blank=True, editable=False, max_length=7),
+        ),
+        migrations.AddField(
+            model_name='tweet',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='tweet',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='tweetimage',
+            name='image_color',
+            field=models.CharField(blank=True, editable=False, max_length=7),
+        ),
+        migrations.AddField(
+            model_name='tweetimage',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='tweetimage',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='avatar_color',
+            field=models.CharField(blank=True, editable=False, max_length=7),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='avatar_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='avatar_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_image_meta, migrations.RunPython.noop),
+    ]
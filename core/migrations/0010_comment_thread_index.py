@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_image_meta'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['tweet', 'created_at', 'id'], name='core_commen_tweet_i_dd2a78_idx'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+
+def backfill_mentions(apps, schema_editor):
+    """Menciones de lo ya publicado (sin notificaciones)."""
+    from core.mentions import parse
+
+    User = apps.get_model('auth', 'User')
+    Tweet = apps.get_model('core', 'Tweet')
+    Comment = apps.get_model('core', 'Comment')
+    Mention = apps.get_model('core', 'Mention')
+    for model, is_comment in ((Tweet, False), (Comment, True)):
+        fields = ['pk', 'content', 'created_at'] + (['tweet_id'] if is_comment else [])
+        objs = list(model.objects.filter(content__contains='@').only(*fields))
+        parsed = {obj.pk: parse(obj.content) for obj in objs}
+        names = {name for found in parsed.values() for _, _, name in found}
+        users = dict(User.objects.filter(username__in=names).values_list('username', 'id'))
+        rows = []
+        for obj in objs:
+            obj.mention_spans = [[a, b] for a, b, name in parsed[obj.pk] if name in users]
+            for uid in {users[name] for _, _, name in parsed[obj.pk] if name in users}:
+                rows.append(Mention(
+                    user_id=uid, tweet_id=obj.tweet_id if is_comment else obj.pk,
+                    comment_id=obj.pk if is_comment else None, created_at=obj.created_at,
+                ))
+        model.objects.bulk_update(objs, ['mention_spans'], batch_size=500)
+        Mention.objects.bulk_create(rows, batch_size=500, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_comment_thread_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedtweet',
+            name='mention_spans',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='mention_spans',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tweet',
+            name='mention_spans',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.CreateModel(
+            name='Mention',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('comment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='mentions', to='core.comment')),
+                ('tweet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mentions', to='core.tweet')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mentions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-created_at'], name='core_mentio_user_id_0a065c_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('comment__isnull', True)), fields=('user', 'tweet'), name='mention_once_per_tweet'), models.UniqueConstraint(condition=models.Q(('comment__isnull', False)), fields=('user', 'comment'), name='mention_once_per_comment')],
+            },
+        ),
+        migrations.RunPython(backfill_mentions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_mentions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExploreRank',
+            fields=[
+                ('rank', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('score', models.FloatField()),
+                ('computed_at', models.DateTimeField()),
+                ('tweet', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='explore_rank', to='core.tweet')),
+            ],
+            options={
+                'ordering': ['rank'],
+            },
+        ),
+    ]
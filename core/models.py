@@ -8,7 +8,12 @@ class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     bio = models.CharField(max_length=180, blank=True)
     avatar = models.ImageField(upload_to='avatars/', blank=True, null=True)
+    # Metadatos leídos al subir (core/imagemeta.py): el render no abre el archivo.
+    avatar_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    avatar_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    avatar_color = models.CharField(max_length=7, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # validador de GET condicional (core/conditional.py)
 
     def __str__(self):
         return f'Perfil de {self.user.username}'
@@ -36,6 +41,9 @@ class Tweet(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     content = models.CharField(max_length=280)
     image = models.ImageField(upload_to='tweets/', blank=True, null=True)
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_color = models.CharField(max_length=7, blank=True, editable=False)
 
     # 🔗 NUEVO: relación con LinkPreview (vista previa de enlaces)
     link_preview = models.ForeignKey(
@@ -48,6 +56,11 @@ class Tweet(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Contador desnormalizado de likes: lo recalcula core/likes.py tras cada escritura.
+    like_total = models.PositiveIntegerField(default=0, editable=False)
+    # Menciones a usuarios reales como [inicio, fin] en `content` (core/mentions.py).
+    mention_spans = models.JSONField(default=list, blank=True, editable=False)
+
     class Meta:
         ordering = ['-created_at']
 
@@ -59,7 +72,8 @@ class Tweet(models.Model):
 
     @property
     def like_count(self) -> int:
-        return self.likes.count()
+        # El contador desnormalizado: ni COUNT por tweet ni agregado en los feeds.
+        return self.like_total
 
 class Like(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -77,11 +91,50 @@ class Comment(models.Model):
     tweet = models.ForeignKey(Tweet, on_delete=models.CASCADE, related_name='comments')
     content = models.CharField(max_length=280)
     created_at = models.DateTimeField(auto_now_add=True)
+    mention_spans = models.JSONField(default=list, blank=True, editable=False)
+
+    class Meta:
+        # Paginación por keyset de las respuestas (core/threads.py).
+        indexes = [models.Index(fields=['tweet', 'created_at', 'id'])]
 
     def __str__(self):
         return f'Coment de {self.user.username} en {self.tweet_id}'
 
 
+class Mention(models.Model):
+    """`@usuario` en un tweet (o en un comentario de ese tweet), resuelto al escribir."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='mentions')
+    tweet = models.ForeignKey(Tweet, on_delete=models.CASCADE, related_name='mentions')
+    comment = models.ForeignKey(Comment, on_delete=models.CASCADE, null=True, blank=True, related_name='mentions')
+    created_at = models.DateTimeField()  # la del tweet/comentario
+
+    class Meta:
+        indexes = [models.Index(fields=['user', '-created_at'])]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'tweet'], condition=models.Q(comment__isnull=True),
+                                    name='mention_once_per_tweet'),
+            models.UniqueConstraint(fields=['user', 'comment'], condition=models.Q(comment__isnull=False),
+                                    name='mention_once_per_comment'),
+        ]
+
+    def __str__(self):
+        return f'@{self.user_id} en {self.tweet_id}'
+
+
+class ExploreRank(models.Model):
+    """Posición de un tweet en `explore`, precalculada por `manage.py rank_explore` (core/explore.py)."""
+    rank = models.PositiveIntegerField(primary_key=True)  # 1 = primero
+    tweet = models.OneToOneField(Tweet, on_delete=models.CASCADE, related_name='explore_rank')
+    score = models.FloatField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['rank']
+
+    def __str__(self):
+        return f'#{self.rank}: {self.tweet_id}'
+
+
 class Notification(models.Model):
     actor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications_sent')
     recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
@@ -118,17 +171,11 @@ from django.core.validators import FileExtensionValidator
 from django.core.exceptions import ValidationError
 
 def validate_image_size(image):
-    """Valida que la imagen no supere 5 MB."""
-    max_size = 5 * 1024 * 1024  # 5 MB
-    if image.size > max_size:
-        raise ValidationError("La imagen no debe superar los 5 MB.")
-
-
-def validate_image_size(image):
-    """Valida que la imagen no supere 10 MB."""
-    max_size = 10 * 1024 * 1024  # 10 MB
+    """Valida que la imagen no supere MAX_UPLOAD_IMAGE_SIZE (10 MB)."""
+    from django.conf import settings
+    max_size = getattr(settings, 'MAX_UPLOAD_IMAGE_SIZE', 10 * 1024 * 1024)
     if image.size > max_size:
-        raise ValidationError("La imagen no debe superar los 10 MB.")
+        raise ValidationError(f"La imagen no debe superar los {max_size // (1024 * 1024)} MB.")
 
 
 class TweetImage(models.Model):
@@ -141,6 +188,86 @@ class TweetImage(models.Model):
         ]
     )
     cropping = ImageRatioField('image', '500x500')  # ✅ campo aparte, fuera del ImageField
+    image_width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    image_color = models.CharField(max_length=7, blank=True, editable=False)
+
+    def __str__(self):
+        return f"Imagen de {self.tweet.user.username} ({self.tweet.id})"
+
+# ========================= ARCHIVO =========================
+# Filas movidas por `manage.py archive` (ver core/archive.py). Conservan el id
+# original, así las URLs de los tweets archivados siguen funcionando.
+
+class ArchivedTweet(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_tweets')
+    parent_id = models.BigIntegerField(null=True, blank=True)
+    is_retweet = models.BooleanField(default=False)
+    content = models.CharField(max_length=280)
+    image = models.ImageField(upload_to='tweets/', blank=True, null=True)
+    image_width = models.PositiveIntegerField(null=True, blank=True)
+    image_height = models.PositiveIntegerField(null=True, blank=True)
+    image_color = models.CharField(max_length=7, blank=True)
+    mention_spans = models.JSONField(default=list, blank=True)
+    images = models.JSONField(default=list, blank=True)      # rutas de TweetImage
+    comments = models.JSONField(default=list, blank=True)    # [{user_id, content, created_at}]
+    link_preview = models.ForeignKey(
+        LinkPreview, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    like_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    is_archived = True
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['user', '-created_at'])]
 
     def __str__(self):
-        return f"Imagen de {self.tweet.user.username} ({self.tweet.id})"
\ No newline at end of file
+        return f'{self.user.username}: {self.content[:30]} (archivado)'
+
+    def get_absolute_url(self):
+        return reverse('tweet_detail', args=[self.pk])
+
+    @property
+    def parent(self):
+        if self.parent_id is None:
+            return None
+        return (
+            Tweet.objects.select_related('user').filter(pk=self.parent_id).first()
+            or ArchivedTweet.objects.select_related('user').filter(pk=self.parent_id).first()
+        )
+
+    def comment_list(self):
+        """Comentarios como instancias de `Comment` sin guardar (para las plantillas)."""
+        from django.utils.dateparse import parse_datetime
+
+        users = User.objects.select_related('userprofile').in_bulk({c['user_id'] for c in self.comments})
+        return [
+            Comment(user=users[c['user_id']], content=c['content'], created_at=parse_datetime(c['created_at']))
+            for c in self.comments
+            if c['user_id'] in users
+        ]
+
+
+class ArchivedLike(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    tweet_id = models.BigIntegerField(db_index=True)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('user', 'tweet_id')
+
+
+class ArchivedNotification(models.Model):
+    actor = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_notifications')
+    verb = models.CharField(max_length=80)
+    tweet_id = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(db_index=True)
+    read = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ['-created_at']
@@ -0,0 +1,207 @@
+"""
+Presupuestos de consultas SQL por petición.
+
+- `QueryRecorder`: registra cada consulta (SQL, duración y lugar de origen)
+  mediante `connection.execute_wrapper`, sin depender de DEBUG.
+- `assert_query_budget(...)`: context manager que falla con un informe
+  agrupado por SQL normalizado si se supera el presupuesto.
+- `@query_budget(queries=..., time_ms=...)`: declara el presupuesto de una
+  vista (síncrona o async). Según `settings.QUERY_BUDGET_MODE` ("off", "warn" o "raise") solo lo
+  anota, lo registra en el log o lanza `QueryBudgetExceeded`.
+
+El fixture de pytest `query_budget` (core/tests/conftest.py) envuelve
+`assert_query_budget` para los tests.
+"""
+import logging
+import re
+import sys
+import time
+from collections import defaultdict
+from contextlib import ExitStack, asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from functools import wraps
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = str(Path(settings.BASE_DIR).resolve())
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN \((?:\s*(?:\?|%s)\s*,?)+\)", re.IGNORECASE)
+
+
+def normalize_sql(sql):
+    """SQL sin literales: `WHERE id = 7` y `WHERE id = 8` caen en el mismo grupo."""
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("IN (...)", sql)
+    return " ".join(sql.split())
+
+
+def call_site(limit=4):
+    """Marcos del proyecto (y nodos de plantilla) que originaron la consulta."""
+    sites = []
+    frame = sys._getframe(2)
+    while frame is not None and len(sites) < limit:
+        # Solo se inspecciona `self` en Node.render_annotated: hacer getattr sobre
+        # objetos perezosos (request.user) podría disparar otra consulta.
+        if frame.f_code.co_name == "render_annotated":
+            node = frame.f_locals.get("self")
+            token = getattr(node, "token", None)
+            origin = getattr(node, "origin", None)
+            if token is not None and origin is not None:
+                site = f"{origin.template_name}:{token.lineno} {{% {token.contents[:40]} %}}"
+                if not sites or sites[-1] != site:
+                    sites.append(site)
+        else:
+            filename = frame.f_code.co_filename
+            if filename.startswith(PROJECT_ROOT) and "site-packages" not in filename and filename != __file__:
+                sites.append(f"{Path(filename).relative_to(PROJECT_ROOT)}:{frame.f_lineno} {frame.f_code.co_name}")
+        frame = frame.f_back
+    return tuple(sites)
+
+
+class QueryRecorder:
+    """`execute_wrapper` que acumula (sql, ms, call_site) de cada consulta."""
+
+    def __init__(self, stacks=True):
+        self.stacks = stacks
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.queries.append((sql, elapsed, call_site() if self.stacks else ()))
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def time_ms(self):
+        return sum(q[1] for q in self.queries)
+
+    @contextmanager
+    def record(self, using=None):
+        aliases = [using] if using else list(connections)
+        with _wrap_all(self, aliases):
+            yield self
+
+    @asynccontextmanager
+    async def arecord(self, using=None):
+        """`record` para código async: el ORM async consulta desde el hilo de `sync_to_async`."""
+        stack = ExitStack()
+        await sync_to_async(stack.enter_context)(self.record(using))
+        try:
+            yield self
+        finally:
+            await sync_to_async(stack.close)()
+
+    def report(self, top=10):
+        """Informe legible agrupado por SQL normalizado (los grupos más repetidos primero)."""
+        groups = defaultdict(lambda: {"count": 0, "ms": 0.0, "sites": defaultdict(int)})
+        for sql, ms, sites in self.queries:
+            g = groups[normalize_sql(sql)]
+            g["count"] += 1
+            g["ms"] += ms
+            g["sites"][sites] += 1
+        lines = [f"{self.count} consultas, {self.time_ms:.1f} ms de SQL"]
+        ordered = sorted(groups.items(), key=lambda kv: (-kv[1]["count"], -kv[1]["ms"]))
+        for sql, g in ordered[:top]:
+            lines.append(f"  {g['count']}× ({g['ms']:.1f} ms) {sql[:300]}")
+            for sites, n in sorted(g["sites"].items(), key=lambda kv: -kv[1])[:3]:
+                where = " ← ".join(sites) or "(fuera del proyecto)"
+                lines.append(f"      {n}× {where}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def _wrap_all(wrapper, aliases):
+    if not aliases:
+        yield
+        return
+    with connections[aliases[0]].execute_wrapper(wrapper):
+        with _wrap_all(wrapper, aliases[1:]):
+            yield
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@dataclass(frozen=True)
+class Budget:
+    queries: int = None
+    time_ms: float = None
+
+    def violations(self, recorder):
+        out = []
+        if self.queries is not None and recorder.count > self.queries:
+            out.append(f"{recorder.count} consultas > presupuesto {self.queries}")
+        if self.time_ms is not None and recorder.time_ms > self.time_ms:
+            out.append(f"{recorder.time_ms:.1f} ms de SQL > presupuesto {self.time_ms} ms")
+        return out
+
+
+@contextmanager
+def assert_query_budget(queries=None, time_ms=None, label="bloque"):
+    """Falla con `QueryBudgetExceeded` si el bloque supera el presupuesto."""
+    budget = Budget(queries, time_ms)
+    recorder = QueryRecorder()
+    with recorder.record():
+        yield recorder
+    problems = budget.violations(recorder)
+    if problems:
+        raise QueryBudgetExceeded(f"{label}: {'; '.join(problems)}\n{recorder.report()}")
+
+
+def budget_mode():
+    return getattr(settings, "QUERY_BUDGET_MODE", "warn" if settings.DEBUG else "off")
+
+
+def query_budget(queries=None, time_ms=None):
+    """Declara el presupuesto de consultas de una vista (ver docstring del módulo)."""
+    budget = Budget(queries, time_ms)
+
+    def check(request, view, recorder):
+        problems = budget.violations(recorder)
+        if problems:
+            msg = f"{request.method} {request.path} ({view.__name__}): {'; '.join(problems)}\n{recorder.report()}"
+            if budget_mode() == "raise":
+                raise QueryBudgetExceeded(msg)
+            logger.warning(msg)
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def wrapped(request, *args, **kwargs):
+                if budget_mode() == "off":
+                    return await view(request, *args, **kwargs)
+                recorder = QueryRecorder()
+                async with recorder.arecord():
+                    response = await view(request, *args, **kwargs)
+                check(request, view, recorder)
+                return response
+        else:
+            @wraps(view)
+            def wrapped(request, *args, **kwargs):
+                if budget_mode() == "off":
+                    return view(request, *args, **kwargs)
+                recorder = QueryRecorder()
+                with recorder.record():
+                    response = view(request, *args, **kwargs)
+                check(request, view, recorder)
+                return response
+
+        wrapped.query_budget = budget
+        return wrapped
+
+    return decorator
@@ -0,0 +1,216 @@
+"""
+Control de admisión: límites de ritmo por usuario e IP y tope de peticiones en curso.
+
+- Cada clase de endpoint (`CLASSES`: likes, publicar, buscar, autocompletar, login /
+  registro) tiene un cubo de fichas por usuario y otro por IP, con límites como
+  `"60/m"`: 60 peticiones seguidas y luego una cada segundo. Al agotarse, 429 con
+  `Retry-After`. Se ajustan en `RATE_LIMITS`.
+- El cubo se guarda como un solo número (GCRA: instante teórico de la siguiente
+  petición), en memoria del proceso o, con `RATE_LIMIT_CACHE`, en una caché de
+  Django compartida entre workers (p. ej. Redis). En la caché la lectura y la
+  escritura no son atómicas: ante carreras puede colarse alguna petición de más.
+- `MAX_CONCURRENT_REQUESTS` limita las peticiones en curso por proceso: la que
+  sobra recibe un 503 al momento (con `Retry-After`) en vez de esperar en cola,
+  así la latencia del resto no crece sin límite.
+
+Los middlewares están en core/middleware.py (`AdmissionMiddleware`,
+`RateLimitMiddleware`).
+"""
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, JsonResponse
+from django.urls import Resolver404, resolve
+
+from . import metrics
+
+UNSAFE = frozenset({'POST', 'PUT', 'PATCH', 'DELETE'})
+SAFE = frozenset({'GET', 'HEAD'})
+
+# clase → (nombres de URL, métodos a los que se aplica)
+CLASSES = {
+    'like': ({'like_toggle', 'api_like', 'api_likes_batch'}, UNSAFE),
+    # Publicar puede disparar la descarga de la vista previa de un enlace.
+    'post': ({'timeline', 'quote', 'tweet_detail', 'retweet', 'profile'}, UNSAFE),
+    'search': ({'search', 'tag'}, SAFE),
+    'autocomplete': ({'api_autocomplete'}, SAFE),
+    'auth': ({'login', 'signup'}, UNSAFE),
+}
+
+DEFAULT_LIMITS = {
+    'like': {'user': '120/m', 'ip': '600/m'},
+    'post': {'user': '20/m', 'ip': '60/m'},
+    'search': {'user': '30/m', 'ip': '120/m'},
+    'autocomplete': {'user': '120/m', 'ip': '600/m'},
+    'auth': {'ip': '10/m'},
+}
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+MAX_MEMORY_KEYS = 100_000
+
+REJECTED = metrics.REGISTRY.register(metrics.Counter(
+    "twittor_requests_rejected_total", "Peticiones rechazadas por el control de admisión.", ("reason",)))
+
+
+@lru_cache(maxsize=None)
+def parse_limit(limit):
+    """`"60/m"` → (60, 60.0): peticiones y periodo en segundos."""
+    count, _, period = limit.partition('/')
+    return int(count), float(PERIODS[period] if period in PERIODS else period)
+
+
+def limits_for(cls):
+    return {**DEFAULT_LIMITS.get(cls, {}), **getattr(settings, 'RATE_LIMITS', {}).get(cls, {})}
+
+
+def endpoint_class(request):
+    """Clase de límite de la petición (por nombre de URL y método) o None."""
+    try:
+        name = resolve(request.path_info).url_name
+    except Resolver404:
+        return None
+    for cls, (names, methods) in CLASSES.items():
+        if name in names and request.method in methods:
+            return cls
+    return None
+
+
+def client_ip(request):
+    """
+    IP del cliente. Tras un proxy (`RATE_LIMIT_IP_HEADER`), cada proxy añade a la
+    derecha la dirección de quien le habló y lo de la izquierda lo escribe el
+    cliente: se toma la entrada `RATE_LIMIT_TRUSTED_PROXIES` contando desde la
+    derecha. Si la cabecera trae menos entradas, la petición no pasó por todos
+    los proxies y vale `REMOTE_ADDR`.
+    """
+    header = getattr(settings, 'RATE_LIMIT_IP_HEADER', None)
+    if header and request.META.get(header):
+        hops = [h.strip() for h in request.META[header].split(',') if h.strip()]
+        trusted = max(getattr(settings, 'RATE_LIMIT_TRUSTED_PROXIES', 1), 1)
+        if len(hops) >= trusted:
+            return hops[-trusted]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+# ------------------------------------------------------------- cubos (GCRA)
+
+def gcra(tat, now, count, period):
+    """(nuevo_tat, segundos de espera). Espera 0 = se admite y hay que guardar `nuevo_tat`."""
+    interval = period / count
+    tat = max(tat or now, now) + interval
+    allow_at = tat - period
+    if now < allow_at:
+        return None, allow_at - now
+    return tat, 0.0
+
+
+class MemoryBackend:
+    def __init__(self):
+        self._tats = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key, count, period, now):
+        with self._lock:
+            tat, wait = gcra(self._tats.get(key), now, count, period)
+            if not wait:
+                self._tats[key] = tat
+                if len(self._tats) > MAX_MEMORY_KEYS:
+                    # Fuera los cubos ya llenos: equivalen a no tener entrada.
+                    self._tats = {k: t for k, t in self._tats.items() if t > now}
+            return wait
+
+    def clear(self):
+        with self._lock:
+            self._tats.clear()
+
+
+class CacheBackend:
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def hit(self, key, count, period, now):
+        tat, wait = gcra(self.cache.get(key), now, count, period)
+        if not wait:
+            self.cache.set(key, tat, timeout=int(period) + 1)
+        return wait
+
+    def clear(self):
+        pass
+
+
+_memory = MemoryBackend()
+
+
+def backend():
+    alias = getattr(settings, 'RATE_LIMIT_CACHE', None)
+    return CacheBackend(alias) if alias else _memory
+
+
+def check(cls, ip, user_id=None, now=None):
+    """Segundos que hay que esperar (0 si se admite). Se cobra en todos los cubos que admiten."""
+    now = time.time() if now is None else now
+    store = backend()
+    limits = limits_for(cls)
+    wait = 0.0
+    for scope, ident in (('user', user_id), ('ip', ip)):
+        if ident is None or ident == '' or scope not in limits:
+            continue
+        count, period = parse_limit(limits[scope])
+        wait = max(wait, store.hit(f'rl:{cls}:{scope}:{ident}', count, period, now))
+    return wait
+
+
+def too_many(request, wait, cls):
+    REJECTED.inc(f'rate:{cls}')
+    retry_after = str(max(1, int(wait + 0.999)))
+    message = 'Demasiadas peticiones: vuelve a intentarlo en unos segundos.'
+    if request.path_info.startswith('/api/'):
+        response = JsonResponse({'error': message, 'retry_after': int(retry_after)}, status=429)
+    else:
+        response = HttpResponse(message, status=429, content_type='text/plain; charset=utf-8')
+    response['Retry-After'] = retry_after
+    return response
+
+
+# ------------------------------------------------------------- peticiones en curso
+
+class Admission:
+    """Contador de peticiones en curso del proceso (hilos y bucle async)."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def try_enter(self, limit):
+        with self._lock:
+            if limit and self.in_flight >= limit:
+                return False
+            self.in_flight += 1
+            return True
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+
+admission = Admission()
+
+
+def max_concurrent():
+    return getattr(settings, 'MAX_CONCURRENT_REQUESTS', 0)
+
+
+def overloaded():
+    REJECTED.inc('overload')
+    response = HttpResponse('Servidor ocupado: vuelve a intentarlo en un momento.', status=503,
+                            content_type='text/plain; charset=utf-8')
+    response['Retry-After'] = str(getattr(settings, 'OVERLOAD_RETRY_AFTER', 1))
+    return response
+
+
+def reset():
+    """Vacía los cubos en memoria (tests)."""
+    _memory.clear()
@@ -0,0 +1,43 @@
+"""
+Sesiones en caché con escritura en la base de datos (`SESSION_ENGINE = 'core.sessions'`).
+
+Es el `cached_db` de Django: se lee de la caché y, si falta, de la tabla; cada
+cambio se escribe en las dos. La diferencia es que en la caché una sesión dura
+como mucho `SESSION_CACHE_SECONDS`. Con la caché local de cada proceso, un
+logout borra la sesión en la tabla y en la caché de ese worker; los demás la
+olvidan al vencer ese plazo. Con una caché compartida se puede subir.
+"""
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+
+class _BoundedCache:
+    """La caché de siempre, pero ningún `set` dura más de `ttl` segundos."""
+
+    def __init__(self, cache, ttl):
+        self._cache = cache
+        self._ttl = ttl
+
+    def _timeout(self, timeout):
+        return self._ttl if timeout is None else min(timeout, self._ttl)
+
+    def set(self, key, value, timeout=None, **kwargs):
+        return self._cache.set(key, value, self._timeout(timeout), **kwargs)
+
+    async def aset(self, key, value, timeout=None, **kwargs):
+        return await self._cache.aset(key, value, self._timeout(timeout), **kwargs)
+
+    def __contains__(self, key):
+        return key in self._cache
+
+    def __getattr__(self, name):
+        return getattr(self._cache, name)
+
+    def __str__(self):
+        return str(self._cache)
+
+
+class SessionStore(CachedDBStore):
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._cache = _BoundedCache(self._cache, getattr(settings, 'SESSION_CACHE_SECONDS', 60))
@@ -1,9 +1,92 @@
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
-from .models import UserProfile
+from .models import Follow, Tweet, TweetImage, UserProfile
 
 @receiver(post_save, sender=User)
 def create_profile(sender, instance, created, **kwargs):
     if created:
         UserProfile.objects.create(user=instance)
+
+
+# Campo de imagen de cada modelo con metadatos (core/imagemeta.py)
+IMAGE_FIELDS = {UserProfile: 'avatar', Tweet: 'image', TweetImage: 'image'}
+
+
+def fill_image_meta(sender, instance, **kwargs):
+    from .imagemeta import fill
+
+    field = IMAGE_FIELDS[sender]
+    fieldfile = getattr(instance, field)
+    # Solo archivos recién subidos (aún sin guardar en el storage): se leen de memoria.
+    if fieldfile and not fieldfile._committed:
+        fill(instance, field, fieldfile.file)
+        instance._image_uploaded = True
+    elif not fieldfile and getattr(instance, f'{field}_width') is not None:
+        fill(instance, field)
+
+
+def warm_uploaded_thumbnails(sender, instance, **kwargs):
+    # Las miniaturas de `{% lazy_img %}` existen antes del primer render.
+    if not instance.__dict__.pop('_image_uploaded', False):
+        return
+    if not getattr(settings, 'THUMBNAILS_ON_UPLOAD', True):
+        return
+    from .thumbnails import job_for, warm
+
+    job = job_for(instance)
+    if job is not None:
+        transaction.on_commit(lambda: warm(job))
+
+
+for model in IMAGE_FIELDS:
+    pre_save.connect(fill_image_meta, sender=model, dispatch_uid=f'image_meta.{model.__name__}')
+    post_save.connect(warm_uploaded_thumbnails, sender=model, dispatch_uid=f'image_thumbs.{model.__name__}')
+
+
+# Índices de autocompletado del proceso (core/autocomplete.py): solo si ya existen.
+
+@receiver(post_save, sender=User, dispatch_uid='autocomplete.user')
+def autocomplete_user(sender, instance, created, **kwargs):
+    if created and instance.is_active:
+        from .autocomplete import on_user_created
+        on_user_created(instance.pk, instance.username)
+
+
+@receiver(post_save, sender=Tweet, dispatch_uid='autocomplete.tweet')
+def autocomplete_tweet(sender, instance, created, **kwargs):
+    if created and not instance.is_retweet:
+        from .autocomplete import on_tweet_created
+        on_tweet_created(instance.content)
+
+
+@receiver(post_save, sender=Follow, dispatch_uid='autocomplete.follow')
+def autocomplete_follow(sender, instance, created, **kwargs):
+    if created:
+        from .autocomplete import on_follow
+        on_follow(instance.following_id, 1)
+
+
+@receiver(post_delete, sender=Follow, dispatch_uid='autocomplete.unfollow')
+def autocomplete_unfollow(sender, instance, **kwargs):
+    from .autocomplete import on_follow
+    on_follow(instance.following_id, -1)
+
+
+# Usuario + perfil en caché (core/auth.py): fuera al cambiar la contraseña, los datos
+# del usuario o su perfil. Se borra ya y otra vez al confirmar la transacción, por si
+# otra petición volvió a guardar la versión vieja entre medias.
+
+def invalidate_cached_user(sender, instance, **kwargs):
+    from .auth import invalidate
+
+    user_id = instance.pk if sender is User else instance.user_id
+    invalidate(user_id)
+    transaction.on_commit(lambda: invalidate(user_id))
+
+
+for model in (User, UserProfile):
+    post_save.connect(invalidate_cached_user, sender=model, dispatch_uid=f'auth_cache.save.{model.__name__}')
+    post_delete.connect(invalidate_cached_user, sender=model, dispatch_uid=f'auth_cache.delete.{model.__name__}')
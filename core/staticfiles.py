@@ -0,0 +1,100 @@
+"""
+Estáticos de producción: nombres con hash, variantes precomprimidas y caché larga.
+
+- `CompressedManifestStaticFilesStorage`: `collectstatic` escribe `app.<hash>.js`
+  (ManifestStaticFilesStorage) y, junto a cada archivo de texto, `.gz` y `.br`
+  (este último solo si está instalado el paquete opcional `brotli`).
+- `serve_static`: sirve STATIC_ROOT cuando no hay servidor delante (nginx con
+  `gzip_static`/`brotli_static` hace lo mismo): elige la variante según
+  `Accept-Encoding` y marca como inmutables los nombres con hash.
+"""
+import gzip
+import mimetypes
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:  # opcional: sin él solo se generan .gz
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.map', '.txt', '.xml', '.html')
+# ManifestStaticFilesStorage añade 12 hex antes de la extensión: app.3f9a1c2b4d5e.js
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+ONE_YEAR = 365 * 24 * 3600
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    min_size = 256
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for hashed in sorted(set(self.hashed_files.values())):
+            if hashed.endswith(COMPRESSIBLE_EXTENSIONS):
+                yield from self._compress(hashed)
+
+    def _compress(self, name):
+        path = Path(self.path(name))
+        data = path.read_bytes()
+        if len(data) < self.min_size:
+            return
+        variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(data, quality=11)))
+        for suffix, blob in variants:
+            # Solo si ahorra al menos un 5 %.
+            if len(blob) < len(data) * 0.95:
+                Path(f'{path}{suffix}').write_bytes(blob)
+                yield name, name + suffix, True
+
+
+def _encodings(request):
+    # El .br puede existir aunque este proceso no tenga `brotli` (collectstatic en otra máquina).
+    accept = request.headers.get('Accept-Encoding', '')
+    if re.search(r'\bbr\b', accept):
+        yield 'br', '.br'
+    if re.search(r'\bgzip\b', accept):
+        yield 'gzip', '.gz'
+
+
+def serve_static(request, path):
+    try:
+        full = Path(safe_join(settings.STATIC_ROOT, path))
+    except SuspiciousFileOperation:
+        raise Http404('Ruta no válida')
+    if not full.is_file():
+        raise Http404('No existe')
+
+    stat = full.stat()
+    if not was_modified_since(request.headers.get('If-Modified-Since'), stat.st_mtime):
+        return HttpResponseNotModified()
+
+    content_type = mimetypes.guess_type(full.name)[0] or 'application/octet-stream'
+    target, encoding = full, None
+    for enc, suffix in _encodings(request):
+        candidate = full.with_name(full.name + suffix)
+        if candidate.is_file():
+            target, encoding = candidate, enc
+            break
+
+    response = FileResponse(target.open('rb'), content_type=content_type)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    if HASHED_NAME_RE.search(path):
+        response['Cache-Control'] = f'public, max-age={ONE_YEAR}, immutable'
+    else:
+        response['Cache-Control'] = 'public, max-age=300'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
@@ -1,26 +1,46 @@
-
 from django import template
 import re
+from django.utils.html import escape, format_html
 from django.utils.safestring import mark_safe
 from django.urls import reverse
 
 register = template.Library()
 
 HASHTAG_RE = re.compile(r'(?P<tag>#\w+)')
-MENTION_RE = re.compile(r'(?P<at>@[A-Za-z0-9_\.\-]+)')
+LINK_CLASS = 'text-blue-600 hover:underline'
+
+
+def _hashtags(text):
+    html, pos = [], 0
+    for m in HASHTAG_RE.finditer(text):
+        tag = m.group('tag')[1:]
+        html.append(escape(text[pos:m.start()]))
+        html.append(format_html('<a class="{}" href="{}">#{}</a>', LINK_CLASS, reverse('tag', args=[tag]), tag))
+        pos = m.end()
+    html.append(escape(text[pos:]))
+    return ''.join(html)
+
 
 @register.filter
-def linkify(text: str):
+def linkify(text: str, spans=None):
+    """
+    Texto escapado con enlaces a hashtags y a las menciones de `spans`
+    (`[inicio, fin]` de usuarios reales, guardadas al escribir: core/mentions.py).
+    """
     if not text:
         return ''
-    def link_tag(m):
-        tag = m.group('tag')[1:]
-        url = reverse('tag', args=[tag])
-        return f'<a class="text-blue-600 hover:underline" href="{url}">#{tag}</a>'
-    def link_mention(m):
-        user = m.group('at')[1:]
-        url = reverse('profile', args=[user])
-        return f'<a class="text-blue-600 hover:underline" href="{url}">@{user}</a>'
-    html = HASHTAG_RE.sub(link_tag, text)
-    html = MENTION_RE.sub(link_mention, html)
-    return mark_safe(html)
+    html, pos = [], 0
+    for start, end in spans or ():
+        name = text[start + 1:end]
+        html.append(_hashtags(text[pos:start]))
+        html.append(format_html('<a class="{}" href="{}">@{}</a>', LINK_CLASS, reverse('profile', args=[name]), name))
+        pos = end
+    html.append(_hashtags(text[pos:]))
+    return mark_safe(''.join(html))
+
+
+@register.simple_tag
+def lazy_img(instance, field, css='', alt='', sizes='', eager=False):
+    """`<img>` con width/height, color de fondo, srcset y loading="lazy" (ver core/imagemeta.py)."""
+    from core.imagemeta import lazy_img as render
+    return render(instance, field, css=css, alt=alt, sizes=sizes, eager=eager)
@@ -16,3 +16,59 @@ def _temp_media(tmp_path):
     yield
     settings.MEDIA_ROOT = original_media
     shutil.rmtree(tmp_media, ignore_errors=True)
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Context manager que falla si el bloque supera el presupuesto de consultas:
+
+        with query_budget(queries=5, time_ms=50):
+            client.get(url)
+    """
+    from core.querybudget import assert_query_budget
+    return assert_query_budget
+
+
+@pytest.fixture(autouse=True)
+def _autocomplete_reset():
+    """Los índices de autocompletado viven en el proceso: cada test parte de cero."""
+    from core.autocomplete import reset
+    reset()
+    yield
+    reset()
+
+
+@pytest.fixture(autouse=True)
+def _ratelimit_reset():
+    """Cubos de límites en memoria del proceso: los ids de usuario se repiten entre tests."""
+    from core.ratelimit import reset
+    reset()
+    yield
+    reset()
+
+
+@pytest.fixture(autouse=True)
+def _cache_clear():
+    """Sesiones y usuarios en la caché local del proceso: los ids se repiten entre tests."""
+    from django.core.cache import caches
+    for cache in caches.all():
+        cache.clear()
+    yield
+
+
+_bench_tables = pytest.StashKey[list]()
+
+
+@pytest.fixture
+def bench_report(request):
+    """Guarda una tabla de `core.benchmarks` para el resumen final de pytest (sin print)."""
+    return request.config.stash.setdefault(_bench_tables, []).append
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    tables = config.stash.get(_bench_tables, [])
+    if tables:
+        terminalreporter.section("benchmarks")
+        for table in tables:
+            terminalreporter.write_line(table)
@@ -0,0 +1,116 @@
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core import api
+from core.models import Comment, ExploreRank, Follow, Like, Tweet
+
+
+@pytest.fixture
+def reader(client, django_user_model):
+    user = django_user_model.objects.create_user(username="lector")
+    client.force_login(user)
+    return user
+
+
+@pytest.fixture
+def tweets(reader, django_user_model):
+    authors = [django_user_model.objects.create_user(username=f"autor{i}") for i in range(3)]
+    for author in authors[:2]:
+        Follow.objects.create(follower=reader, following=author)
+    made = [Tweet.objects.create(user=authors[i % 3], content=f"tweet {i}") for i in range(30)]
+    Like.objects.create(user=reader, tweet=made[-2])  # el más reciente de los seguidos
+    return made
+
+
+def _pages(client, url, **params):
+    ids, after = [], None
+    while True:
+        body = client.get(url, {**params, **({"after": after} if after else {})}).json()
+        ids += [row["id"] for row in body["data"]]
+        after = body["next"]
+        if after is None:
+            return ids
+
+
+@pytest.mark.django_db
+def test_timeline_cursor_walks_every_tweet_once(client, tweets, reader):
+    expected = [t.pk for t in sorted(tweets, key=lambda t: (t.created_at, t.pk), reverse=True) if t.user.username != "autor2"]
+    assert _pages(client, reverse("api_timeline"), limit=7) == expected
+
+
+@pytest.mark.django_db
+def test_sparse_fields_skip_extra_queries(client, tweets):
+    url = reverse("api_timeline")
+    full = client.get(url, {"limit": 1}).json()["data"][0]
+    assert set(full) == {*api.FIELDS, *api.EXTRA_FIELDS}
+    assert (full["user"], full["liked"]) == ("autor1", True)
+
+    client.get(url)  # sesión y usuario en caché
+    with CaptureQueriesContext(connection) as ctx:
+        rows = client.get(url, {"fields": "id,content"}).json()["data"]
+    assert set(rows[0]) == {"id", "content"}
+    assert len(ctx.captured_queries) == 1
+
+    assert client.get(url, {"fields": "id,secreto"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_rows_are_not_hydrated_into_models(client, tweets, monkeypatch):
+    def boom(*args, **kwargs):
+        raise AssertionError("instancia de modelo creada")
+
+    monkeypatch.setattr(Tweet, "from_db", classmethod(boom))
+    assert client.get(reverse("api_timeline")).status_code == 200
+
+
+@pytest.mark.django_db
+def test_large_pages_are_streamed(client, reader, django_user_model):
+    Tweet.objects.bulk_create([Tweet(user=reader, content=f"t{i}", created_at=timezone.now()) for i in range(250)])
+    resp = client.get(reverse("api_profile", args=["lector"]), {"limit": 200, "fields": "id,created_at"})
+    assert resp.streaming
+    body = json.loads(b"".join(resp.streaming_content))
+    assert body["user"]["username"] == "lector"
+    assert len(body["data"]) == 200
+    resp = client.get(reverse("api_profile", args=["lector"]), {"limit": 200, "after": body["next"]})
+    rest = json.loads(b"".join(resp.streaming_content))
+    assert len(rest["data"]) == 50 and rest["next"] is None
+    assert not {r["id"] for r in rest["data"]} & {r["id"] for r in body["data"]}
+
+
+@pytest.mark.django_db
+def test_explore_follows_the_ranking(client, tweets):
+    ranked = tweets[5:12]
+    ExploreRank.objects.bulk_create([
+        ExploreRank(rank=i, tweet=t, score=1.0 / i, computed_at=timezone.now()) for i, t in enumerate(ranked, 1)
+    ])
+    assert _pages(client, reverse("api_explore"), limit=3) == [t.pk for t in ranked]
+
+    ExploreRank.objects.all().delete()
+    assert len(_pages(client, reverse("api_explore"), limit=50)) == len(tweets)
+
+
+@pytest.mark.django_db
+def test_tweet_with_paged_replies(client, tweets, reader):
+    tw = tweets[0]
+    for i in range(5):
+        Comment.objects.create(user=reader, tweet=tw, content=f"r{i}")
+    body = client.get(reverse("api_tweet", args=[tw.pk]), {"limit": 3, "fields": "id,user"}).json()
+    assert body["data"] == {"id": tw.pk, "user": tw.user.username}
+    assert [r["content"] for r in body["replies"]] == ["r0", "r1", "r2"]
+    more = client.get(reverse("api_tweet", args=[tw.pk]), {"limit": 3, "after": body["next"]}).json()
+    assert [r["content"] for r in more["replies"]] == ["r3", "r4"] and more["next"] is None
+
+    assert client.get(reverse("api_tweet", args=[999999])).status_code == 404
+
+
+@pytest.mark.django_db
+def test_errors_are_json(client, tweets):
+    assert client.get(reverse("api_timeline"), {"after": "basura"}).json() == {"error": "Cursor inválido"}
+    assert client.post(reverse("api_timeline")).status_code == 405
+    client.logout()
+    assert client.get(reverse("api_timeline")).status_code == 401
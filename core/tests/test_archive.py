@@ -0,0 +1,136 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import (
+    ArchivedLike,
+    ArchivedNotification,
+    ArchivedTweet,
+    Comment,
+    Like,
+    Notification,
+    Tweet,
+)
+
+
+def _aged(obj, days):
+    type(obj).objects.filter(pk=obj.pk).update(created_at=timezone.now() - timedelta(days=days))
+    return obj
+
+
+@pytest.fixture
+def users(django_user_model):
+    return [django_user_model.objects.create_user(username=n) for n in ("ana", "beto")]
+
+
+# 1) Lo frío se archiva (con likes y comentarios); lo que tuvo actividad reciente, no
+@pytest.mark.django_db
+def test_archive_moves_cold_tweets_only(users):
+    ana, beto = users
+    cold = _aged(Tweet.objects.create(user=ana, content="tweet frío"), 400)
+    _aged(Like.objects.create(user=beto, tweet=cold), 399)
+    _aged(Comment.objects.create(user=beto, tweet=cold, content="comentario viejo"), 399)
+    hot = _aged(Tweet.objects.create(user=ana, content="viejo pero con like nuevo"), 400)
+    Like.objects.create(user=beto, tweet=hot)
+    parent = _aged(Tweet.objects.create(user=ana, content="padre"), 400)
+    Tweet.objects.create(user=beto, content="respuesta nueva", parent=parent)
+
+    call_command("archive", days=180, stdout=StringIO())
+
+    assert list(Tweet.objects.filter(pk__in=[cold.pk, hot.pk, parent.pk]).values_list("pk", flat=True).order_by("pk")) == [hot.pk, parent.pk]
+    archived = ArchivedTweet.objects.get(pk=cold.pk)
+    assert archived.like_count == 1 and archived.comments[0]["content"] == "comentario viejo"
+    assert ArchivedLike.objects.filter(tweet_id=cold.pk, user=beto).exists()
+    assert not Like.objects.filter(tweet_id=cold.pk).exists()
+
+
+# 2) tweet_detail y profile leen del archivo de forma transparente
+@pytest.mark.django_db
+def test_archived_tweet_still_readable(client, users):
+    ana, beto = users
+    cold = _aged(Tweet.objects.create(user=ana, content="historia antigua"), 400)
+    _aged(Comment.objects.create(user=beto, tweet=cold, content="qué recuerdos"), 399)
+    Tweet.objects.create(user=ana, content="tweet de hoy")
+    call_command("archive", days=180, stdout=StringIO())
+
+    client.force_login(beto)
+    detail = client.get(reverse("tweet_detail", args=[cold.pk]))
+    assert detail.status_code == 200
+    assert b"historia antigua" in detail.content and b"qu\xc3\xa9 recuerdos" in detail.content
+    assert b"Publicaci\xc3\xb3n archivada" in detail.content
+
+    profile = client.get(reverse("profile", args=["ana"])).content.decode()
+    assert profile.index("tweet de hoy") < profile.index("historia antigua")
+
+
+# 3) Notificaciones: las viejas al archivo, las leídas pasada la retención se borran
+@pytest.mark.django_db
+def test_notifications_archived_and_retention(users):
+    ana, beto = users
+    old = _aged(Notification.objects.create(actor=beto, recipient=ana, verb="te siguió"), 400)
+    read = _aged(Notification.objects.create(actor=beto, recipient=ana, verb="leída", read=True), 60)
+    fresh = Notification.objects.create(actor=beto, recipient=ana, verb="nueva", read=True)
+
+    call_command("archive", days=180, notification_retention=30, stdout=StringIO())
+
+    assert list(Notification.objects.values_list("pk", flat=True)) == [fresh.pk]
+    assert ArchivedNotification.objects.get().verb == old.verb
+    assert not Notification.objects.filter(pk=read.pk).exists()
+
+
+# 4) El perfil pagina vivos y archivados en SQL: mismo coste con más historial
+@pytest.mark.django_db
+def test_profile_pages_merge_live_and_archived(client, users, django_assert_max_num_queries):
+    import re
+
+    from core.views import PROFILE_PAGE_SIZE
+
+    ana, beto = users
+    now = timezone.now()
+    ArchivedTweet.objects.bulk_create(
+        ArchivedTweet(id=100000 + i, user=ana, content=f"archivado {i}", created_at=now - timedelta(days=400 + i))
+        for i in range(PROFILE_PAGE_SIZE)
+    )
+    for i in range(PROFILE_PAGE_SIZE):
+        _aged(Tweet.objects.create(user=ana, content=f"vivo {i}"), i)
+    client.force_login(beto)
+    url = reverse("profile", args=["ana"])
+    client.get(url)
+
+    seen, after = [], None
+    while True:
+        with django_assert_max_num_queries(6):
+            html = client.get(url, {"after": after} if after else {}).content.decode()
+        seen += re.findall(r"(?:vivo|archivado) \d+", html)
+        match = re.search(r'\?after=([\w.]+)', html)
+        if not match:
+            break
+        after = match.group(1)
+    expected = [f"vivo {i}" for i in range(PROFILE_PAGE_SIZE)] + [f"archivado {i}" for i in range(PROFILE_PAGE_SIZE)]
+    assert seen == expected
+
+
+# 5) Cadenas de respuestas: el recuento (CTE) y el archivo por rangos coinciden
+@pytest.mark.django_db
+def test_archive_chains_in_small_batches(users):
+    from core import archive
+
+    ana, beto = users
+    cutoff = timezone.now() - timedelta(days=180)
+    chain = [_aged(Tweet.objects.create(user=ana, content="raíz"), 400)]
+    for i in range(4):
+        chain.append(_aged(Tweet.objects.create(user=beto, content=f"respuesta {i}", parent=chain[-1]), 399))
+    blocked = [_aged(Tweet.objects.create(user=ana, content="raíz con nieto activo"), 400)]
+    blocked.append(_aged(Tweet.objects.create(user=beto, content="hijo", parent=blocked[-1]), 399))
+    blocked.append(_aged(Tweet.objects.create(user=ana, content="nieto", parent=blocked[-1]), 399))
+    Like.objects.create(user=beto, tweet=blocked[-1])
+
+    assert archive.count_archivable(cutoff) == len(chain)
+    assert archive.archive_tweets(cutoff, batch_size=2) == len(chain)
+    assert set(ArchivedTweet.objects.values_list("pk", flat=True)) == {t.pk for t in chain}
+    assert set(Tweet.objects.values_list("pk", flat=True)) == {t.pk for t in blocked}
+    assert archive.count_archivable(cutoff) == 0
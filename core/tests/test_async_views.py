@@ -0,0 +1,86 @@
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.test import AsyncClient
+from django.urls import URLPattern
+
+from core import async_views
+from core.tests.test_query_budgets import budget_urls, feed, viewer  # noqa: F401
+from core.urls import build_urlpatterns
+
+READ_VIEWS = ["timeline", "explore", "profile", "search", "tag", "notifications", "trending_links"]
+
+
+@pytest.fixture
+def async_urls(settings):
+    settings.ROOT_URLCONF = "core.tests.urls_async"
+
+
+def test_read_views_are_async_and_budgeted():
+    patterns = {p.name: p for p in build_urlpatterns(async_reads=True)}
+    for name in READ_VIEWS:
+        callback = patterns[name].callback
+        assert isinstance(patterns[name], URLPattern)
+        assert iscoroutinefunction(callback), name
+        assert callback is getattr(async_views, name)
+        assert getattr(callback, "query_budget", None), f"{name} sin @query_budget"
+
+
+def _tweet_ids(resp):
+    return [t.pk for t in resp.context["tweets"]] if "tweets" in resp.context else None
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("name", READ_VIEWS)
+def test_async_view_matches_sync(client, settings, viewer, feed, name):  # noqa: F811
+    settings.QUERY_BUDGET_MODE = "raise"
+    _, url = budget_urls(feed)[name]
+    client.force_login(viewer)
+    expected = client.get(url)
+
+    settings.ROOT_URLCONF = "core.tests.urls_async"
+    aclient = AsyncClient()
+    aclient.cookies = client.cookies
+    resp = async_to_sync(aclient.get)(url)
+    assert resp.status_code == expected.status_code == 200
+    assert _tweet_ids(resp) == _tweet_ids(expected)
+
+
+@pytest.mark.django_db
+def test_async_profile_posts_go_to_sync_view(client, async_urls, viewer, feed):  # noqa: F811
+    from django.urls import reverse
+    from core.models import Follow
+
+    author = feed["authors"][0]
+    client.force_login(viewer)
+    aclient = AsyncClient()
+    aclient.cookies = client.cookies
+    resp = async_to_sync(aclient.post)(reverse("profile", args=[author.username]), {"action": "unfollow"})
+    assert resp.status_code == 302
+    assert not Follow.objects.filter(follower=viewer, following=author).exists()
+
+
+@pytest.mark.django_db
+def test_async_timeline_conditional_get(client, async_urls, viewer, feed):  # noqa: F811
+    from django.urls import reverse
+
+    client.force_login(viewer)
+    aclient = AsyncClient()
+    aclient.cookies = client.cookies
+    first = async_to_sync(aclient.get)(reverse("timeline"))
+    again = async_to_sync(aclient.get)(reverse("timeline"), headers={"if-none-match": first["ETag"]})
+    assert again.status_code == 304
+
+
+@pytest.mark.django_db
+def test_recorder_sees_async_orm_queries(viewer):  # noqa: F811
+    from core.models import Follow, Tweet
+    from core.querybudget import QueryRecorder
+
+    async def run():
+        recorder = QueryRecorder()
+        async with recorder.arecord():
+            await Tweet.objects.acount()
+            await Follow.objects.filter(follower=viewer).aexists()
+        return recorder.count
+
+    assert async_to_sync(run)() == 2
@@ -0,0 +1,94 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.auth import _key
+from core.models import UserProfile
+
+
+def _auth_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.get(url)
+    assert resp.status_code == 200
+    return [q["sql"] for q in ctx.captured_queries
+            if "django_session" in q["sql"] or 'FROM "auth_user" WHERE "auth_user"."id" =' in q["sql"]
+            or 'FROM "core_userprofile" WHERE "core_userprofile"."user_id" IN' in q["sql"]]
+
+
+@pytest.fixture
+def ana(django_user_model):
+    return django_user_model.objects.create_user(username="ana", password="s3creta-larga")
+
+
+@pytest.mark.django_db
+def test_session_and_user_come_from_cache(client, ana):
+    client.login(username="ana", password="s3creta-larga")
+    url = reverse("tag", args=["nada"])
+    assert len(_auth_queries(client, url)) == 2  # usuario + perfil, una vez
+    assert _auth_queries(client, url) == []
+
+    user = client.get(url).wsgi_request.user
+    with CaptureQueriesContext(connection) as ctx:
+        assert user.userprofile.user_id == ana.pk
+    assert not ctx.captured_queries
+
+
+@pytest.mark.django_db
+def test_profile_edit_invalidates(client, ana):
+    client.force_login(ana)
+    client.get(reverse("notifications"))
+    assert cache.get(_key(ana.pk)) is not None
+
+    resp = client.post(reverse("profile", args=["ana"]), {"action": "edit", "bio": "nueva bio"})
+    assert resp.status_code == 302
+    assert cache.get(_key(ana.pk)) is None
+    assert client.get(reverse("notifications")).wsgi_request.user.userprofile.bio == "nueva bio"
+
+
+@pytest.mark.django_db
+def test_password_change_logs_out_other_sessions(client, ana):
+    other = Client()
+    for c in (client, other):
+        c.login(username="ana", password="s3creta-larga")
+        c.get(reverse("notifications"))
+
+    resp = client.post(reverse("password_change"), {
+        "old_password": "s3creta-larga", "new_password1": "otra-clave-9876", "new_password2": "otra-clave-9876",
+    })
+    assert resp.status_code == 302
+    # Quien la cambió sigue dentro; la otra sesión ya no vale, sin esperar al TTL.
+    assert client.get(reverse("notifications")).status_code == 200
+    assert other.get(reverse("notifications")).status_code == 302
+
+
+@pytest.mark.django_db
+def test_sessions_are_written_through_to_the_database(client, ana):
+    from django.contrib.sessions.models import Session
+
+    client.login(username="ana", password="s3creta-larga")
+    key = client.cookies["sessionid"].value
+    assert Session.objects.filter(session_key=key).exists()
+
+    cache.clear()  # otro worker, o la caché reiniciada: la sesión sigue en la tabla
+    assert client.get(reverse("notifications")).status_code == 200
+
+
+@pytest.mark.django_db
+def test_async_views_use_the_cache(client, settings, ana):
+    settings.ROOT_URLCONF = "core.tests.urls_async"
+    client.force_login(ana)
+    aclient = AsyncClient()
+    aclient.cookies = client.cookies
+    url = reverse("tag", args=["nada"])
+    async_to_sync(aclient.get)(url)
+
+    UserProfile.objects.filter(user=ana).update(bio="sin señal")  # .update() no invalida
+    with CaptureQueriesContext(connection) as ctx:
+        resp = async_to_sync(aclient.get)(url)
+    assert resp.status_code == 200
+    assert resp.asgi_request.user.userprofile.bio == ""
+    assert not [q for q in ctx.captured_queries if "django_session" in q["sql"] or 'FROM "auth_user" WHERE "auth_user"."id" =' in q["sql"]]
@@ -0,0 +1,83 @@
+import time
+
+import pytest
+from django.urls import reverse
+
+from core import autocomplete
+from core.autocomplete import PrefixIndex
+from core.models import Follow, Tweet
+
+
+def test_prefix_index_ranks_by_score_and_ignores_case():
+    index = PrefixIndex([("Ana", 3), ("andres", 10), ("anabel", 1), ("bea", 50)])
+    assert [t for t, _ in index.search("an")] == ["andres", "Ana", "anabel"]
+    assert [t for t, _ in index.search("ANA")] == ["Ana", "anabel"]
+    assert index.search("x") == []
+    assert [t for t, _ in index.search("", 2)] == ["bea", "andres"]
+
+
+def test_prefix_index_updates_invalidate_cached_prefixes():
+    index = PrefixIndex([("django", 2), ("docker", 1)])
+    assert [t for t, _ in index.search("d")] == ["django", "docker"]
+    index.add("docker", 5)
+    index.add("dart")
+    assert [t for t, _ in index.search("d")] == ["docker", "django", "dart"]
+    assert index.search("da") == [("dart", 0)]
+
+
+def test_prefix_index_lookup_is_fast():
+    index = PrefixIndex((f"user{i:06d}", i % 97) for i in range(100_000))
+    index.search("user01")
+    start = time.perf_counter()
+    for i in range(1000):
+        index.search(f"user{i % 100:02d}")
+    assert (time.perf_counter() - start) / 1000 < 0.001
+
+
+@pytest.fixture
+def people(django_user_model):
+    users = {name: django_user_model.objects.create_user(username=name) for name in ("ana", "anabel", "andres", "bea")}
+    for fan in ("anabel", "bea"):
+        Follow.objects.create(follower=users[fan], following=users["andres"])
+    Follow.objects.create(follower=users["bea"], following=users["anabel"])
+    Tweet.objects.create(user=users["ana"], content="#django y #docker")
+    Tweet.objects.create(user=users["bea"], content="más #docker")
+    return users
+
+
+@pytest.mark.django_db
+def test_suggestions_rank_users_by_followers_and_tags_by_use(people):
+    assert [r["value"] for r in autocomplete.suggest("@an")] == ["andres", "anabel", "ana"]
+    assert [r["value"] for r in autocomplete.suggest("#d")] == ["docker", "django"]
+
+
+@pytest.mark.django_db
+def test_index_follows_new_users_tweets_and_follows(people, django_user_model, django_assert_num_queries):
+    autocomplete.indexes()
+    newcomer = django_user_model.objects.create_user(username="anastasia")
+    Tweet.objects.create(user=newcomer, content="#django #django #dev")
+    for name in ("ana", "bea"):
+        Follow.objects.create(follower=people[name], following=newcomer)
+    Follow.objects.filter(following=people["andres"]).delete()
+
+    with django_assert_num_queries(0):
+        users = [r["value"] for r in autocomplete.suggest("@an")]
+        tags = [r["value"] for r in autocomplete.suggest("#d")]
+    assert users == ["anastasia", "anabel", "ana", "andres"]
+    assert tags == ["django", "docker", "dev"]
+
+
+@pytest.mark.django_db
+def test_endpoint(client, people):
+    url = reverse("api_autocomplete")
+    assert client.get(url, {"q": "@an"}).status_code == 401
+
+    client.force_login(people["ana"])
+    resp = client.get(url, {"q": "@an", "limit": 2})
+    assert resp.status_code == 200
+    assert resp.json()["results"] == [
+        {"type": "user", "value": "andres", "score": 2},
+        {"type": "user", "value": "anabel", "score": 1},
+    ]
+    assert client.get(url, {"q": "#"}).json()["results"] == []
+    assert client.get(url, {"q": "#d", "limit": "x"}).status_code == 400
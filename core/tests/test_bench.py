@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from core import benchmarks
+
+# Los benchmarks siembran miles de filas: solo corren si se piden explícitamente.
+#   TWITTOR_BENCH=1 pytest -m bench
+#   TWITTOR_BENCH_SCALES=small,medium para más escalas
+#   TWITTOR_BENCH_UPDATE=1 regenera benchmarks/baseline.json desde aquí (mismo proceso
+#   que la comparación: bajo pytest las vistas miden más que con `manage.py bench`)
+needs_bench = pytest.mark.skipif(
+    not os.environ.get("TWITTOR_BENCH"), reason="define TWITTOR_BENCH=1 para correr benchmarks"
+)
+
+SCALES = os.environ.get("TWITTOR_BENCH_SCALES", "small").split(",")
+
+
+@pytest.mark.bench
+@needs_bench
+@pytest.mark.django_db
+@pytest.mark.parametrize("scale", SCALES)
+def test_hot_views_against_baseline(scale, bench_report):
+    results = {scale: benchmarks.run_scale(scale)}
+    table = benchmarks.format_table(results)
+    bench_report(table)
+    if os.environ.get("TWITTOR_BENCH_UPDATE"):
+        benchmarks.save_baseline(results)
+        return
+    problems = benchmarks.compare(results, benchmarks.load_baseline())
+    assert not problems, "\n".join([*problems, "", table])
+
+
+def test_percentile_interpolates():
+    assert benchmarks.percentile([1, 2, 3, 4], 50) == 2.5
+    assert benchmarks.percentile([5], 99) == 5
+
+
+@pytest.mark.django_db
+def test_asgi_driver_runs_a_full_request():
+    from asgiref.sync import async_to_sync
+    from django.core.asgi import get_asgi_application
+    from django.core.signals import request_finished, request_started
+    from django.db import close_old_connections
+    from django.urls import reverse
+
+    # Como el cliente de pruebas de Django: sin cerrar la conexión de la transacción del test.
+    request_started.disconnect(close_old_connections)
+    request_finished.disconnect(close_old_connections)
+    try:
+        assert async_to_sync(benchmarks._asgi_get)(get_asgi_application(), reverse("signup"), "", host="testserver") == 200
+    finally:
+        request_started.connect(close_old_connections)
+        request_finished.connect(close_old_connections)
+
+
+def test_parse_importtime():
+    text = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   bs4.element\n"
+        "import time:        30 |        150 | bs4\n"
+    )
+    assert benchmarks.parse_importtime(text) == [("bs4.element", 120, 120, 1), ("bs4", 30, 150, 0)]
+
+
+def test_app_startup_skips_lazy_dependencies():
+    profile = benchmarks.import_profile("wsgi", runs=1)
+    assert profile["lazy_loaded"] == []
+    assert any(m["module"] == "core.views" for m in profile["modules"])
+    assert benchmarks.check_startup({"wsgi": profile}, budget_ms=10**6) == []
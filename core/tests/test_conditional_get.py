@@ -0,0 +1,142 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from core.models import ArchivedTweet, Comment, Follow, Tweet
+
+
+@pytest.fixture
+def people(client, django_user_model):
+    me = django_user_model.objects.create_user(username="yo")
+    friend = django_user_model.objects.create_user(username="amiga")
+    Follow.objects.create(follower=me, following=friend)
+    tweet = Tweet.objects.create(user=friend, content="hola")
+    client.force_login(me)
+    return me, friend, tweet
+
+
+def _revalidate(client, url, etag):
+    return client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+
+# 1) Timeline: 304 barato mientras nada cambia; un tweet o un like nuevos lo invalidan
+@pytest.mark.django_db
+def test_timeline_304_until_feed_changes(client, people, query_budget):
+    me, friend, tweet = people
+    url = reverse("timeline")
+    first = client.get(url)
+    etag = first["ETag"]
+    assert "private" in first["Cache-Control"] and "no-cache" in first["Cache-Control"]
+
+    with query_budget(queries=3):
+        assert _revalidate(client, url, etag).status_code == 304
+
+    client.put(reverse("api_like", args=[tweet.pk]))
+    liked = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert liked.status_code == 200 and liked["ETag"] != etag
+
+    Tweet.objects.create(user=friend, content="otro")
+    assert _revalidate(client, url, liked["ETag"]).status_code == 200
+
+
+# 2) Perfil: seguir/dejar de seguir cambia la versión
+@pytest.mark.django_db
+def test_profile_etag_tracks_follow_state(client, people):
+    me, friend, _ = people
+    url = reverse("profile", args=[friend.username])
+    etag = client.get(url)["ETag"]
+    assert _revalidate(client, url, etag).status_code == 304
+    Follow.objects.filter(follower=me, following=friend).delete()
+    assert _revalidate(client, url, etag).status_code == 200
+    assert client.get(reverse("profile", args=["nadie"])).status_code == 404
+
+
+# 3) Detalle: un comentario nuevo invalida; sin Last-Modified en lo que está vivo
+@pytest.mark.django_db
+def test_tweet_detail_validators(client, people):
+    me, _, tweet = people
+    url = reverse("tweet_detail", args=[tweet.pk])
+    first = client.get(url)
+    assert _revalidate(client, url, first["ETag"]).status_code == 304
+    assert not first.has_header("Last-Modified")
+
+    Comment.objects.create(user=me, tweet=tweet, content="¡hola!")
+    assert _revalidate(client, url, first["ETag"]).status_code == 200
+
+
+# 4) Detalle: el hilo (citas y antecesores) también forma parte de la versión
+@pytest.mark.django_db
+def test_tweet_detail_etag_tracks_thread(client, people):
+    me, friend, tweet = people
+    url = reverse("tweet_detail", args=[tweet.pk])
+    etag = client.get(url)["ETag"]
+
+    quote = Tweet.objects.create(user=me, content="te cito", parent=tweet)
+    fresh = _revalidate(client, url, etag)
+    assert fresh.status_code == 200 and "te cito" in fresh.content.decode()
+
+    Tweet.objects.filter(pk=quote.pk).update(like_total=5)
+    assert _revalidate(client, url, fresh["ETag"]).status_code == 200
+
+    child = Tweet.objects.create(user=me, content="otra cita", parent=tweet)
+    child_url = reverse("tweet_detail", args=[child.pk])
+    etag = client.get(child_url)["ETag"]
+    Tweet.objects.filter(pk=tweet.pk).update(like_total=3)  # un antecesor cambia
+    assert _revalidate(client, child_url, etag).status_code == 200
+
+
+# 5) Quitar un like no deja fecha: If-Modified-Since no puede dar un 304 obsoleto
+@pytest.mark.django_db
+def test_unlike_is_not_hidden_by_if_modified_since(client, people):
+    me, _, tweet = people
+    client.put(reverse("api_like", args=[tweet.pk]))
+    since = http_date(time.time() + 60)
+    for url in (reverse("timeline"), reverse("tweet_detail", args=[tweet.pk])):
+        assert not client.get(url).has_header("Last-Modified")
+    client.delete(reverse("api_like", args=[tweet.pk]))
+    for url in (reverse("timeline"), reverse("tweet_detail", args=[tweet.pk])):
+        assert client.get(url, HTTP_IF_MODIFIED_SINCE=since).status_code == 200
+
+
+# 6) Un tweet archivado no cambia: conserva Last-Modified e If-Modified-Since
+@pytest.mark.django_db
+def test_archived_tweet_keeps_last_modified(client, people):
+    _, friend, _ = people
+    archived = ArchivedTweet.objects.create(
+        id=10 ** 6, user=friend, content="viejo", created_at=timezone.now() - timedelta(days=400),
+    )
+    url = reverse("tweet_detail", args=[archived.pk])
+    first = client.get(url)
+    assert first.status_code == 200
+    assert client.get(url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"]).status_code == 304
+
+
+# 7) Un mensaje pendiente (p. ej. avatar rechazado) se pinta: nada de 304 con la página vieja
+@pytest.mark.django_db
+def test_pending_message_skips_304(client, people):
+    me, _, _ = people
+    url = reverse("profile", args=[me.username])
+    etag = client.get(url)["ETag"]
+    resp = client.post(url, {"action": "edit", "bio": "x", "avatar": SimpleUploadedFile("yo.png", b"MZ" * 64)})
+    assert resp.status_code == 302
+    shown = _revalidate(client, url, etag)
+    assert shown.status_code == 200 and "no es una imagen" in shown.content.decode()
+    assert "no es una imagen" not in client.get(reverse("explore")).content.decode()
+
+
+# 8) Tras logout/login la copia cacheada tiene un token CSRF caducado: no vale
+@pytest.mark.django_db
+def test_login_invalidates_cached_page(client, people):
+    me, _, _ = people
+    url = reverse("timeline")
+    etag = client.get(url)["ETag"]
+    assert _revalidate(client, url, etag).status_code == 304
+    client.logout()
+    client.force_login(me)
+    fresh = _revalidate(client, url, etag)
+    assert fresh.status_code == 200 and fresh["ETag"] != etag
@@ -0,0 +1,78 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from core import explore
+from core.models import Comment, ExploreRank, Like, Tweet
+
+
+def test_diversify_caps_authors_in_the_head():
+    scored = [(1, "a", 9), (2, "a", 8), (3, "a", 7), (4, "b", 6), (5, "a", 5), (6, "c", 1)]
+    assert [t for t, _, _ in explore.diversify(scored, per_author=2, size=10)] == [1, 2, 4, 6, 3, 5]
+    assert [t for t, _, _ in explore.diversify(scored, per_author=2, size=3)] == [1, 2, 4]
+
+
+@pytest.fixture
+def activity(django_user_model):
+    users = [django_user_model.objects.create_user(username=f"u{i}") for i in range(4)]
+    quiet = Tweet.objects.create(user=users[0], content="nadie me lee")
+    popular = Tweet.objects.create(user=users[1], content="todos me leen")
+    old = Tweet.objects.create(user=users[2], content="viral hace tiempo")
+    Tweet.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(hours=48))
+    for u in users:
+        Like.objects.create(user=u, tweet=popular)
+        Like.objects.create(user=u, tweet=old)
+        Comment.objects.create(user=u, tweet=old, content="¡!")
+    Tweet.objects.filter(pk__in=[popular.pk, old.pk]).update(like_total=4)
+    Tweet.objects.create(user=users[3], content="", parent=popular, is_retweet=True)
+    quote = Tweet.objects.create(user=users[3], content="mira esto", parent=popular)
+    return {"quiet": quiet, "popular": popular, "old": old, "quote": quote}
+
+
+@pytest.mark.django_db
+def test_rank_orders_by_decayed_engagement(activity):
+    saved, candidates = explore.rank()
+    assert (saved, candidates) == (4, 4)  # el retuit no es candidato
+    ranked = list(ExploreRank.objects.values_list("tweet_id", flat=True))
+    assert ranked[0] == activity["popular"].pk
+    assert ranked.index(activity["old"].pk) > ranked.index(activity["quote"].pk)
+
+
+@pytest.mark.django_db
+def test_explore_reads_ranked_page(client, activity, django_user_model, query_budget):
+    client.force_login(django_user_model.objects.get(username="u0"))
+    # Sin ranking: lo más reciente.
+    assert client.get(reverse("explore")).context["tweets"][0].pk == activity["quote"].pk
+
+    call_command("rank_explore", stdout=StringIO())
+    with query_budget(queries=5):
+        resp = client.get(reverse("explore"))
+    assert [t.pk for t in resp.context["tweets"]][0] == activity["popular"].pk
+    assert resp.context["next_cursor"] is None
+    assert list(client.get(reverse("explore"), {"after": "r50"}).context["tweets"]) == []
+
+
+@pytest.mark.django_db
+def test_explore_pages_past_deleted_tweets(client, django_user_model, monkeypatch):
+    monkeypatch.setattr("core.views.EXPLORE_PAGE_SIZE", 3)
+    user = django_user_model.objects.create_user(username="lector")
+    tweets = [Tweet.objects.create(user=user, content=f"puesto {i}") for i in range(1, 8)]
+    now = timezone.now()
+    ExploreRank.objects.bulk_create(
+        ExploreRank(rank=i, tweet=t, score=1 / i, computed_at=now) for i, t in enumerate(tweets, 1)
+    )
+    tweets[1].delete()  # hueco en la posición 2
+    client.force_login(user)
+
+    seen, after = [], None
+    while True:
+        resp = client.get(reverse("explore"), {"after": after} if after else {})
+        seen += [t.content for t in resp.context["tweets"]]
+        after = resp.context["next_cursor"]
+        if not after:
+            break
+    assert seen == [f"puesto {i}" for i in (1, 3, 4, 5, 6, 7)]
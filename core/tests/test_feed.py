@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.feed import collapse_retweets, retweet_label
+from core.models import Follow, Tweet
+
+
+@pytest.fixture
+def people(django_user_model):
+    return [django_user_model.objects.create_user(username=name) for name in
+            ("lector", "autora", "ana", "beto", "carla", "dani", "eva")]
+
+
+def _at(tweet, minutes_ago):
+    Tweet.objects.filter(pk=tweet.pk).update(created_at=timezone.now() - timedelta(minutes=minutes_ago))
+
+
+def test_retweet_label():
+    users = [type("U", (), {"username": n}) for n in ("ana", "beto", "carla", "dani", "eva")]
+    assert retweet_label(users[:1]) == "@ana retwitteó"
+    assert retweet_label(users[:2]) == "@ana y @beto retwittearon"
+    assert retweet_label(users[:3]) == "@ana, @beto y @carla retwittearon"
+    assert retweet_label(users) == "@ana, @beto y 3 más retwittearon"
+
+
+@pytest.mark.django_db
+def test_timeline_groups_retweets_into_one_card(client, people):
+    lector, autora, *rts = people
+    original = Tweet.objects.create(user=autora, content="el original")
+    other = Tweet.objects.create(user=autora, content="otro tweet")
+    _at(original, 60)
+    _at(other, 30)
+    for i, user in enumerate(rts):
+        Follow.objects.create(follower=lector, following=user)
+        _at(Tweet.objects.create(user=user, content="", parent=original, is_retweet=True), 10 - i)
+    client.force_login(lector)
+
+    tweets = client.get(reverse("timeline")).context["tweets"]
+    assert len(tweets) == 1  # no sigue a la autora: queda el retuit más reciente
+    card = tweets[0]
+    assert card.is_retweet and card.user == rts[-1]
+    assert card.retweet_label == "@eva, @dani y 3 más retwittearon"
+
+    Follow.objects.create(follower=lector, following=autora)
+    resp = client.get(reverse("timeline"))
+    tweets = resp.context["tweets"]
+    # El original sustituye a sus retuits, en el sitio del retuit más reciente.
+    assert [t.pk for t in tweets] == [original.pk, other.pk]
+    assert [u.username for u in tweets[0].retweeted_by] == ["eva", "dani", "carla", "beto", "ana"]
+    assert tweets[1].retweeted_by == []
+    assert resp.content.decode().count("el original") == 1
+
+
+@pytest.mark.django_db
+def test_collapsing_needs_no_queries(people):
+    lector, autora, ana, beto, *_ = people
+    original = Tweet.objects.create(user=autora, content="hola")
+    for user in (ana, beto, ana):
+        Tweet.objects.create(user=user, content="", parent=original, is_retweet=True)
+    page = list(Tweet.objects.select_related("user").order_by("-created_at"))
+
+    with CaptureQueriesContext(connection) as ctx:
+        (card,) = collapse_retweets(page)
+    assert not ctx.captured_queries
+    assert card.pk == original.pk
+    assert card.retweet_label == "@ana y @beto retwittearon"
+
+
+@pytest.mark.django_db
+def test_timeline_reads_like_total_without_grouping(client, people):
+    lector, autora, *_ = people
+    Follow.objects.create(follower=lector, following=autora)
+    tweet = Tweet.objects.create(user=autora, content="con likes")
+    Tweet.objects.filter(pk=tweet.pk).update(like_total=7)
+    client.force_login(lector)
+    with CaptureQueriesContext(connection) as ctx:
+        html = client.get(reverse("timeline")).content.decode()
+    assert "♥ 7" in html
+    assert not any("GROUP BY" in q["sql"] for q in ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_timeline_is_paged_by_cursor(client, people):
+    import re
+
+    from core.views import TIMELINE_PAGE_SIZE
+
+    lector, autora, *_ = people
+    Follow.objects.create(follower=lector, following=autora)
+    for i in range(TIMELINE_PAGE_SIZE + 5):
+        _at(Tweet.objects.create(user=autora, content=f"número {i}"), i)
+    client.force_login(lector)
+
+    first = client.get(reverse("timeline")).content.decode()
+    assert len(re.findall(r"número \d+", first)) == TIMELINE_PAGE_SIZE
+    after = re.search(r'\?after=([\w.]+)', first).group(1)
+    second = client.get(reverse("timeline"), {"after": after}).content.decode()
+    assert re.findall(r"número \d+", second) == [f"número {i}" for i in range(TIMELINE_PAGE_SIZE, TIMELINE_PAGE_SIZE + 5)]
+    assert "?after=" not in second
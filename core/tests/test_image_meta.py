@@ -0,0 +1,90 @@
+import io
+from pathlib import Path
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from PIL import Image
+
+from core.imagemeta import renditions
+from core.models import Tweet, TweetImage
+
+
+def upload(name, size, color=(20, 120, 200)):
+    buf = io.BytesIO()
+    Image.new("RGB", size, color).save(buf, "PNG")
+    return SimpleUploadedFile(name, buf.getvalue(), content_type="image/png")
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path / "media")
+    return Path(settings.MEDIA_ROOT)
+
+
+@pytest.fixture
+def author(django_user_model):
+    return django_user_model.objects.create_user(username="fotografa")
+
+
+# 1) Al subir se guardan ancho, alto y color dominante
+@pytest.mark.django_db
+def test_upload_stores_dimensions_and_color(media, author):
+    tw = Tweet.objects.create(user=author, content="foto", image=upload("a.png", (1600, 900)))
+    tw.refresh_from_db()
+    assert (tw.image_width, tw.image_height, tw.image_color) == (1600, 900, "#1478c8")
+
+    author.userprofile.avatar = upload("yo.png", (300, 200), (250, 250, 250))
+    author.userprofile.save()
+    assert (author.userprofile.avatar_width, author.userprofile.avatar_height) == (300, 200)
+
+
+# 2) El render sale solo de columnas: ni storage ni Pillow
+@pytest.mark.django_db
+def test_feed_renders_without_touching_files(client, media, author, monkeypatch):
+    tw = Tweet.objects.create(user=author, content="foto", image=upload("a.png", (1600, 900)))
+    TweetImage.objects.create(tweet=tw, image=upload("b.png", (800, 600)))
+    author.userprofile.avatar = upload("yo.png", (300, 300))
+    author.userprofile.save()
+
+    def forbidden(*args, **kwargs):
+        raise AssertionError("acceso a archivos durante el render")
+
+    monkeypatch.setattr(Image, "open", forbidden)
+    monkeypatch.setattr("django.core.files.storage.FileSystemStorage._open", forbidden)
+    monkeypatch.setattr("django.core.files.storage.FileSystemStorage.exists", forbidden)
+    client.force_login(author)
+    html = client.get(reverse("timeline")).content.decode()
+
+    assert 'width="1600" height="900"' in html and "background-color: #1478c8" in html
+    assert ".1200x0_q85.png 1200w" in html and ".600x0_q85.png 600w" in html
+    assert 'width="96" height="96"' in html          # avatar recortado
+    assert 'width="500" height="500"' in html        # recorte de TweetImage (600×600 → 500)
+    assert 'loading="lazy"' in html and 'decoding="async"' in html
+
+
+# 3) Las miniaturas del srcset se generan al subir, con el nombre calculado
+@pytest.mark.django_db
+def test_thumbnails_generated_on_upload(media, author, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        tw = Tweet.objects.create(user=author, content="foto", image=upload("a.png", (1600, 900)))
+    for w, url in renditions(tw, "image")["srcset"][:-1]:
+        thumb = media / url.removeprefix("/media/")
+        assert thumb.is_file() and Image.open(thumb).size[0] == w
+
+
+# 4) `src` es el original; las miniaturas (que pueden faltar) solo van en `srcset`
+@pytest.mark.django_db
+def test_src_is_always_the_original(media, author):
+    tw = Tweet.objects.create(user=author, content="foto", image=upload("a.png", (1600, 900)))
+    img = TweetImage.objects.create(tweet=tw, image=upload("b.png", (800, 600)))
+    author.userprofile.avatar = upload("yo.png", (300, 300))
+    author.userprofile.save()
+
+    data = renditions(tw, "image")
+    assert data["src"] == tw.image.url and data["srcset"][-1] == (1600, tw.image.url)
+    for obj, field in ((img, "image"), (author.userprofile, "avatar")):
+        data = renditions(obj, field)
+        [(width, thumb)] = data["srcset"]
+        assert data["src"] == getattr(obj, field).url != thumb and width == data["width"]
+
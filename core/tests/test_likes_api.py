@@ -0,0 +1,103 @@
+import pytest
+from django.urls import reverse
+
+from core.models import Like, Notification, Tweet
+
+
+@pytest.fixture
+def setup(client, django_user_model):
+    author = django_user_model.objects.create_user(username="autora")
+    fan = django_user_model.objects.create_user(username="fan")
+    tweets = [Tweet.objects.create(user=author, content=f"t{i}") for i in range(3)]
+    client.force_login(fan)
+    return author, fan, tweets
+
+
+# 1) PUT/DELETE son idempotentes: ni likes ni notificaciones duplicadas
+@pytest.mark.django_db
+def test_put_and_delete_are_idempotent(client, setup):
+    author, fan, tweets = setup
+    url = reverse("api_like", args=[tweets[0].pk])
+    for _ in range(2):
+        resp = client.put(url)
+        assert resp.json() == {"tweet": tweets[0].pk, "liked": True, "likes": 1}
+    assert Like.objects.filter(user=fan).count() == 1
+    assert Notification.objects.filter(recipient=author).count() == 1
+
+    for _ in range(2):
+        assert client.delete(url).json()["likes"] == 0
+    assert client.get(url).json() == {"tweet": tweets[0].pk, "liked": False, "likes": 0}
+    assert client.put(reverse("api_like", args=[999999])).status_code == 404
+
+
+# 1b) Los likes existentes se leen tras bloquear la fila del usuario: un PUT
+#     concurrente del mismo usuario espera y no vuelve a notificar
+@pytest.mark.django_db
+def test_put_reads_likes_after_locking_user(client, setup):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from core.likes import apply_like_ops
+
+    author, fan, tweets = setup
+    with CaptureQueriesContext(connection) as queries:
+        apply_like_ops(fan, [(tweets[0].pk, True)])
+    sql = [q["sql"] for q in queries.captured_queries if "SAVEPOINT" not in q["sql"]]
+    assert 'FROM "auth_user"' in sql[0]
+    assert any('FROM "core_like"' in q for q in sql[1:])
+
+    url = reverse("api_like", args=[tweets[0].pk])
+    for _ in range(3):
+        assert client.put(url).json()["likes"] == 1
+    assert Notification.objects.filter(recipient=author, tweet=tweets[0]).count() == 1
+
+
+# 2) Lote: gana la última operación por tweet, los inexistentes se informan
+@pytest.mark.django_db
+def test_batch_applies_final_state(client, setup):
+    _, fan, tweets = setup
+    Like.objects.create(user=fan, tweet=tweets[2])
+    ops = [
+        {"tweet": tweets[0].pk, "liked": True},
+        {"tweet": tweets[1].pk, "liked": True},
+        {"tweet": tweets[1].pk, "liked": False},
+        {"tweet": tweets[2].pk, "liked": False},
+        {"tweet": 999999, "liked": True},
+    ]
+    data = client.post(reverse("api_likes_batch"), {"ops": ops}, content_type="application/json").json()
+    assert data["missing"] == [999999]
+    assert [(r["tweet"], r["liked"], r["likes"]) for r in data["results"]] == [
+        (tweets[0].pk, True, 1), (tweets[1].pk, False, 0), (tweets[2].pk, False, 0),
+    ]
+    assert list(Like.objects.filter(user=fan).values_list("tweet_id", flat=True)) == [tweets[0].pk]
+    assert list(Tweet.objects.order_by("pk").values_list("like_total", flat=True)) == [1, 0, 0]
+
+
+# 3) Errores de cliente
+@pytest.mark.django_db
+def test_batch_rejects_bad_input(client, setup):
+    url = reverse("api_likes_batch")
+    assert client.post(url, "no es json", content_type="application/json").status_code == 400
+    bad = {"ops": [{"tweet": 1, "liked": "sí"}]}
+    assert client.post(url, bad, content_type="application/json").status_code == 400
+    assert client.get(url).status_code == 405
+    client.logout()
+    assert client.post(url, {"ops": []}, content_type="application/json").status_code == 401
+
+
+# 4) El botón clásico también mantiene el contador
+@pytest.mark.django_db
+def test_like_toggle_updates_counter(client, setup):
+    _, _, tweets = setup
+    client.post(reverse("like_toggle", args=[tweets[0].pk]))
+    tweets[0].refresh_from_db()
+    assert tweets[0].like_total == 1
+
+
+# 5) Con HTMX el botón devuelto ya lleva el contador nuevo
+@pytest.mark.django_db
+def test_like_toggle_htmx_renders_new_count(client, setup):
+    _, _, tweets = setup
+    url = reverse("like_toggle", args=[tweets[0].pk])
+    assert "♥ 1" in client.post(url, HTTP_HX_REQUEST="true").json()["html"]
+    assert "♥ 0" in client.post(url, HTTP_HX_REQUEST="true").json()["html"]
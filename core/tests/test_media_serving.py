@@ -0,0 +1,80 @@
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+PAYLOAD = bytes(range(256)) * 40  # 10 KiB
+
+
+@pytest.fixture
+def stored(settings):
+    # Reasignar vía `settings` emite setting_changed: default_storage olvida la ruta anterior.
+    settings.MEDIA_ROOT = settings.MEDIA_ROOT
+    return default_storage.save("tweets/clip.bin", ContentFile(PAYLOAD))
+
+
+# 1) Subidas con nombre por contenido: mismo contenido, mismo archivo
+def test_content_addressed_names(stored):
+    assert stored.startswith("tweets/clip.") and stored.endswith(".bin")
+    assert default_storage.save("tweets/clip.bin", ContentFile(PAYLOAD)) == stored
+    assert default_storage.save("tweets/clip.bin", ContentFile(b"otro")) != stored
+
+
+# 2) ETag fuerte, caché inmutable y revalidación
+def test_serves_with_immutable_cache(client, stored):
+    resp = client.get(f"/media/{stored}")
+    assert resp.status_code == 200 and b"".join(resp.streaming_content) == PAYLOAD
+    assert "immutable" in resp["Cache-Control"]
+    assert resp["ETag"].startswith('"') and not resp["ETag"].startswith("W/")
+    assert client.get(f"/media/{stored}", HTTP_IF_NONE_MATCH=resp["ETag"]).status_code == 304
+
+
+# 3) Range: 206 con el trozo pedido, sufijos, e If-Range / 416
+def test_range_requests(client, stored):
+    url = f"/media/{stored}"
+    part = client.get(url, HTTP_RANGE="bytes=100-199")
+    assert part.status_code == 206
+    assert part["Content-Range"] == f"bytes 100-199/{len(PAYLOAD)}"
+    assert b"".join(part.streaming_content) == PAYLOAD[100:200]
+
+    tail = client.get(url, HTTP_RANGE="bytes=-10")
+    assert b"".join(tail.streaming_content) == PAYLOAD[-10:]
+
+    assert client.get(url, HTTP_RANGE="bytes=99999-").status_code == 416
+    assert client.get(url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"otra"').status_code == 200
+
+
+# 4) Con MEDIA_SENDFILE la transferencia se delega al servidor web
+def test_sendfile_offload(client, stored, settings):
+    settings.MEDIA_SENDFILE = "x-accel-redirect"
+    resp = client.get(f"/media/{stored}")
+    assert resp["X-Accel-Redirect"] == f"/_media/{stored}"
+    assert resp.content == b""
+    assert client.get("/media/../settings.py").status_code == 404
+
+
+
+# 5) Las miniaturas no van por contenido: conservan el nombre que calcula easy_thumbnails
+@pytest.mark.django_db
+def test_thumbnail_storage_keeps_exact_names(settings, django_user_model):
+    import io
+
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from easy_thumbnails.files import get_thumbnailer
+    from PIL import Image
+
+    from core.media import ContentAddressedStorage
+    from core.models import Tweet
+
+    settings.MEDIA_ROOT = settings.MEDIA_ROOT
+    settings.THUMBNAILS_ON_UPLOAD = False
+    buf = io.BytesIO()
+    Image.new("RGB", (800, 600), (200, 30, 30)).save(buf, "PNG")
+    user = django_user_model.objects.create_user(username="miniaturas")
+    tweet = Tweet.objects.create(user=user, content="foto", image=SimpleUploadedFile("a.png", buf.getvalue()))
+
+    thumbnailer = get_thumbnailer(tweet.image)
+    assert not isinstance(thumbnailer.thumbnail_storage, ContentAddressedStorage)
+    options = {"size": (200, 0)}
+    name = thumbnailer.get_thumbnail_name(options)
+    assert thumbnailer.get_thumbnail(options).name == name
+    assert thumbnailer.thumbnail_storage.exists(name)
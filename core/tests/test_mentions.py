@@ -0,0 +1,57 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.mentions import parse, prepare
+from core.models import Comment, Mention, Notification, Tweet
+
+
+@pytest.fixture
+def people(client, django_user_model):
+    author, ana, bob = (django_user_model.objects.create_user(username=n) for n in ("autor", "ana", "bob.r"))
+    client.force_login(author)
+    return author, ana, bob
+
+
+# 1) Qué cuenta como mención
+def test_parse_mentions():
+    text = "hola @ana. y @bob.r, correo a@b.com @@x"
+    assert [name for _, _, name in parse(text)] == ["ana", "bob.r"]
+    start, end, _ = parse(text)[0]
+    assert text[start:end] == "@ana"
+
+
+# 2) Todos los nombres en una consulta; solo usuarios reales
+@pytest.mark.django_db
+def test_prepare_resolves_in_one_query(people):
+    tweets = [Tweet(content="@ana y @nadie"), Tweet(content="@bob.r @ana @ana")]
+    with CaptureQueriesContext(connection) as ctx:
+        mentioned = prepare(tweets)
+    assert len(ctx.captured_queries) == 1
+    assert tweets[0].mention_spans == [[0, 4]]
+    assert len(tweets[1].mention_spans) == 3
+    assert mentioned[id(tweets[1])] == [people[2].pk, people[1].pk]
+
+
+# 3) Publicar: filas Mention, notificaciones y enlaces solo a usuarios reales
+@pytest.mark.django_db
+def test_post_records_mentions_and_notifies(client, people):
+    author, ana, bob = people
+    client.post(reverse("timeline"), {
+        "content": "hola @ana, @fantasma y @autor <b>#Django</b>",
+        "form-TOTAL_FORMS": "0", "form-INITIAL_FORMS": "0",
+    })
+    tw = Tweet.objects.get()
+    assert set(Mention.objects.values_list("user__username", flat=True)) == {"ana", "autor"}
+    assert list(Notification.objects.values_list("recipient__username", "verb")) == [("ana", "te mencionó")]
+
+    html = client.get(reverse("tweet_detail", args=[tw.pk])).content.decode()
+    assert f'href="{reverse("profile", args=["ana"])}">@ana</a>' in html
+    assert "@fantasma" in html and reverse("profile", args=["fantasma"]) not in html
+    assert "&lt;b&gt;" in html and f'href="{reverse("tag", args=["Django"])}"' in html
+
+    client.post(tw.get_absolute_url(), {"content": "cc @bob.r"})
+    c = Comment.objects.get()
+    assert Mention.objects.get(comment=c).user == bob
+    assert Notification.objects.filter(recipient=bob, tweet=tw).exists()
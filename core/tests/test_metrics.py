@@ -0,0 +1,61 @@
+import pytest
+from django.urls import reverse
+
+from core import metrics
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(username="medidor")
+
+
+# 1) Las peticiones muestreadas llevan Server-Timing y alimentan /metrics
+@pytest.mark.django_db
+def test_sampled_request_exposes_server_timing_and_metrics(client, user, settings):
+    settings.PERF_SAMPLE_RATE = 1.0
+    client.force_login(user)
+    resp = client.get(reverse("timeline"))
+    timing = resp["Server-Timing"]
+    assert "total;dur=" in timing and "db;dur=" in timing and "tpl;dur=" in timing
+
+    settings.METRICS_TOKEN = "secreto"
+    body = client.get("/metrics", HTTP_AUTHORIZATION="Bearer secreto").content.decode()
+    assert 'twittor_request_seconds_bucket{view="timeline",le="+Inf"}' in body
+    assert 'twittor_db_queries_count{view="timeline"}' in body
+
+
+# 2) /metrics no es público: ni desde fuera ni desde el proxy local, sin token válido
+@pytest.mark.django_db
+def test_metrics_forbidden_from_outside(client, settings):
+    settings.METRICS_TOKEN = "secreto"
+    assert client.get("/metrics", REMOTE_ADDR="203.0.113.9").status_code == 403
+    assert client.get("/metrics", REMOTE_ADDR="127.0.0.1").status_code == 403
+    assert client.get("/metrics", HTTP_AUTHORIZATION="Bearer otro").status_code == 403
+    settings.METRICS_TOKEN = ""
+    assert client.get("/metrics", HTTP_AUTHORIZATION="Bearer ").status_code == 403
+    settings.METRICS_ALLOWED_NETWORKS = ("10.0.0.0/8",)
+    assert client.get("/metrics", REMOTE_ADDR="10.1.2.3").status_code == 200
+
+
+# 2b) Las rutas sin nombre se etiquetan con el módulo y el nombre de la vista
+def test_view_name_without_url_name(rf):
+    from django.urls import ResolverMatch
+
+    from core.middleware import PerformanceMiddleware
+    from core.views import timeline
+
+    request = rf.get("/")
+    request.resolver_match = ResolverMatch(timeline, (), {})
+    assert PerformanceMiddleware.view_name(request) == "core.views.timeline"
+
+
+# 3) El histograma se exporta acumulado
+def test_histogram_render_is_cumulative():
+    h = metrics.Histogram("t_seconds", "prueba", ("view",), buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 5):
+        h.observe(v, "x")
+    lines = h.render()
+    assert 't_seconds_bucket{view="x",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{view="x",le="1.0"} 2' in lines
+    assert 't_seconds_bucket{view="x",le="+Inf"} 3' in lines
+    assert 't_seconds_count{view="x"} 3' in lines
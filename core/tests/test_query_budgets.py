@@ -0,0 +1,113 @@
+import pytest
+from django.urls import URLPattern, reverse
+
+from core import urls as core_urls
+from core.models import Comment, Follow, Like, LinkPreview, Notification, Tweet
+
+
+# =============================== FIXTURES ========================================
+@pytest.fixture
+def viewer(django_user_model):
+    return django_user_model.objects.create_user(username="lector")
+
+
+@pytest.fixture
+def feed(viewer, django_user_model):
+    """Dataset pequeño pero con todo lo que pinta una tarjeta: citas, retuits, likes, comentarios, enlaces."""
+    preview = LinkPreview.objects.create(url="https://example.com/a", title="Ejemplo")
+    authors = [django_user_model.objects.create_user(username=f"autor{i}") for i in range(5)]
+    tweets = []
+    for i, author in enumerate(authors):
+        Follow.objects.create(follower=viewer, following=author)
+        for j in range(4):
+            tw = Tweet.objects.create(user=author, content=f"hola #Django {i}-{j} @lector", link_preview=preview)
+            tweets.append(tw)
+            Like.objects.create(user=viewer, tweet=tw)
+            Comment.objects.create(user=authors[(i + 1) % 5], tweet=tw, content="¡Bien!")
+            Notification.objects.create(actor=author, recipient=viewer, verb="le gustó tu publicación", tweet=tw)
+        Tweet.objects.create(user=author, content="", parent=tweets[0], is_retweet=True)
+        Tweet.objects.create(user=author, content="cito", parent=tweets[-1])
+    return {"authors": authors, "tweets": tweets}
+
+
+@pytest.fixture
+def enforce(settings):
+    settings.QUERY_BUDGET_MODE = "raise"
+
+
+def budget_urls(feed):
+    tw = feed["tweets"][0]
+    author = feed["authors"][0]
+    return {
+        "search": ("get", reverse("search") + "?q=hola"),
+        "tag": ("get", reverse("tag", args=["Django"])),
+        "notifications": ("get", reverse("notifications")),
+        "timeline": ("get", reverse("timeline")),
+        "explore": ("get", reverse("explore")),
+        "signup": ("get", reverse("signup")),
+        "tweet_detail": ("get", reverse("tweet_detail", args=[tw.pk])),
+        "tweet_replies": ("get", reverse("tweet_replies", args=[tw.pk])),
+        "like_toggle": ("post", reverse("like_toggle", args=[tw.pk])),
+        "retweet": ("post", reverse("retweet", args=[tw.pk])),
+        "quote": ("get", reverse("quote", args=[tw.pk])),
+        "profile": ("get", reverse("profile", args=[author.username])),
+        "trending_links": ("get", reverse("trending_links")),
+        "api_like": ("put", reverse("api_like", args=[tw.pk])),
+        "api_autocomplete": ("get", reverse("api_autocomplete") + "?q=%40aut"),
+        "api_timeline": ("get", reverse("api_timeline")),
+        "api_explore": ("get", reverse("api_explore")),
+        "api_profile": ("get", reverse("api_profile", args=[author.username])),
+        "api_tweet": ("get", reverse("api_tweet", args=[tw.pk])),
+        "api_likes_batch": ("post", reverse("api_likes_batch"), {
+            "data": {"ops": [{"tweet": t.pk, "liked": i % 2 == 0} for i, t in enumerate(feed["tweets"])]},
+            "content_type": "application/json",
+        }),
+    }
+
+
+# =============================== TESTS ===========================================
+
+# 1) Toda vista de core/urls.py declara su presupuesto
+def test_every_core_view_declares_a_budget():
+    for p in core_urls.urlpatterns:
+        assert isinstance(p, URLPattern)
+        assert getattr(p.callback, "query_budget", None), f"{p.name} sin @query_budget"
+
+
+# 2) Cada vista respeta su presupuesto con un dataset realista
+@pytest.mark.django_db
+@pytest.mark.parametrize("name", [p.name for p in core_urls.urlpatterns])
+def test_view_within_budget(client, viewer, feed, enforce, name):
+    method, url, *extra = budget_urls(feed)[name]
+    if name != "signup":
+        client.force_login(viewer)
+    resp = getattr(client, method)(url, **(extra[0] if extra else {}))
+    assert resp.status_code in (200, 302)
+
+
+# 3) El presupuesto no depende del tamaño del feed (sin N+1)
+@pytest.mark.django_db
+def test_timeline_queries_do_not_grow_with_feed(client, viewer, feed, query_budget, django_user_model):
+    client.force_login(viewer)
+    client.get(reverse("timeline"))
+    with query_budget(queries=8) as small:
+        client.get(reverse("timeline"))
+    for author in feed["authors"]:
+        for _ in range(10):
+            Tweet.objects.create(user=author, content="más", parent=feed["tweets"][1])
+    with query_budget(queries=small.count) as big:
+        client.get(reverse("timeline"))
+    assert big.count == small.count
+
+
+# 4) El informe agrupa por SQL normalizado y señala la plantilla
+@pytest.mark.django_db
+def test_budget_report_groups_normalized_sql(viewer, feed, query_budget):
+    from core.querybudget import QueryBudgetExceeded
+    with pytest.raises(QueryBudgetExceeded) as exc:
+        with query_budget(queries=1, label="n+1"):
+            for tw in Tweet.objects.all()[:5]:
+                tw.user.username
+    report = str(exc.value)
+    assert "5× " in report
+    assert "test_query_budgets.py" in report
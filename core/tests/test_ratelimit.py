@@ -0,0 +1,116 @@
+import pytest
+from django.urls import reverse
+
+from core import ratelimit
+from core.models import Tweet
+
+
+def test_bucket_allows_burst_then_refills():
+    backend = ratelimit.MemoryBackend()
+    assert [backend.hit("k", 3, 60, now=100.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert backend.hit("k", 3, 60, now=100.0) == pytest.approx(20.0)
+    assert backend.hit("k", 3, 60, now=119.0) == pytest.approx(1.0)
+    assert backend.hit("k", 3, 60, now=120.0) == 0.0
+
+
+def test_parse_limit():
+    assert ratelimit.parse_limit("60/m") == (60, 60.0)
+    assert ratelimit.parse_limit("5/10") == (5, 10.0)
+
+
+@pytest.fixture
+def tight(settings):
+    settings.RATE_LIMITS = {"like": {"user": "2/m", "ip": "100/m"}, "auth": {"ip": "1/m"}}
+
+
+@pytest.mark.django_db
+def test_likes_over_the_limit_get_429(client, tight, django_user_model):
+    user = django_user_model.objects.create_user(username="ana")
+    tweet = Tweet.objects.create(user=user, content="hola")
+    client.force_login(user)
+    url = reverse("like_toggle", args=[tweet.pk])
+    assert [client.post(url).status_code for _ in range(2)] == [302, 302]
+
+    blocked = client.post(url)
+    assert blocked.status_code == 429
+    assert 1 <= int(blocked["Retry-After"]) <= 30
+
+    api = client.put(reverse("api_like", args=[tweet.pk]))
+    assert api.status_code == 429
+    assert api.json()["retry_after"] >= 1
+
+    # Las lecturas no tienen cubo.
+    assert client.get(reverse("timeline")).status_code == 200
+
+
+@pytest.mark.django_db
+def test_limits_are_per_user(client, tight, django_user_model):
+    users = [django_user_model.objects.create_user(username=f"u{i}") for i in range(2)]
+    tweet = Tweet.objects.create(user=users[0], content="hola")
+    url = reverse("like_toggle", args=[tweet.pk])
+    for user in users:
+        client.force_login(user)
+        assert [client.post(url).status_code for _ in range(3)] == [302, 302, 429]
+
+
+@pytest.mark.django_db
+def test_anonymous_signup_is_limited_by_ip(client, tight):
+    data = {"username": "x", "password1": "a", "password2": "b"}
+    assert client.post(reverse("signup"), data, REMOTE_ADDR="203.0.113.7").status_code == 200
+    assert client.post(reverse("signup"), data, REMOTE_ADDR="203.0.113.7").status_code == 429
+    assert client.post(reverse("signup"), data, REMOTE_ADDR="203.0.113.8").status_code == 200
+
+
+@pytest.mark.django_db
+def test_shared_cache_backend(client, tight, settings, django_user_model):
+    settings.RATE_LIMIT_CACHE = "default"
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "rl"}}
+    user = django_user_model.objects.create_user(username="ana")
+    tweet = Tweet.objects.create(user=user, content="hola")
+    client.force_login(user)
+    url = reverse("like_toggle", args=[tweet.pk])
+    assert [client.post(url).status_code for _ in range(3)] == [302, 302, 429]
+
+
+def test_overload_returns_503_without_queueing(client, settings):
+    settings.MAX_CONCURRENT_REQUESTS = 1
+    assert ratelimit.admission.try_enter(1)  # otra petición ocupa el único hueco
+    try:
+        resp = client.get(reverse("signup"))
+    finally:
+        ratelimit.admission.leave()
+    assert resp.status_code == 503
+    assert resp["Retry-After"] == "1"
+    assert ratelimit.admission.in_flight == 0
+
+
+@pytest.mark.django_db
+def test_async_stack_is_limited_too(client, settings, django_user_model):
+    from asgiref.sync import async_to_sync
+    from django.test import AsyncClient
+
+    settings.RATE_LIMITS = {"search": {"user": "1/m"}}
+    settings.ROOT_URLCONF = "core.tests.urls_async"
+    client.force_login(django_user_model.objects.create_user(username="ana"))
+    aclient = AsyncClient()
+    aclient.cookies = client.cookies
+    codes = [async_to_sync(aclient.get)(reverse("search"), {"q": "hola"}).status_code for _ in range(2)]
+    assert codes == [200, 429]
+
+
+@pytest.mark.django_db
+def test_forged_forwarded_for_does_not_reset_the_ip_bucket(client, tight, settings):
+    settings.RATE_LIMIT_IP_HEADER = "HTTP_X_FORWARDED_FOR"
+    data = {"username": "x", "password1": "a", "password2": "b"}
+
+    def signup(forwarded):
+        return client.post(reverse("signup"), data, HTTP_X_FORWARDED_FOR=forwarded).status_code
+
+    # El cliente inventa la parte izquierda; nginx añade la IP real a la derecha.
+    assert signup("10.0.0.1, 203.0.113.7") == 200
+    assert signup("10.0.0.2, 203.0.113.7") == 429
+    assert signup("203.0.113.8") == 200
+
+    settings.RATE_LIMIT_TRUSTED_PROXIES = 2  # CDN + nginx
+    assert signup("1.1.1.1, 198.51.100.4, 172.16.0.1") == 200
+    assert signup("2.2.2.2, 198.51.100.4, 172.16.0.2") == 429
@@ -0,0 +1,97 @@
+import sqlite3
+
+import pytest
+from django.db import connections
+from django.test import RequestFactory
+from django.urls import reverse
+
+from core.db import ReplicaRouter, request_routing
+from core.middleware import ReplicaRoutingMiddleware
+from core.models import Tweet
+
+ALIAS = "replica_test"
+
+
+@pytest.fixture
+def replica(tmp_path, settings):
+    """Réplica real en un segundo archivo SQLite, atrasada a propósito.
+
+    `snapshot()` copia el estado actual de la principal (como una replicación
+    que va por detrás); lo que se escriba después solo está en "default".
+    """
+    path = tmp_path / "replica.sqlite3"
+    # Conexión creada a mano (no en DATABASES): Django la trata como dinámica y
+    # la permite dentro del test.
+    default = connections["default"]
+    connections[ALIAS] = type(default)({**default.settings_dict, "NAME": str(path)}, ALIAS)
+    settings.DATABASE_REPLICAS = [ALIAS]
+
+    def snapshot():
+        connections["default"].ensure_connection()
+        target = sqlite3.connect(path)
+        connections["default"].connection.backup(target)
+        target.close()
+
+    yield snapshot
+    connections[ALIAS].close()
+    del connections[ALIAS]
+
+
+# 1) Sin réplicas todo va a "default"; con réplicas, lecturas a la réplica salvo si se fija
+def test_router_reads_from_replica_unless_pinned(settings):
+    router = ReplicaRouter()
+    settings.DATABASE_REPLICAS = []
+    with request_routing():
+        assert router.db_for_read(Tweet) == "default"
+    settings.DATABASE_REPLICAS = ["replica1"]
+    with request_routing():
+        assert router.db_for_read(Tweet) == "replica1"
+    with request_routing(pinned=True):
+        assert router.db_for_read(Tweet) == "default"
+    with request_routing() as wrote:
+        assert router.db_for_write(Tweet) == "default"
+        assert wrote() and router.db_for_read(Tweet) == "default"
+    assert router.allow_migrate("replica1", "core") is False
+
+
+# 2) La cookie de read-your-writes fija las lecturas a la principal durante la ventana
+def test_middleware_pins_after_recent_write(settings):
+    settings.DATABASE_REPLICAS = ["replica1"]
+    seen = []
+
+    def view(request):
+        from django.http import HttpResponse
+        seen.append(ReplicaRouter().db_for_read(Tweet))
+        return HttpResponse()
+
+    mw = ReplicaRoutingMiddleware(view)
+    rf = RequestFactory()
+    resp = mw(rf.post("/"))
+    assert settings.READ_YOUR_WRITES_COOKIE in resp.cookies
+    mw(rf.get("/"))
+    fresh = rf.get("/")
+    fresh.COOKIES[settings.READ_YOUR_WRITES_COOKIE] = resp.cookies[settings.READ_YOUR_WRITES_COOKIE].value
+    mw(fresh)
+    assert seen == ["default", "replica1", "default"]
+
+
+# 3) Con dos archivos SQLite: el autor ve su tweet nuevo aunque la réplica vaya atrasada
+@pytest.mark.django_db(transaction=True)
+def test_author_sees_own_tweet_with_stale_replica(client, django_user_model, replica):
+    user = django_user_model.objects.create_user(username="autora")
+    Tweet.objects.create(user=user, content="tweet viejo")
+    client.force_login(user)
+    replica()
+
+    assert b"tweet viejo" in client.get(reverse("timeline")).content
+
+    resp = client.post(reverse("timeline"), {
+        "content": "tweet recien publicado",
+        "form-TOTAL_FORMS": "0", "form-INITIAL_FORMS": "0",
+    })
+    assert resp.status_code == 302
+    assert b"tweet recien publicado" in client.get(reverse("timeline")).content
+
+    # Sin la cookie las lecturas vuelven a la réplica, que aún no lo tiene.
+    del client.cookies["twittor_rw"]
+    assert b"tweet recien publicado" not in client.get(reverse("timeline")).content
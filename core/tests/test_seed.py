@@ -0,0 +1,35 @@
+import pytest
+from django.core.management import call_command
+from django.db.models import F
+
+from core.models import Follow, Like, Mention, Notification, Tweet, UserProfile
+
+
+# Comando seed con inserciones masivas: los conteos deben cuadrar sin get_or_create.
+@pytest.mark.django_db
+def test_seed_bulk_creates_consistent_data():
+    call_command("seed", users=12, tweets=40, fresh=True, avatars=False, batch_size=7, verbosity=0)
+
+    assert UserProfile.objects.count() >= 12
+    assert Tweet.objects.filter(parent__isnull=True).count() == 40
+    # Nadie se sigue a sí mismo ni se da like a su propia publicación.
+    assert not Follow.objects.filter(follower_id=F("following_id")).exists()
+    assert not Like.objects.filter(user_id=F("tweet__user_id")).exists()
+    # Cada like genera exactamente una notificación.
+    assert Notification.objects.filter(verb="le gustó tu publicación").count() == Like.objects.count()
+
+
+
+# Las menciones sembradas quedan como al publicar: spans para linkify, filas Mention y avisos.
+@pytest.mark.django_db
+def test_seed_records_mentions():
+    from core.mentions import VERB
+
+    call_command("seed", users=12, tweets=80, fresh=True, avatars=False, batch_size=7, verbosity=0)
+
+    with_mentions = Tweet.objects.filter(content__contains=" @", parent__isnull=True)
+    assert with_mentions.exists()
+    assert not with_mentions.filter(mention_spans=[]).exists()
+    spans = sum(len(t.mention_spans) for t in with_mentions)
+    assert Mention.objects.count() == spans
+    assert Notification.objects.filter(verb=VERB).count() == Mention.objects.exclude(user_id=F("tweet__user_id")).count()
@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+from django.db import connection
+
+from core.db import apply_sqlite_pragmas
+from core.models import Like, Tweet
+from core import metrics, writequeue
+from core.writequeue import WriteQueue
+
+
+# 1) Los PRAGMA del perfil se aplican a las conexiones nuevas (fuera de transacción,
+#    como al abrir una conexión real)
+@pytest.mark.django_db(transaction=True)
+def test_pragmas_applied_on_connection(settings):
+    settings.SQLITE_PRAGMAS = {"cache_size": -4096, "synchronous": "NORMAL"}
+    apply_sqlite_pragmas(sender=None, connection=connection)
+    with connection.cursor() as cursor:
+        assert cursor.execute("PRAGMA cache_size").fetchone()[0] == -4096
+        assert cursor.execute("PRAGMA synchronous").fetchone()[0] == 1
+
+
+# 2) La cola agrupa escrituras concurrentes y un fallo no arrastra al lote
+@pytest.mark.django_db(transaction=True)
+def test_write_queue_batches_and_isolates_failures(django_user_model):
+    user = django_user_model.objects.create_user(username="escritor")
+    tweets = [Tweet.objects.create(user=user, content=f"t{i}") for i in range(8)]
+    q = WriteQueue(max_delay=0.05)
+    try:
+        futures = []
+        barrier = threading.Barrier(len(tweets))
+
+        def submit(tw):
+            barrier.wait()
+            futures.append(q.submit(Like.objects.create, user=user, tweet=tw))
+
+        threads = [threading.Thread(target=submit, args=(tw,)) for tw in tweets]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        duplicate = q.submit(Like.objects.create, user=user, tweet=tweets[0])
+        for f in futures:
+            f.result(5)
+        with pytest.raises(Exception):
+            duplicate.result(5)
+    finally:
+        q.stop()
+    assert Like.objects.filter(user=user).count() == len(tweets)
+    assert q.operations == len(tweets) + 1
+    assert q.batches < q.operations
+
+
+# 3) Sin espera, un fallo no se pierde: queda en el log y en las métricas
+@pytest.mark.django_db(transaction=True)
+def test_fire_and_forget_failures_are_reported(settings, django_user_model, caplog):
+    settings.WRITE_QUEUE_ENABLED = True
+    user = django_user_model.objects.create_user(username="escritor")
+    tweet = Tweet.objects.create(user=user, content="t")
+    Like.objects.create(user=user, tweet=tweet)
+    q = writequeue.get_write_queue()
+    try:
+        before = metrics.WRITE_FAILURES._values.get(("create",), 0)
+        future = writequeue.run_write(Like.objects.create, user=user, tweet=tweet, wait=False)
+        with pytest.raises(Exception):
+            future.result(5)
+    finally:
+        q.stop()
+        writequeue._default = None
+    assert metrics.WRITE_FAILURES._values[("create",)] == before + 1
+    assert "Escritura sin espera fallida (create)" in caplog.text
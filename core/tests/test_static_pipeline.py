@@ -0,0 +1,76 @@
+import gzip
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+
+from core.staticfiles import serve_static
+
+MANIFEST_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "core.staticfiles.CompressedManifestStaticFilesStorage"},
+}
+
+
+@pytest.fixture
+def collected(tmp_path):
+    with override_settings(STATIC_ROOT=str(tmp_path / "static"), STORAGES=MANIFEST_STORAGES):
+        call_command("collectstatic", interactive=False, verbosity=0, stdout=StringIO())
+        manifest = json.loads((tmp_path / "static" / "staticfiles.json").read_text())
+        yield tmp_path / "static", manifest["paths"]
+
+
+# 1) collectstatic: nombres con hash y variantes .gz equivalentes
+def test_collectstatic_hashes_and_precompresses(collected):
+    root, paths = collected
+    hashed = paths["app.js"]
+    assert hashed != "app.js"
+    original = (root / hashed).read_bytes()
+    assert gzip.decompress((root / f"{hashed}.gz").read_bytes()) == original
+
+
+# 2) serve_static negocia la variante y marca inmutables los nombres con hash
+def test_serve_static_negotiates_encoding(collected, settings):
+    root, paths = collected
+    settings.STATIC_ROOT = str(root)
+    rf = RequestFactory()
+    hashed = paths["app.js"]
+
+    resp = serve_static(rf.get("/", HTTP_ACCEPT_ENCODING="gzip, deflate"), hashed)
+    assert resp["Content-Encoding"] == "gzip"
+    assert "immutable" in resp["Cache-Control"] and "Accept-Encoding" in resp["Vary"]
+
+    plain = serve_static(rf.get("/"), hashed)
+    assert not plain.has_header("Content-Encoding")
+    assert b"".join(plain.streaming_content) == (root / hashed).read_bytes()
+    assert "immutable" not in serve_static(rf.get("/"), "app.js")["Cache-Control"]
+
+
+# 3) El HTML se comprime si el cliente lo acepta
+@pytest.mark.django_db
+def test_html_is_gzipped(client, django_user_model):
+    client.force_login(django_user_model.objects.create_user(username="lectora"))
+    resp = client.get(reverse("explore"), HTTP_ACCEPT_ENCODING="gzip")
+    assert resp["Content-Encoding"] == "gzip"
+    assert b"<html" in gzip.decompress(resp.content)
+
+
+# 4) PREBUILT_CSS sin app.css en el manifiesto: se usa el CDN, no un 500
+@pytest.mark.django_db
+def test_prebuilt_css_falls_back_when_missing(client, collected, settings, django_user_model):
+    from core.context_processors import asset_available
+
+    root, paths = collected
+    assert "css/app.css" not in paths
+    settings.PREBUILT_CSS = True
+    client.force_login(django_user_model.objects.create_user(username="lectora"))
+    with override_settings(STATIC_ROOT=str(root), STORAGES=MANIFEST_STORAGES):
+        asset_available.cache_clear()
+        try:
+            resp = client.get(reverse("explore"))
+        finally:
+            asset_available.cache_clear()
+    assert resp.status_code == 200 and b"cdn.tailwindcss.com" in resp.content
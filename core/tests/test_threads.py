@@ -0,0 +1,81 @@
+import re
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Comment, Tweet
+from core.threads import PAGE_SIZE, comment_page, decode_cursor, load_thread
+
+
+@pytest.fixture
+def chain(django_user_model):
+    """raíz ← cita ← cita de cita (el tweet que se abre) ← dos citas y un retuit."""
+    users = [django_user_model.objects.create_user(username=f"hilo{i}") for i in range(3)]
+    root = Tweet.objects.create(user=users[0], content="raíz")
+    mid = Tweet.objects.create(user=users[1], content="cito la raíz", parent=root)
+    tweet = Tweet.objects.create(user=users[2], content="cito la cita", parent=mid)
+    q1 = Tweet.objects.create(user=users[0], content="cita 1", parent=tweet)
+    Tweet.objects.create(user=users[1], content="cita de cita 1", parent=q1)
+    Tweet.objects.create(user=users[1], content="", parent=tweet, is_retweet=True)
+    return {"users": users, "root": root, "mid": mid, "tweet": tweet}
+
+
+# 1) Antecesores y citas en una consulta (los retuits no cuentan como citas)
+@pytest.mark.django_db
+def test_load_thread_single_query(chain, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        thread = load_thread(chain["tweet"].pk)
+        assert [t.content for t in thread.ancestors] == ["raíz", "cito la raíz"]
+        assert [(t.content, d) for t, d in thread.descendants] == [("cita 1", 1), ("cita de cita 1", 2)]
+        assert thread.tweet.parent.user.username == "hilo1"
+
+
+# 2) Keyset: páginas sin huecos ni duplicados aunque coincidan las fechas
+@pytest.mark.django_db
+def test_comment_pages_cover_all_replies(chain):
+    now = timezone.now()
+    Comment.objects.bulk_create(
+        Comment(user=chain["users"][i % 3], tweet=chain["tweet"], content=f"r{i}", created_at=now)
+        for i in range(2 * PAGE_SIZE + 5)
+    )
+    seen, cursor = [], None
+    while True:
+        page, cursor = comment_page(chain["tweet"].pk, after=cursor)
+        seen += [c.content for c in page]
+        if cursor is None:
+            break
+    assert sorted(seen) == sorted(f"r{i}" for i in range(2 * PAGE_SIZE + 5))
+    assert len(set(seen)) == len(seen)
+
+
+# 3) La página no crece en consultas con las respuestas; el fragmento trae la siguiente
+@pytest.mark.django_db
+def test_detail_paginates_replies(client, chain, query_budget):
+    tweet = chain["tweet"]
+    client.force_login(chain["users"][0])
+    Comment.objects.create(user=chain["users"][1], tweet=tweet, content="primera")
+    with query_budget(queries=10) as small:
+        client.get(tweet.get_absolute_url())
+    for i in range(PAGE_SIZE * 2):
+        Comment.objects.create(user=chain["users"][i % 3], tweet=tweet, content=f"más {i}")
+    with query_budget(queries=small.count):
+        html = client.get(tweet.get_absolute_url()).content.decode()
+    assert html.count("whitespace-pre-wrap\">más") == PAGE_SIZE - 1
+    assert "Ver más respuestas" in html
+
+    cursor = re.search(r'replies/\?after=([\w.%-]+)', html).group(1)
+    fragment = client.get(reverse("tweet_replies", args=[tweet.pk]) + f"?after={cursor}").content.decode()
+    assert "más 19" in fragment and "primera" not in fragment
+
+
+# 4) Un cursor fuera de rango se ignora (empieza por el principio), no da 500
+@pytest.mark.django_db
+@pytest.mark.parametrize("cursor", ["99999999999999999999.1", "-99999999999999999999.1", "1.99999999999999999999", "1.0"])
+def test_out_of_range_cursor_is_ignored(client, chain, cursor):
+    assert decode_cursor(cursor) is None
+    tweet = chain["tweet"]
+    client.force_login(chain["users"][0])
+    assert client.get(tweet.get_absolute_url(), {"after": cursor}).status_code == 200
+    assert client.get(reverse("tweet_replies", args=[tweet.pk]), {"after": cursor}).status_code == 200
+    assert client.get(reverse("api_timeline"), {"after": cursor}).status_code == 400
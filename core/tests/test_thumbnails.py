@@ -0,0 +1,58 @@
+import io
+import json
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from PIL import Image
+
+from core.models import Tweet, TweetImage
+from core.thumbnails import iter_jobs
+
+
+def png(size=(640, 480)):
+    buf = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(buf, "PNG")
+    return ContentFile(buf.getvalue())
+
+
+@pytest.fixture
+def images(settings, tmp_path, django_user_model):
+    settings.MEDIA_ROOT = str(tmp_path / "media")
+    user = django_user_model.objects.create_user(username="fotos")
+    tweet = Tweet.objects.create(user=user, content="álbum")
+    return [
+        TweetImage.objects.create(
+            tweet=tweet, image=default_storage.save(f"tweets/multi/f{i}.png", png((640 + i, 480))),
+            cropping="0,0,480,480",
+        )
+        for i in range(3)
+    ]
+
+
+def run(checkpoint, **opts):
+    out = io.StringIO()
+    call_command("warm_thumbnails", workers=0, checkpoint=str(checkpoint), stdout=out, **opts)
+    return out.getvalue()
+
+
+# 1) Genera las miniaturas que pide `{% cropped_thumbnail %}` y guarda el progreso
+@pytest.mark.django_db
+def test_warms_cropped_thumbnails(images, tmp_path):
+    checkpoint = tmp_path / "warm.json"
+    assert "3 miniaturas generadas" in run(checkpoint)
+    assert json.loads(checkpoint.read_text()) == {"core.TweetImage.image": images[-1].pk}
+
+    # Reanudar: no queda nada pendiente
+    assert list(iter_jobs(after=json.loads(checkpoint.read_text()))) == []
+    assert "0 archivos" in run(checkpoint)
+
+
+# 2) Con --restart se recorre todo otra vez pero no se regenera lo existente
+@pytest.mark.django_db
+def test_restart_skips_existing(images, tmp_path):
+    checkpoint = tmp_path / "warm.json"
+    run(checkpoint)
+    out = run(checkpoint, restart=True)
+    assert "0 miniaturas generadas" in out and "3 ya existían" in out
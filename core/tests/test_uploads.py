@@ -0,0 +1,103 @@
+import io
+
+import pytest
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.urls import reverse
+from PIL import Image
+
+from core.models import Tweet, TweetImage
+from core.uploads import sniff
+
+
+def png(name, size=(64, 48)):
+    buf = io.BytesIO()
+    Image.new("RGB", size, (10, 200, 90)).save(buf, "PNG")
+    return SimpleUploadedFile(name, buf.getvalue(), content_type="image/png")
+
+
+@pytest.fixture
+def poster(client, settings, tmp_path, django_user_model):
+    settings.MEDIA_ROOT = str(tmp_path / "media")
+    client.force_login(django_user_model.objects.create_user(username="subidas"))
+
+    def post(images, content="con fotos"):
+        return client.post(reverse("timeline"), {"content": content, "images": images})
+    return post
+
+
+# 1) Firmas de imagen
+def test_sniff_magic_bytes():
+    assert sniff(b"\x89PNG\r\n\x1a\n....") == "png"
+    assert sniff(b"\xff\xd8\xff\xe0") == "jpeg"
+    assert sniff(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "webp"
+    assert sniff(b"<html>") is None
+
+
+# 2) Más de 4 imágenes, un archivo que no es imagen o demasiado grande: se rechaza todo
+@pytest.mark.django_db
+@pytest.mark.parametrize("case", ["too_many", "not_image", "too_big"])
+def test_rejects_while_streaming(poster, settings, case):
+    if case == "too_many":
+        images, message = [png(f"{i}.png") for i in range(5)], "Máximo 4 imágenes"
+    elif case == "not_image":
+        images, message = [png("a.png"), SimpleUploadedFile("b.png", b"MZ\x90\x00" * 64)], "no es una imagen"
+    else:
+        settings.MAX_UPLOAD_IMAGE_SIZE = 1024
+        images, message = [png("grande.png", (400, 400))], "supera"
+    resp = poster(images)
+    assert resp.status_code == 200
+    assert message in resp.content.decode()
+    assert Tweet.objects.count() == 0 and TweetImage.objects.count() == 0
+
+
+# 3) Los archivos se guardan antes de abrir la transacción
+@pytest.mark.django_db(transaction=True)
+def test_files_stored_outside_transaction(poster, monkeypatch):
+    original = FileSystemStorage._save
+    atomic = []
+
+    def spy(self, name, content):
+        atomic.append(connection.in_atomic_block)
+        return original(self, name, content)
+
+    monkeypatch.setattr(FileSystemStorage, "_save", spy)
+    resp = poster([png("a.png", (800, 600)), png("b.png")])
+    assert resp.status_code == 302
+    assert atomic and not any(atomic)  # originales y miniaturas
+
+    first = TweetImage.objects.order_by("pk").first()
+    assert (first.image_width, first.image_height) == (800, 600)
+    assert first.cropping == "100,0,700,600"
+
+
+# 4) Editar el perfil con un avatar rechazado: no se guarda y el motivo se muestra
+@pytest.mark.django_db
+@pytest.mark.parametrize("case", ["not_image", "too_big"])
+def test_rejected_avatar_is_reported(client, settings, tmp_path, django_user_model, case):
+    settings.MEDIA_ROOT = str(tmp_path / "media")
+    user = django_user_model.objects.create_user(username="perfil")
+    client.force_login(user)
+    if case == "not_image":
+        avatar, message = SimpleUploadedFile("yo.png", b"MZ\x90\x00" * 64), "no es una imagen"
+    else:
+        settings.MAX_UPLOAD_IMAGE_SIZE = 1024
+        avatar, message = png("yo.png", (400, 400)), "supera"
+    url = reverse("profile", args=["perfil"])
+    resp = client.post(url, {"action": "edit", "bio": "nueva bio", "avatar": avatar}, follow=True)
+    assert resp.redirect_chain[-1][0] == url
+    assert message in resp.content.decode()
+    user.userprofile.refresh_from_db()
+    assert not user.userprofile.avatar and user.userprofile.bio != "nueva bio"
+
+
+# 5) La extensión guardada es la del formato real, no la que manda el cliente
+@pytest.mark.django_db
+@pytest.mark.parametrize("name", ["payload.exe", "foto.txt", "sin_extension"])
+def test_stored_extension_follows_signature(poster, name):
+    resp = poster([png(name)])
+    assert resp.status_code == 302
+    stored = TweetImage.objects.get().image.name
+    assert stored.endswith(".png")
+    assert ".exe" not in stored and ".txt" not in stored
@@ -0,0 +1,46 @@
+import random
+from collections import Counter
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from core.models import Tweet
+from core.workload import RealisticWorkload
+
+
+def build(seed=7, n=400):
+    now = timezone.now()
+    return RealisticWorkload(random.Random(seed), list(range(1, n + 1)), now=now, days=7), now
+
+
+# 1) Misma semilla → mismo grafo y mismos instantes
+def test_realistic_workload_is_deterministic():
+    a, now = build()
+    b, _ = build()
+    b.now = now
+    assert [a.following(u) for u in a.user_ids] == [b.following(u) for u in b.user_ids]
+    assert a.post_times(50) == b.post_times(50)
+
+
+# 2) Seguidores con cola pesada: hay "celebridades"
+def test_follower_graph_is_skewed():
+    w, _ = build()
+    indegree = Counter(v for u in w.user_ids for v in w.following(u))
+    counts = sorted(indegree.values(), reverse=True)
+    median = counts[len(counts) // 2]
+    assert counts[0] > 10 * median
+
+
+# 3) El comando seed con --shape realistic reparte created_at en el pasado
+@pytest.mark.django_db
+def test_seed_realistic_spreads_timestamps():
+    call_command(
+        "seed", users=30, tweets=80, fresh=True, avatars=False,
+        shape="realistic", days=3, seed=1, verbosity=0,
+    )
+    base = Tweet.objects.filter(parent__isnull=True)
+    oldest = base.order_by("created_at").first().created_at
+    assert timezone.now() - oldest > timedelta(hours=12)
+    assert base.filter(link_preview__isnull=False).exists()
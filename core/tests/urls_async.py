@@ -0,0 +1,9 @@
+"""URLconf de los tests: el sitio entero con las vistas de lectura async (como con ASGI)."""
+from django.urls import include, path
+
+from core.urls import build_urlpatterns
+from twittor.urls import urlpatterns as site
+
+urlpatterns = [path('', include(build_urlpatterns(async_reads=True)))] + [
+    p for p in site if getattr(p, 'urlconf_name', None) != 'core.urls'
+]
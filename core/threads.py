@@ -0,0 +1,137 @@
+"""
+Hilos de conversación para `tweet_detail`.
+
+- `load_thread`: en una sola consulta, el tweet, sus antecesores (cadena de
+  `parent` hasta la raíz) y sus descendientes (citas y citas de citas; los
+  retuits no), con autor y perfil. Un CTE recursivo recorre `parent` en los dos
+  sentidos y el ORM carga las filas con `select_related`.
+- `comment_page`: respuestas paginadas por keyset sobre `(created_at, id)`, con
+  autores y avatares en la misma consulta. El cursor es opaco para la plantilla
+  y no se degrada con la profundidad (sin OFFSET).
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Comment, Tweet
+
+PAGE_SIZE = 20          # respuestas por página
+MAX_ANCESTORS = 50      # tope de la cadena hacia arriba (defensa ante ciclos)
+MAX_DEPTH = 3           # niveles de citas hacia abajo
+MAX_DESCENDANTS = 50    # citas que se muestran como mucho
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+MAX_ID = 2 ** 63 - 1  # INTEGER de SQLite
+
+THREAD_SQL = """
+WITH RECURSIVE
+  up(id, parent_id, depth) AS (
+    SELECT id, parent_id, 0 FROM {table} WHERE id = %s
+    UNION ALL
+    SELECT t.id, t.parent_id, up.depth + 1 FROM {table} t JOIN up ON t.id = up.parent_id
+    WHERE up.depth < %s
+  ),
+  down(id, depth, created_at) AS (
+    SELECT id, 1, created_at FROM {table} WHERE parent_id = %s AND NOT is_retweet
+    UNION ALL
+    SELECT t.id, down.depth + 1, t.created_at FROM {table} t JOIN down ON t.parent_id = down.id
+    WHERE NOT t.is_retweet AND down.depth < %s
+  )
+SELECT id FROM up
+UNION ALL
+SELECT id FROM (SELECT id FROM down ORDER BY created_at LIMIT %s) AS recent
+"""
+
+
+class Thread:
+    def __init__(self, tweet, ancestors, descendants):
+        self.tweet = tweet
+        self.ancestors = ancestors        # de la raíz al padre directo
+        self.descendants = descendants    # [(tweet, profundidad)] en orden de hilo
+
+
+def thread_ids(pk):
+    """Subconsulta con los ids del hilo de `pk` (él, antecesores y citas que se pintan)."""
+    sql = THREAD_SQL.format(table=Tweet._meta.db_table)
+    return RawSQL(sql, (pk, MAX_ANCESTORS, pk, MAX_DEPTH, MAX_DESCENDANTS))
+
+
+def load_thread(pk):
+    """`Thread` del tweet `pk`; None si no existe (p. ej. archivado)."""
+    rows = list(
+        Tweet.objects.filter(id__in=thread_ids(pk))
+        .select_related('user', 'user__userprofile')
+        .order_by('created_at', 'id')
+    )
+    by_id = {t.pk: t for t in rows}
+    tweet = by_id.get(pk)
+    if tweet is None:
+        return None
+
+    # `parent` de cada fila apunta a objetos ya cargados: la plantilla no consulta.
+    for t in rows:
+        if t.parent_id in by_id:
+            t.parent = by_id[t.parent_id]
+
+    ancestors, seen = [], {pk}
+    node = by_id.get(tweet.parent_id)
+    while node is not None and node.pk not in seen:
+        seen.add(node.pk)
+        ancestors.append(node)
+        node = by_id.get(node.parent_id)
+    ancestors.reverse()
+
+    children = {}
+    for t in rows:
+        if t.pk not in seen:
+            children.setdefault(t.parent_id, []).append(t)
+
+    descendants = []
+
+    def walk(parent_id, depth):
+        for child in children.get(parent_id, []):
+            descendants.append((child, depth))
+            walk(child.pk, depth + 1)
+
+    walk(pk, 1)
+    return Thread(tweet, ancestors, descendants)
+
+
+# ------------------------------------------------------------- respuestas
+
+def encode_key(created_at, pk):
+    return f'{(created_at - EPOCH) // timedelta(microseconds=1)}.{pk}'
+
+
+def encode_cursor(comment):
+    return encode_key(comment.created_at, comment.pk)
+
+
+def decode_cursor(cursor):
+    """(created_at, id) de un cursor; None si no es válido (se empieza por el principio)."""
+    try:
+        micros, pk = (int(part) for part in cursor.split('.'))
+        if not 0 < pk <= MAX_ID:
+            return None
+        return EPOCH + timedelta(microseconds=micros), pk
+    except (AttributeError, ValueError, OverflowError):  # OverflowError: fecha fuera de rango
+        return None
+
+
+def comment_page(tweet_id, after=None, limit=PAGE_SIZE):
+    """`(respuestas, cursor_siguiente)`: una consulta; cursor None en la última página."""
+    qs = (
+        Comment.objects.filter(tweet_id=tweet_id)
+        .select_related('user', 'user__userprofile')
+        .order_by('created_at', 'id')
+    )
+    key = decode_cursor(after) if after else None
+    if key:
+        created_at, pk = key
+        qs = qs.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+    page = list(qs[:limit + 1])
+    if len(page) > limit:
+        page = page[:limit]
+        return page, encode_cursor(page[-1])
+    return page, None
@@ -0,0 +1,111 @@
+"""
+Precalentado de miniaturas de easy_thumbnails (`manage.py warm_thumbnails`).
+
+Recorre los campos de imagen y calcula, para cada archivo, las mismas
+opciones que usarán las plantillas:
+
+- `TweetImage.image` con su recorte (`cropping`): las de `{% cropped_thumbnail %}`
+  (tamaño del ImageRatioField, `box`, crop/detail, sin upscale);
+- `Tweet.image` y `UserProfile.avatar`: los alias de `THUMBNAIL_ALIASES`.
+
+Los trabajos son tuplas serializables (`Job`) para repartirlos en un pool de
+procesos; cada uno genera solo lo que falta.
+"""
+from typing import NamedTuple
+
+from .models import Tweet, TweetImage, UserProfile
+
+# (modelo, campo de imagen, campo de recorte o None)
+TARGETS = [
+    (TweetImage, 'image', 'cropping'),
+    (Tweet, 'image', None),
+    (UserProfile, 'avatar', None),
+]
+
+
+class Job(NamedTuple):
+    target: str      # "core.TweetImage.image"
+    pk: int
+    name: str        # ruta en el storage
+    options: tuple   # tupla de dicts de opciones de thumbnail
+
+
+def target_label(model, field):
+    return f'{model._meta.app_label}.{model.__name__}.{field}'
+
+
+def cropped_options(model, ratio_field, box):
+    """Opciones que calcula `{% cropped_thumbnail instance 'ratio_field' %}` sin modificadores."""
+    ratio = model._meta.get_field(ratio_field)
+    return {
+        'size': (int(ratio.width), int(ratio.height)),
+        'box': box,
+        'crop': True,
+        'detail': True,
+        'upscale': False,
+    }
+
+
+def alias_options(label):
+    from easy_thumbnails.alias import aliases
+    return [dict(opts) for _, opts in sorted(aliases.all(label, include_global=False).items())]
+
+
+def _options(model, field, ratio_field, box):
+    options = alias_options(target_label(model, field))
+    if ratio_field:
+        options.insert(0, cropped_options(model, ratio_field, box))
+    return tuple(options)
+
+
+def iter_jobs(after=None, batch_size=1000):
+    """Produce los `Job` de todos los destinos en orden de pk (reanudable con `after`)."""
+    after = after or {}
+    for model, field, ratio_field in TARGETS:
+        label = target_label(model, field)
+        if ratio_field is None and not alias_options(label):
+            continue
+        columns = ['pk', field] + ([ratio_field] if ratio_field else [])
+        qs = model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True}).order_by('pk')
+        last = after.get(label)
+        if last is not None:
+            qs = qs.filter(pk__gt=last)
+        for row in qs.values_list(*columns).iterator(chunk_size=batch_size):
+            box = row[2] if ratio_field else None
+            yield Job(label, row[0], row[1], _options(model, field, ratio_field, box))
+
+
+def job_for(instance):
+    """`Job` de una instancia recién guardada (None si no tiene imagen o no hay nada que generar)."""
+    for model, field, ratio_field in TARGETS:
+        if isinstance(instance, model):
+            fieldfile = getattr(instance, field)
+            box = getattr(instance, ratio_field) if ratio_field else None
+            options = _options(model, field, ratio_field, box)
+            if fieldfile and options:
+                return Job(target_label(model, field), instance.pk, fieldfile.name, options)
+    return None
+
+
+def warm(job):
+    """Genera las miniaturas que falten de `job`. Devuelve (job, generadas, existentes, error)."""
+    from django.apps import apps
+    from easy_thumbnails.files import get_thumbnailer
+
+    app_label, model_name, field = job.target.split('.')
+    model = apps.get_model(app_label, model_name)
+    # Instancia sin guardar: da el FieldFile con el storage del campo, sin consultar la BD.
+    fieldfile = getattr(model(pk=job.pk, **{field: job.name}), field)
+    generated = existing = 0
+    try:
+        thumbnailer = get_thumbnailer(fieldfile)
+        for options in job.options:
+            if thumbnailer.get_existing_thumbnail(options) is not None:
+                existing += 1
+                continue
+            thumbnailer.get_thumbnail(options)
+            generated += 1
+    except Exception as exc:  # archivo ausente, imagen corrupta...: se informa y se sigue
+        return job, generated, existing, f'{type(exc).__name__}: {exc}'
+    return job, generated, existing, None
+
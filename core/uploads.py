@@ -0,0 +1,120 @@
+"""
+Subida de imágenes: validación mientras llega el cuerpo y guardado fuera de la transacción.
+
+`ImageUploadHandler` va primero en `FILE_UPLOAD_HANDLERS`. Ve cada archivo antes
+que los handlers de memoria / archivo temporal y corta la subida (`StopUpload`:
+el resto del cuerpo se descarta sin guardarlo) en cuanto:
+
+- llega un archivo más de `MAX_UPLOAD_IMAGES`,
+- un archivo pasa de `MAX_UPLOAD_IMAGE_SIZE` bytes (o el cuerpo entero no cabe),
+- los primeros bytes no son la firma de una imagen admitida.
+
+Los motivos quedan en `request.upload_errors`; las vistas rechazan el formulario
+entero con `upload_errors(request)`.
+
+`store_image` guarda el archivo en el storage y lee sus metadatos antes de abrir
+la transacción: dentro solo quedan los INSERT. La extensión del nombre guardado
+sale de la firma, no de la que puso el cliente.
+"""
+import os
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+
+from .imagemeta import fill
+
+# Firmas (magic bytes) de los formatos que aceptan los ImageField.
+SIGNATURES = (
+    (b'\xff\xd8\xff', 'jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+)
+
+# Extensión con la que se guarda cada formato.
+EXTENSIONS = {'jpeg': 'jpg', 'png': 'png', 'gif': 'gif', 'webp': 'webp'}
+
+
+def sniff(head):
+    """Formato de imagen según los primeros bytes; None si no es ninguno admitido."""
+    for magic, kind in SIGNATURES:
+        if head.startswith(magic):
+            return kind
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+def max_images():
+    return getattr(settings, 'MAX_UPLOAD_IMAGES', 4)
+
+
+def max_image_size():
+    return getattr(settings, 'MAX_UPLOAD_IMAGE_SIZE', 10 * 1024 * 1024)
+
+
+class ImageUploadHandler(FileUploadHandler):
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.files = 0
+        self.oversized_body = False
+
+    def _abort(self, message):
+        if self.request is not None:
+            self.request.upload_errors = [*getattr(self.request, 'upload_errors', []), message]
+        raise StopUpload(connection_reset=False)
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        # Margen de 64 KiB para campos de texto y cabeceras multipart.
+        limit = max_images() * max_image_size() + 64 * 1024
+        self.oversized_body = bool(content_length and content_length > limit)
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        super().new_file(field_name, file_name, *args, **kwargs)
+        if self.oversized_body:
+            self._abort('La subida es demasiado grande.')
+        self.files += 1
+        if self.files > max_images():
+            self._abort(f'Máximo {max_images()} imágenes por publicación.')
+
+    def receive_data_chunk(self, raw_data, start):
+        if start == 0 and sniff(raw_data[:16]) is None:
+            self._abort(f'«{self.file_name}» no es una imagen (JPEG, PNG, GIF o WebP).')
+        if start + len(raw_data) > max_image_size():
+            self._abort(f'«{self.file_name}» supera los {max_image_size() // (1024 * 1024)} MB.')
+        return raw_data  # los handlers siguientes construyen el archivo
+
+    def file_complete(self, file_size):
+        return None
+
+
+def upload_errors(request):
+    """Errores de `ImageUploadHandler` para esta petición (lee el cuerpo si hace falta)."""
+    request.FILES  # noqa: B018 — fuerza el parseo del multipart
+    return getattr(request, 'upload_errors', [])
+
+
+def stored_name(upload):
+    """Nombre del cliente con la extensión del formato real (el nombre tal cual si no se reconoce)."""
+    upload.seek(0)
+    kind = sniff(upload.read(16))
+    upload.seek(0)
+    if kind is None:
+        return upload.name
+    stem = os.path.splitext(os.path.basename(upload.name or ''))[0] or 'imagen'
+    return f'{stem}.{EXTENSIONS[kind]}'
+
+
+def store_image(instance, field, upload):
+    """
+    Guarda `upload` en el storage de `instance.<field>` y rellena sus metadatos,
+    para llamar antes de `transaction.atomic()`. Si la transacción falla el archivo
+    queda huérfano (el storage por contenido lo reutiliza si se vuelve a subir).
+    """
+    setattr(instance, field, upload)
+    fill(instance, field, upload)
+    model_field = instance._meta.get_field(field)
+    name = model_field.generate_filename(instance, stored_name(upload))
+    setattr(instance, field, model_field.storage.save(name, upload, max_length=model_field.max_length))
+    instance._image_uploaded = True  # core/signals.py genera sus miniaturas tras el commit
+    return instance
@@ -1,20 +1,37 @@
+from django.conf import settings
 from django.urls import path
-from . import views
-from .views import trending_links
+from . import api, async_views, views
 
 
-urlpatterns = [
-    path('search/', views.search, name='search'),
-    path('tag/<str:tag>/', views.tag, name='tag'),
-    path('n/', views.notifications, name='notifications'),
+def build_urlpatterns(async_reads=False):
+    # Con ASGI (twittor/asgi.py activa ASYNC_VIEWS) las lecturas usan core/async_views.py.
+    reads = async_views if async_reads else views
+    return [
+        path('search/', reads.search, name='search'),
+        path('tag/<str:tag>/', reads.tag, name='tag'),
+        path('n/', reads.notifications, name='notifications'),
 
-    path('', views.timeline, name='timeline'),
-    path('explore/', views.explore, name='explore'),
-    path('signup/', views.signup_view, name='signup'),
-    path('t/<int:pk>/', views.tweet_detail, name='tweet_detail'),
-    path('t/<int:pk>/like/', views.like_toggle, name='like_toggle'),
+        path('', reads.timeline, name='timeline'),
+        path('explore/', reads.explore, name='explore'),
+        path('signup/', views.signup_view, name='signup'),
+        path('t/<int:pk>/', views.tweet_detail, name='tweet_detail'),
+        path('t/<int:pk>/replies/', views.tweet_replies, name='tweet_replies'),
+        path('t/<int:pk>/like/', views.like_toggle, name='like_toggle'),
         path('t/<int:pk>/retweet/', views.retweet, name='retweet'),
         path('t/<int:pk>/quote/', views.quote, name='quote'),
-    path('u/<str:username>/', views.profile, name='profile'),
-    path("trending/", trending_links, name="trending_links"),
-]
+        path('u/<str:username>/', reads.profile, name='profile'),
+        path("trending/", reads.trending_links, name="trending_links"),
+
+        path('api/t/<int:pk>/like/', views.api_like, name='api_like'),
+        path('api/likes/', views.api_likes_batch, name='api_likes_batch'),
+        path('api/autocomplete/', views.api_autocomplete, name='api_autocomplete'),
+
+        # API de lectura (core/api.py)
+        path('api/v1/timeline/', api.timeline, name='api_timeline'),
+        path('api/v1/explore/', api.explore, name='api_explore'),
+        path('api/v1/u/<str:username>/', api.profile, name='api_profile'),
+        path('api/v1/t/<int:pk>/', api.tweet, name='api_tweet'),
+    ]
+
+
+urlpatterns = build_urlpatterns(async_reads=getattr(settings, 'ASYNC_VIEWS', False))
@@ -1,6 +1,5 @@
-import requests
-from bs4 import BeautifulSoup
 from django.utils import timezone
+from .metrics import timed
 from .models import LinkPreview
 
 DEFAULT_TIMEOUT = 3  # segundos, timeout seguro
@@ -18,12 +17,18 @@ def get_or_create_link_preview(url: str) -> LinkPreview:
     except LinkPreview.DoesNotExist:
         preview = None
 
+    # requests y bs4 cuestan ~100 ms de importación: solo los paga el proceso que
+    # descarga una vista previa, no cada worker ni cada comando al arrancar.
+    import requests
+    from bs4 import BeautifulSoup
+
     try:
-        resp = requests.get(
-            url,
-            timeout=DEFAULT_TIMEOUT,
-            headers={"User-Agent": "TwittorBot/1.0 (+educational)"}
-        )
+        with timed("http"):
+            resp = requests.get(
+                url,
+                timeout=DEFAULT_TIMEOUT,
+                headers={"User-Agent": "TwittorBot/1.0 (+educational)"}
+            )
         resp.raise_for_status()
     except Exception:
         if preview:
@@ -1,18 +1,25 @@
+import json
 from datetime import timedelta
 from urllib.parse import urlparse
 
 import re
 
+from django.contrib import messages
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import BooleanField, F, Q, Value
 from django.http import HttpResponseForbidden, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.template.loader import render_to_string
 from django.utils import timezone
+from image_cropping.utils import max_cropping
 
+from .autocomplete import MAX_RESULTS as AUTOCOMPLETE_MAX, suggest
+from .conditional import conditional, profile_state, timeline_state, tweet_detail_state
+from .explore import PAGE_SIZE as EXPLORE_PAGE_SIZE, after_rank as explore_after_rank
+from .feed import collapse_retweets
 from .forms import (
     CommentForm,
     ProfileForm,
@@ -21,6 +28,7 @@ from .forms import (
     TweetImageFormSet,
 )
 from .models import (
+    ArchivedTweet,
     Comment,
     Follow,
     Like,
@@ -28,11 +36,50 @@ from .models import (
     TweetImage,
     UserProfile,
 )
+from .likes import MAX_BATCH, apply_like_ops, refresh_like_totals
+from .mentions import prepare as prepare_mentions, record as record_mentions
+from .querybudget import query_budget
+from .threads import comment_page, decode_cursor, encode_key, load_thread
+from .uploads import store_image, upload_errors
 from .utils import get_or_create_link_preview
+from .writequeue import run_write
+
+
+def _feed(qs):
+    """Carga en bloque todo lo que pinta una tarjeta de tweet (sin N+1 en la plantilla)."""
+    return (
+        qs.select_related('user', 'user__userprofile', 'link_preview', 'parent', 'parent__user')
+        .prefetch_related('images')
+    )
+
+
+TIMELINE_PAGE_SIZE = 30
+
+
+def _timeline_rows(user_ids, after=None):
+    """Una página del timeline (y una fila más para saber si sigue), con cursor `(created_at, id)`."""
+    qs = Tweet.objects.filter(user_id__in=user_ids)
+    key = decode_cursor(after) if after else None
+    if key:
+        created_at, pk = key
+        qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    return _feed(qs).order_by('-created_at', '-id')[:TIMELINE_PAGE_SIZE + 1]
+
+
+def _timeline_page(rows):
+    """`{'tweets', 'next_cursor'}`: la página con los retuits agrupados, solo sobre esas filas."""
+    rows = list(rows)
+    page = rows[:TIMELINE_PAGE_SIZE]
+    more = len(rows) > TIMELINE_PAGE_SIZE
+    return {
+        'tweets': collapse_retweets(page),
+        'next_cursor': encode_key(page[-1].created_at, page[-1].pk) if more else None,
+    }
 
 
 # ========================= SIGNUP =========================
 
+@query_budget(queries=8, time_ms=100)
 def signup_view(request):
     if request.user.is_authenticated:
         return redirect('timeline')
@@ -49,17 +96,40 @@ def signup_view(request):
 
 # ========================= TIMELINE =========================
 
+URL_RE = re.compile(r'(https?://[^\s]+)')
+
+
+def _link_preview_for(content):
+    """Vista previa OpenGraph del primer enlace de `content` (None si no hay o falla)."""
+    m = URL_RE.search(content or '')
+    if not m:
+        return None
+    try:
+        return get_or_create_link_preview(m.group(1))
+    except Exception:
+        return None
+
+
+def _tweet_image(upload, cropping=''):
+    """`TweetImage` sin guardar con el archivo ya en el storage y su recorte inicial."""
+    img = store_image(TweetImage(), 'image', upload)
+    if not cropping and img.image_width:
+        ratio = TweetImage._meta.get_field('cropping')
+        # Lo mismo que ImageRatioField al guardar, sin volver a abrir el archivo.
+        cropping = ','.join(map(str, max_cropping(ratio.width, ratio.height, img.image_width, img.image_height)))
+    img.cropping = cropping or ''
+    return img
+
+
+@query_budget(queries=7, time_ms=250)
 @login_required
+@conditional(timeline_state)
 def timeline(request):
     # Usuarios a mostrar: yo + los que sigo
     following_ids = list(
         Follow.objects.filter(follower=request.user).values_list('following_id', flat=True)
     )
-    qs = (
-        Tweet.objects.filter(user_id__in=[request.user.id, *following_ids])
-        .select_related('user', 'user__userprofile', 'link_preview')
-        .prefetch_related('images')
-    )
+    qs = _timeline_rows([request.user.id, *following_ids], request.GET.get('after'))
 
     if request.method == 'POST':
         form = TweetForm(request.POST)
@@ -74,60 +144,66 @@ def timeline(request):
 
         # Nuevo input múltiple de la UI
         images = request.FILES.getlist('images')
+        # Límite de imágenes, tamaño y firma: ya validados mientras llegaba el cuerpo.
+        errors = upload_errors(request)
+        if errors:
+            for error in errors:
+                form.add_error(None, error)
+            return render(request, 'core/timeline.html', {
+                **_timeline_page(qs),
+                'form': form,
+                'formset': formset,
+            })
 
         # --- Caso 1: UI nueva (input name="images") ---
         if images:
             if not form.is_valid():
                 return render(request, 'core/timeline.html', {
-                    'tweets': qs,
+                    **_timeline_page(qs),
                     'form': form,
                     'formset': formset,
                 })
 
-            with transaction.atomic():
-                tw = form.save(commit=False)
-                tw.user = request.user
-
-                # OpenGraph / Link preview
-                m = re.search(r'(https?://[^\s]+)', tw.content or '')
-                if m:
-                    try:
-                        tw.link_preview = get_or_create_link_preview(m.group(1))
-                    except Exception:
-                        pass
+            tw = form.save(commit=False)
+            tw.user = request.user
+            # Red (vista previa) y archivos (storage, Pillow) van fuera de la transacción:
+            # no se retiene el bloqueo de escritura mientras tanto.
+            tw.link_preview = _link_preview_for(tw.content)
+            pending = [_tweet_image(f) for f in images]
+            mentioned = prepare_mentions([tw])[id(tw)]
 
+            with transaction.atomic():
                 tw.save()
-
-                # Guardar hasta 4 imágenes
-                for f in images[:4]:
-                    TweetImage.objects.create(tweet=tw, image=f)
+                for img in pending:
+                    img.tweet = tw
+                    img.save()
+                record_mentions(tw, mentioned)
 
             return redirect('timeline')
 
         # --- Caso 2: Camino formset (tests, fallback) ---
         if form.is_valid() and formset.is_valid():
-            with transaction.atomic():
-                tw = form.save(commit=False)
-                tw.user = request.user
-
-                m = re.search(r'(https?://[^\s]+)', tw.content or '')
-                if m:
-                    try:
-                        tw.link_preview = get_or_create_link_preview(m.group(1))
-                    except Exception:
-                        pass
+            tw = form.save(commit=False)
+            tw.user = request.user
+            tw.link_preview = _link_preview_for(tw.content)
+            pending = [
+                _tweet_image(cd['image'], cd.get('cropping'))
+                for cd in formset.cleaned_data if cd and cd.get('image')
+            ]
+            mentioned = prepare_mentions([tw])[id(tw)]
 
+            with transaction.atomic():
                 tw.save()
-
-                for cd in formset.cleaned_data:
-                    if cd and cd.get('image'):
-                        TweetImage.objects.create(tweet=tw, image=cd['image'])
+                for img in pending:
+                    img.tweet = tw
+                    img.save()
+                record_mentions(tw, mentioned)
 
             return redirect('timeline')
 
         # Si algo no es válido, se re-renderiza con errores
         return render(request, 'core/timeline.html', {
-            'tweets': qs,
+            **_timeline_page(qs),
             'form': form,
             'formset': formset,
         })
@@ -140,7 +216,7 @@ def timeline(request):
     )
 
     return render(request, 'core/timeline.html', {
-        'tweets': qs,
+        **_timeline_page(qs),
         'form': form,
         'formset': formset,
     })
@@ -148,16 +224,43 @@ def timeline(request):
 
 # ========================= EXPLORE =========================
 
+def _explore_ranked(after=0):
+    # Una fila de más para saber si hay otra página.
+    return (
+        _feed(Tweet.objects.filter(explore_rank__rank__gt=after))
+        .annotate(rank=F('explore_rank__rank'))
+        .order_by('explore_rank__rank')[:EXPLORE_PAGE_SIZE + 1]
+    )
+
+
+def _explore_page(rows):
+    """Contexto de una página de explore: la siguiente empieza tras la última posición leída."""
+    rows = list(rows)
+    page = rows[:EXPLORE_PAGE_SIZE]
+    more = len(rows) > EXPLORE_PAGE_SIZE
+    return {'tweets': page, 'next_cursor': f'r{page[-1].rank}' if more else None}
+
+
+def _explore_latest():
+    # Ranking aún sin calcular: lo más reciente.
+    return _feed(Tweet.objects.order_by('-created_at'))[:100]
+
+
+@query_budget(queries=5, time_ms=250)
 @login_required
 def explore(request):
-    qs = Tweet.objects.select_related('user', 'user__userprofile').all()[:100]
+    # Orden precalculado por `manage.py rank_explore` (core/explore.py): una lectura desde la última posición.
+    after = explore_after_rank(request.GET.get('after'))
+    page = _explore_page(_explore_ranked(after))
+    if not page['tweets'] and not after:
+        page = {'tweets': _explore_latest(), 'next_cursor': None}
     form = TweetForm()
     formset = TweetImageFormSet(
         queryset=TweetImage.objects.none(),
         prefix='form',
     )
     return render(request, 'core/timeline.html', {
-        'tweets': qs,
+        **page,
         'form': form,
         'formset': formset,
     })
@@ -165,29 +268,103 @@ def explore(request):
 
 # ========================= DETALLE / PERFIL =========================
 
+@query_budget(queries=7, time_ms=150)
 @login_required
+@conditional(tweet_detail_state)
 def tweet_detail(request, pk):
-    tw = get_object_or_404(Tweet.objects.select_related('user', 'user__userprofile'), pk=pk)
+    thread = load_thread(pk)
+    if thread is None:
+        # Tweet archivado (core/archive.py): se muestra en solo lectura.
+        archived = get_object_or_404(ArchivedTweet.objects.select_related('user', 'user__userprofile'), pk=pk)
+        parent = archived.parent
+        return render(request, 'core/tweet_detail.html', {
+            'tweet': archived,
+            'ancestors': [parent] if parent else [],
+            'comments': archived.comment_list(),
+            'archived': True,
+        })
+    tw = thread.tweet
     if request.method == 'POST':
         cform = CommentForm(request.POST)
         if cform.is_valid():
             c = cform.save(commit=False)
             c.user = request.user
             c.tweet = tw
-            c.save()
+            mentioned = prepare_mentions([c])[id(c)]
+            with transaction.atomic():
+                c.save()
+                record_mentions(c, mentioned)
             return redirect(tw.get_absolute_url())
     else:
         cform = CommentForm()
-    return render(request, 'core/tweet_detail.html', {'tweet': tw, 'cform': cform})
+    comments, next_cursor = comment_page(tw.pk, after=request.GET.get('after'))
+    return render(request, 'core/tweet_detail.html', {
+        'tweet': tw,
+        'ancestors': thread.ancestors,
+        'quotes': thread.descendants,
+        'comments': comments,
+        'next_cursor': next_cursor,
+        'cform': cform,
+    })
+
+
+@query_budget(queries=3, time_ms=100)
+@login_required
+def tweet_replies(request, pk):
+    """Fragmento "Ver más respuestas" (htmx): la siguiente página tras `?after=`."""
+    comments, next_cursor = comment_page(pk, after=request.GET.get('after'))
+    return render(request, 'components/replies.html', {
+        'tweet_id': pk,
+        'comments': comments,
+        'next_cursor': next_cursor,
+    })
+
+
+PROFILE_PAGE_SIZE = 30
+
 
+def _profile_keys(user, after=None):
+    """
+    Una página de `{id, created_at, archived}` del perfil: los tweets vivos y los
+    archivados se intercalan por fecha en SQL (UNION ALL + LIMIT), con cursor
+    `(created_at, id)` como las respuestas. El coste no crece con el historial.
+    """
+    live = Tweet.objects.filter(user=user)
+    archived = ArchivedTweet.objects.filter(user=user)
+    key = decode_cursor(after) if after else None
+    if key:
+        created_at, pk = key
+        older = Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        live, archived = live.filter(older), archived.filter(older)
+    return (
+        live.order_by().values('id', 'created_at').annotate(archived=Value(False, output_field=BooleanField()))
+        .union(
+            archived.order_by().values('id', 'created_at').annotate(archived=Value(True, output_field=BooleanField())),
+            all=True,
+        )
+        .order_by('-created_at', '-id')[:PROFILE_PAGE_SIZE + 1]
+    )
+
+
+def _profile_page(keys, live, archived):
+    """`(tweets, cursor_siguiente)` a partir de las claves y los tweets cargados por id."""
+    page = keys[:PROFILE_PAGE_SIZE]
+    tweets = [(archived if k['archived'] else live)[k['id']] for k in page]
+    more = len(keys) > PROFILE_PAGE_SIZE
+    return tweets, encode_key(page[-1]['created_at'], page[-1]['id']) if more else None
 
+
+def _profile_ids(keys, archived):
+    return [k['id'] for k in keys[:PROFILE_PAGE_SIZE] if k['archived'] is archived]
+
+
+@query_budget(queries=9, time_ms=150)
 @login_required
+@conditional(profile_state)
 def profile(request, username):
     user = get_object_or_404(User, username=username)
     profile = get_object_or_404(UserProfile, user=user)
     is_me = request.user == user
-    is_following = Follow.objects.filter(follower=request.user, following=user).exists()
-    tweets = Tweet.objects.filter(user=user)
     if request.method == 'POST':
         action = request.POST.get('action')
         if action == 'follow':
@@ -197,10 +374,23 @@ def profile(request, username):
             Follow.objects.filter(follower=request.user, following=user).delete()
         elif action == 'edit' and is_me:
             form = ProfileForm(request.POST, request.FILES, instance=profile)
-            if form.is_valid():
+            errors = upload_errors(request)
+            if not errors and form.is_valid():
                 form.save()
+            else:
+                # Tras el redirect ya no hay formulario que pinte los errores.
+                for message in errors or [e for field in form.errors.values() for e in field]:
+                    messages.error(request, message)
         return redirect('profile', username=username)
 
+    is_following = Follow.objects.filter(follower=request.user, following=user).exists()
+    keys = list(_profile_keys(user, request.GET.get('after')))
+    live_ids, archived_ids = _profile_ids(keys, False), _profile_ids(keys, True)
+    tweets, next_cursor = _profile_page(
+        keys,
+        Tweet.objects.select_related('user').in_bulk(live_ids) if live_ids else {},
+        ArchivedTweet.objects.select_related('user').in_bulk(archived_ids) if archived_ids else {},
+    )
     form = ProfileForm(instance=profile) if is_me else None
     ctx = {
         'profile_user': user,
@@ -208,6 +398,7 @@ def profile(request, username):
         'is_me': is_me,
         'is_following': is_following,
         'tweets': tweets,
+        'next_cursor': next_cursor,
         'form': form,
     }
     return render(request, 'core/profile.html', ctx)
@@ -222,31 +413,48 @@ def _create_notification(actor, recipient, verb, tweet=None):
     if actor == recipient:
         return
     from .models import Notification
-    Notification.objects.create(actor=actor, recipient=recipient, verb=verb, tweet=tweet)
+    # Dispara y olvida: con la cola de escrituras activa se agrupa con otras; si
+    # falla, `run_write` lo deja en el log y en las métricas.
+    run_write(
+        Notification.objects.create,
+        actor=actor, recipient=recipient, verb=verb, tweet=tweet,
+        wait=False,
+    )
+
+
+def _search_querysets(q):
+    tweets = Tweet.objects.filter(
+        Q(content__icontains=q) | Q(user__username__icontains=q)
+    ).select_related('user', 'user__userprofile')[:100]
+    users = User.objects.select_related('userprofile').filter(username__icontains=q)[:50]
+    return tweets, users
+
+
+def _tag_queryset(tag):
+    return Tweet.objects.filter(
+        content__iregex=rf'(^|\s)#({tag.lower()})\b'
+    ).select_related('user', 'user__userprofile')
 
 
+@query_budget(queries=5, time_ms=250)
 @login_required
 def search(request):
     q = request.GET.get('q', '').strip()
     tweets = Tweet.objects.none()
     users = User.objects.none()
     if q:
-        tweets = Tweet.objects.filter(
-            Q(content__icontains=q) | Q(user__username__icontains=q)
-        ).select_related('user')[:100]
-        users = User.objects.select_related('userprofile').filter(username__icontains=q)[:50]
+        tweets, users = _search_querysets(q)
     return render(request, 'core/search.html', {'q': q, 'tweets': tweets, 'users': users})
 
 
+@query_budget(queries=4, time_ms=250)
 @login_required
 def tag(request, tag):
-    tag_lower = tag.lower()
-    tweets = Tweet.objects.filter(
-        content__iregex=rf'(^|\s)#({tag_lower})\b'
-    ).select_related('user')
+    tweets = _tag_queryset(tag)
     return render(request, 'core/tag.html', {'tag': tag, 'tweets': tweets})
 
 
+@query_budget(queries=5, time_ms=100)
 @login_required
 def notifications(request):
     from .models import Notification
@@ -259,6 +467,7 @@ def notifications(request):
 
 # ========================= RETWEET / QUOTE =========================
 
+@query_budget(queries=7, time_ms=100)
 @login_required
 def retweet(request, pk):
     if request.method != 'POST':
@@ -271,6 +480,7 @@ def retweet(request, pk):
     return redirect(request.META.get('HTTP_REFERER', 'timeline'))
 
 
+@query_budget(queries=6, time_ms=100)
 @login_required
 def quote(request, pk):
     tw = get_object_or_404(Tweet.objects.select_related('user', 'user__userprofile'), pk=pk)
@@ -281,7 +491,10 @@ def quote(request, pk):
             quote_tw.user = request.user
             quote_tw.parent = tw
             quote_tw.is_retweet = False
-            quote_tw.save()
+            mentioned = prepare_mentions([quote_tw])[id(quote_tw)]
+            with transaction.atomic():
+                quote_tw.save()
+                record_mentions(quote_tw, mentioned)
             _create_notification(request.user, tw.user, 'citó tu publicación', tweet=tw)
             return redirect('timeline')
     else:
@@ -291,50 +504,134 @@ def quote(request, pk):
 
 # ========================= LIKE TOGGLE (HTMX READY) =========================
 
+def _toggle_like(user_id, tweet_id):
+    """Da o quita el like. Devuelve True si lo creó. Escritura corta (apta para la cola)."""
+    with transaction.atomic():
+        deleted, _ = Like.objects.filter(user_id=user_id, tweet_id=tweet_id).delete()
+        if not deleted:
+            Like.objects.bulk_create([Like(user_id=user_id, tweet_id=tweet_id)], ignore_conflicts=True)
+        refresh_like_totals([tweet_id])
+    return not deleted
+
+
+@query_budget(queries=10, time_ms=100)
 @login_required
 def like_toggle(request, pk):
     if request.method != 'POST':
         return HttpResponseForbidden('Solo POST')
-    tweet = get_object_or_404(Tweet, pk=pk)
-    like, created = Like.objects.get_or_create(user=request.user, tweet=tweet)
-    if not created:
-        like.delete()
-    else:
+    tweet = get_object_or_404(Tweet.objects.select_related('user'), pk=pk)
+    created = run_write(_toggle_like, request.user.id, tweet.id)
+    if created:
         _create_notification(request.user, tweet.user, 'le gustó tu publicación', tweet=tweet)
 
     if request.headers.get('Hx-Request'):
+        tweet.refresh_from_db(fields=['like_total'])  # el botón pinta el contador tras la escritura
         html = render_to_string('components/like_button.html', {'t': tweet, 'user': request.user})
         return JsonResponse({'html': html})
     return redirect(request.META.get('HTTP_REFERER', tweet.get_absolute_url()))
 
 
+# ========================= API DE LIKES (JSON) =========================
+# Estado final explícito (PUT = me gusta, DELETE = ya no): idempotente, sin
+# carreras de "alternar". Ver core/likes.py.
+
+def _json_error(message, status, **kwargs):
+    return JsonResponse({'error': message}, status=status, **kwargs)
+
+
+@query_budget(queries=8, time_ms=100)
+def api_like(request, pk):
+    if not request.user.is_authenticated:
+        return _json_error('Autenticación requerida', 401)
+    if request.method == 'GET':
+        tweet = get_object_or_404(Tweet, pk=pk)
+        liked = Like.objects.filter(user=request.user, tweet=tweet).exists()
+        return JsonResponse({'tweet': tweet.pk, 'liked': liked, 'likes': tweet.like_total})
+    if request.method not in ('PUT', 'DELETE'):
+        return _json_error('Método no permitido', 405, headers={'Allow': 'GET, PUT, DELETE'})
+
+    result = run_write(apply_like_ops, request.user, [(pk, request.method == 'PUT')])
+    if pk not in result:
+        return _json_error('No existe la publicación', 404)
+    return JsonResponse({'tweet': pk, **result[pk]})
+
+
+@query_budget(queries=10, time_ms=250)
+def api_likes_batch(request):
+    """
+    POST {"ops": [{"tweet": 12, "liked": true}, ...]} — acciones acumuladas por el
+    cliente (p. ej. sin conexión). Si un tweet se repite, gana la última operación.
+    """
+    if not request.user.is_authenticated:
+        return _json_error('Autenticación requerida', 401)
+    if request.method != 'POST':
+        return _json_error('Método no permitido', 405, headers={'Allow': 'POST'})
+    try:
+        ops = json.loads(request.body)['ops']
+        ops = [(int(op['tweet']), op['liked']) for op in ops]
+    except (ValueError, KeyError, TypeError):
+        return _json_error('Cuerpo inválido: se espera {"ops": [{"tweet": id, "liked": bool}]}', 400)
+    if len(ops) > MAX_BATCH:
+        return _json_error(f'Máximo {MAX_BATCH} operaciones por lote', 400)
+    if any(not isinstance(liked, bool) for _, liked in ops):
+        return _json_error('"liked" debe ser true o false', 400)
+
+    result = run_write(apply_like_ops, request.user, ops)
+    requested = {t for t, _ in ops}
+    return JsonResponse({
+        'results': [{'tweet': t, **state} for t, state in sorted(result.items())],
+        'missing': sorted(requested - result.keys()),
+    })
+
+
+# ========================= AUTOCOMPLETADO (JSON) =========================
+# Índice de prefijos en memoria (core/autocomplete.py): sin consultas salvo la
+# sesión y, la primera vez en cada proceso, la construcción del índice.
+
+@query_budget(queries=4, time_ms=250)
+def api_autocomplete(request):
+    if not request.user.is_authenticated:
+        return _json_error('Autenticación requerida', 401)
+    q = request.GET.get('q', '').strip()
+    try:
+        limit = min(max(int(request.GET.get('limit', 8)), 1), AUTOCOMPLETE_MAX)
+    except ValueError:
+        return _json_error('`limit` debe ser un número', 400)
+    results = suggest(q, limit) if q.lstrip('@#') else []
+    return JsonResponse({'q': q, 'results': results}, headers={'Cache-Control': 'private, max-age=30'})
+
+
 # ========================= TRENDING LINKS =========================
 
+@query_budget(queries=4, time_ms=150)
 @login_required
 def trending_links(request):
     """
     Muestra los dominios más compartidos en los últimos 24 h.
     """
-    since = timezone.now() - timedelta(hours=24)
+    return render(request, "core/trending.html", _trending_context(_recent_link_urls()))
 
-    recent = Tweet.objects.filter(
+
+def _recent_link_urls():
+    since = timezone.now() - timedelta(hours=24)
+    return Tweet.objects.filter(
         created_at__gte=since,
         link_preview__isnull=False
-    ).select_related('link_preview')
+    ).values_list('link_preview__url', flat=True)
+
 
+def _trending_context(urls):
     domains = {}
-    for tw in recent:
-        if tw.link_preview and tw.link_preview.url:
+    for url in urls:
+        if url:
             try:
-                domain = urlparse(tw.link_preview.url).netloc.replace("www.", "")
+                domain = urlparse(url).netloc.replace("www.", "")
                 domains[domain] = domains.get(domain, 0) + 1
             except Exception:
                 pass
 
     trending = sorted(domains.items(), key=lambda x: x[1], reverse=True)[:10]
-
-    ctx = {
+    return {
         "trending": trending,
         "total_links": sum(domains.values()),
     }
-    return render(request, "core/trending.html", ctx)
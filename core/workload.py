@@ -0,0 +1,205 @@
+"""
+Formas de carga sintética para el comando `seed`.
+
+`UniformWorkload` reproduce el comportamiento clásico (todos siguen a la
+misma cantidad de cuentas, likes y retuits repartidos al azar).
+`RealisticWorkload` genera la forma del tráfico real: seguidores con
+distribución de Zipf (unas pocas cuentas "celebridad"), publicaciones en
+ráfagas con ciclo diario, tweets virales que concentran likes/retuits y
+contenido con muchos enlaces.
+
+Todo se deriva de un `random.Random` sembrado: misma semilla, mismo
+dataset (los instantes son relativos a `now`).
+"""
+import math
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import accumulate
+
+from django.utils import timezone
+
+# Dominios con popularidad decreciente (el primero es el más compartido).
+LINK_DOMAINS = [
+    "github.com", "youtube.com", "docs.djangoproject.com", "medium.com",
+    "stackoverflow.com", "dev.to", "arxiv.org", "news.ycombinator.com",
+    "python.org", "tailwindcss.com", "prensa.com", "utp.ac.pa",
+]
+
+# Peso relativo de cada hora del día (madrugada tranquila, pico en la noche).
+HOURLY_ACTIVITY = [
+    1, 1, 1, 1, 1, 2, 3, 5, 7, 8, 8, 9,
+    10, 9, 8, 8, 9, 10, 12, 14, 15, 13, 8, 4,
+]
+
+
+def zipf_cum_weights(n, s):
+    """Pesos acumulados 1/rank^s para `n` elementos (aptos para `rng.choices`)."""
+    return list(accumulate(1.0 / (rank ** s) for rank in range(1, n + 1)))
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Desactiva `auto_now_add` en `created_at` para poder fijar fechas en bulk_create."""
+    fields = [m._meta.get_field("created_at") for m in models]
+    saved = [f.auto_now_add for f in fields]
+    for f in fields:
+        f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, value in zip(fields, saved):
+            f.auto_now_add = value
+
+
+class UniformWorkload:
+    """Distribución uniforme: la forma histórica de `seed`."""
+
+    name = "uniform"
+    timestamps = False
+
+    def __init__(self, rng, user_ids, like_factor=0.25, max_likes=200, max_follows=1000):
+        self.rng = rng
+        self.user_ids = user_ids
+        self.like_factor = like_factor
+        self.max_likes = max_likes
+        self.max_follows = max_follows
+
+    def following(self, uid):
+        """Ids a los que sigue `uid` (sin repetir, sin incluirse)."""
+        n = len(self.user_ids)
+        if n < 2:
+            return []
+        k = min(max(3, n // 5), n - 1, self.max_follows)
+        # k+1 para poder descartar a uno mismo sin quedarse corto.
+        return [v for v in self.rng.sample(self.user_ids, k=min(k + 1, n)) if v != uid][:k]
+
+    def author(self):
+        return self.rng.choice(self.user_ids)
+
+    def post_times(self, n):
+        return [None] * n
+
+    def link(self):
+        return None
+
+    def mark_tweets(self, n):
+        """Llamado tras crear las `n` publicaciones base."""
+        self.n_tweets = n
+
+    def base_index(self):
+        """Índice de la publicación base que recibe un retuit/cita."""
+        return self.rng.randrange(self.n_tweets)
+
+    def like_count(self, index):
+        return min(self.max_likes, max(0, int(len(self.user_ids) * self.like_factor * self.rng.random())))
+
+    def reaction_time(self, base_time):
+        return None
+
+
+class RealisticWorkload(UniformWorkload):
+    """Grafo de Zipf, ráfagas de publicación y tweets virales."""
+
+    name = "realistic"
+    timestamps = True
+
+    def __init__(self, rng, user_ids, like_factor=0.25, max_likes=200, max_follows=1000,
+                 zipf_s=1.1, mean_following=40, days=14, burst_ratio=0.35,
+                 viral_ratio=0.01, link_ratio=0.4, now=None):
+        super().__init__(rng, user_ids, like_factor, max_likes, max_follows)
+        self.zipf_s = zipf_s
+        self.mean_following = mean_following
+        self.days = days
+        self.burst_ratio = burst_ratio
+        self.viral_ratio = viral_ratio
+        self.link_ratio = link_ratio
+        self.now = now or timezone.now()
+
+        # Rango de popularidad (quién recibe seguidores) y de actividad (quién
+        # publica): dos permutaciones independientes de los mismos usuarios.
+        self.by_popularity = list(user_ids)
+        rng.shuffle(self.by_popularity)
+        self.by_activity = list(user_ids)
+        rng.shuffle(self.by_activity)
+        self.cum = zipf_cum_weights(len(user_ids), zipf_s)
+        self.domain_cum = zipf_cum_weights(len(LINK_DOMAINS), 1.0)
+        self.hour_cum = list(accumulate(HOURLY_ACTIVITY))
+        self.viral = set()
+
+    def following(self, uid):
+        n = len(self.user_ids)
+        if n < 2:
+            return []
+        # Grado de salida log-normal: la mayoría sigue a pocos, algunos a muchos.
+        k = int(self.rng.lognormvariate(math.log(self.mean_following), 0.9))
+        k = max(1, min(k, n - 1, self.max_follows))
+        picks = self.rng.choices(self.by_popularity, cum_weights=self.cum, k=k * 2)
+        out = []
+        seen = {uid}
+        for v in picks:
+            if v not in seen:
+                seen.add(v)
+                out.append(v)
+                if len(out) == k:
+                    break
+        return out
+
+    def author(self):
+        return self.rng.choices(self.by_activity, cum_weights=self.cum)[0]
+
+    def post_times(self, n):
+        """`n` instantes ascendentes en los últimos `days` días, con ciclo diario y ráfagas."""
+        rng = self.rng
+        span = self.days * 86400
+        bursts = [rng.uniform(0, span) for _ in range(max(1, self.days * 2))]
+        offsets = []
+        for _ in range(n):
+            if rng.random() < self.burst_ratio:
+                # Ráfaga: alrededor de un evento, desviación de ~20 minutos.
+                t = rng.gauss(rng.choice(bursts), 1200)
+            else:
+                day = rng.randrange(self.days)
+                hour = rng.choices(range(24), cum_weights=self.hour_cum)[0]
+                t = day * 86400 + hour * 3600 + rng.uniform(0, 3600)
+            offsets.append(min(max(t, 0), span))
+        offsets.sort()
+        start = self.now - timedelta(seconds=span)
+        return [start + timedelta(seconds=o) for o in offsets]
+
+    def link(self):
+        if self.rng.random() >= self.link_ratio:
+            return None
+        domain = self.rng.choices(LINK_DOMAINS, cum_weights=self.domain_cum)[0]
+        return f"https://{domain}/p/{self.rng.randrange(5000)}"
+
+    def mark_tweets(self, n):
+        super().mark_tweets(n)
+        k = int(n * self.viral_ratio) if n else 0
+        self.viral = set(self.rng.sample(range(n), k=max(k, 1 if n else 0)))
+        self.viral_list = sorted(self.viral)
+
+    def base_index(self):
+        # Más de la mitad de los retuits/citas caen sobre los virales.
+        if self.viral_list and self.rng.random() < 0.6:
+            return self.rng.choice(self.viral_list)
+        return self.rng.randrange(self.n_tweets)
+
+    def like_count(self, index):
+        n = len(self.user_ids)
+        if index in self.viral:
+            # Fan-in masivo, acotado para que el dataset siga siendo manejable.
+            return min(int(n * self.rng.uniform(0.05, 0.3)), self.max_likes * 50)
+        # Cola pesada (Pareto): casi todo recibe pocos likes.
+        k = int(self.rng.paretovariate(1.3)) - 1
+        return min(self.max_likes, max(0, k), n)
+
+    def reaction_time(self, base_time):
+        """Instante de un like/retuit/comentario: decae exponencialmente tras publicar."""
+        delay = timedelta(seconds=self.rng.expovariate(1 / 3600))
+        return min(base_time + delay, self.now)
+
+
+WORKLOADS = {
+    UniformWorkload.name: UniformWorkload,
+    RealisticWorkload.name: RealisticWorkload,
+}
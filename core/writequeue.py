@@ -0,0 +1,160 @@
+"""
+Cola de escrituras en proceso.
+
+SQLite admite un solo escritor a la vez: con varios hilos escribiendo
+transacciones cortas (likes, notificaciones) se pelean por el bloqueo y
+aparece "database is locked". La cola las serializa en un único hilo
+escritor y agrupa las que llegan juntas en una sola transacción (un solo
+fsync). Cada operación corre en su propio savepoint, así un fallo no
+arrastra a las demás del lote.
+
+Se activa con `WRITE_QUEUE_ENABLED` (perfil de producción). Sin cola,
+`run_write` ejecuta la función en línea: tests y desarrollo no cambian.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class WriteQueue:
+    def __init__(self, using="default", max_batch=64, max_delay=0.002):
+        self.using = using
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.operations = 0
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="twittor-write-queue", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=5):
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, fn, *args, **kwargs):
+        """Encola `fn(*args, **kwargs)` y devuelve un `Future` con su resultado."""
+        future = Future()
+        self.start()
+        self._queue.put((fn, args, kwargs, future))
+        return future
+
+    def _collect(self):
+        first = self._queue.get()
+        if first is _STOP:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        try:
+            while True:
+                batch = self._collect()
+                if batch is None:
+                    return
+                close_old_connections()
+                self._apply(batch)
+        finally:
+            connections[self.using].close()
+
+    def _apply(self, batch):
+        results = []
+        try:
+            with transaction.atomic(using=self.using):
+                for fn, args, kwargs, future in batch:
+                    try:
+                        with transaction.atomic(using=self.using):
+                            results.append((future, fn(*args, **kwargs), None))
+                    except Exception as exc:
+                        results.append((future, None, exc))
+        except Exception as exc:
+            # Falló el COMMIT del lote: ninguna operación quedó escrita.
+            logger.exception("Lote de escrituras descartado")
+            for _, _, _, future in batch:
+                future.set_exception(exc)
+            return
+        self.batches += 1
+        self.operations += len(batch)
+        # Los resultados se publican tras el COMMIT: quien espera ya puede leerlos.
+        for future, value, exc in results:
+            if exc is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(value)
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def get_write_queue():
+    """Cola compartida del proceso, o None si `WRITE_QUEUE_ENABLED` está desactivado."""
+    global _default
+    if not getattr(settings, "WRITE_QUEUE_ENABLED", False):
+        return None
+    with _default_lock:
+        if _default is None:
+            _default = WriteQueue(
+                max_batch=getattr(settings, "WRITE_QUEUE_MAX_BATCH", 64),
+                max_delay=getattr(settings, "WRITE_QUEUE_MAX_DELAY", 0.002),
+            )
+        return _default
+
+
+def _report_failure(op):
+    """Callback de los `Future` sin espera: nadie lee su excepción, así que se registra aquí."""
+    def done(future):
+        exc = future.exception()
+        if exc is not None:
+            metrics.WRITE_FAILURES.inc(op)
+            logger.error("Escritura sin espera fallida (%s)", op, exc_info=exc)
+    return done
+
+
+def run_write(fn, *args, wait=True, timeout=10, **kwargs):
+    """Ejecuta una escritura corta a través de la cola (o en línea si no hay cola).
+
+    Con `wait=False` la escritura es "dispara y olvida" (notificaciones): un fallo
+    no llega a la vista, se registra en el log y en `twittor_write_failures_total`.
+    Dentro de una transacción abierta se ejecuta siempre en línea: el hilo
+    escritor no vería los cambios aún sin confirmar.
+    """
+    q = get_write_queue()
+    if q is None or connections["default"].in_atomic_block:
+        return fn(*args, **kwargs)
+    future = q.submit(fn, *args, **kwargs)
+    if not wait:
+        future.add_done_callback(_report_failure(getattr(fn, "__name__", repr(fn))))
+        return future
+    return future.result(timeout)
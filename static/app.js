@@ -25,3 +25,82 @@
     btn.setAttribute('aria-expanded', String(open));
   });
 })();
+
+
+// Autocompletado de @usuarios y #hashtags en los textarea con data-autocomplete
+;(function(){
+  var TOKEN = /(^|[^\w@#])([@#][\w.-]*)$/;
+  var cache = {};
+
+  function attach(area){
+    var list = document.createElement('ul');
+    list.className = 'absolute z-20 mt-1 w-64 rounded-md border bg-white dark:bg-gray-800 shadow hidden';
+    list.setAttribute('role', 'listbox');
+    area.parentNode.style.position = 'relative';
+    area.parentNode.appendChild(list);
+    var items = [], active = 0, timer = null, token = null;
+
+    function close(){ list.classList.add('hidden'); items = []; token = null; }
+
+    function render(){
+      list.innerHTML = '';
+      items.forEach(function(item, i){
+        var li = document.createElement('li');
+        li.className = 'px-3 py-1 cursor-pointer' + (i === active ? ' bg-blue-100 dark:bg-gray-700' : '');
+        li.textContent = (item.type === 'user' ? '@' : '#') + item.value;
+        li.addEventListener('mousedown', function(e){ e.preventDefault(); pick(i); });
+        list.appendChild(li);
+      });
+      list.classList.toggle('hidden', !items.length);
+    }
+
+    function pick(i){
+      var item = items[i];
+      if (!item || !token) return;
+      var end = area.selectionStart, start = end - token.length;
+      var text = token[0] + item.value + ' ';
+      area.value = area.value.slice(0, start) + text + area.value.slice(end);
+      area.selectionStart = area.selectionEnd = start + text.length;
+      close();
+    }
+
+    function lookup(q){
+      if (cache[q]) { items = cache[q]; active = 0; render(); return; }
+      fetch(area.dataset.autocomplete + '?q=' + encodeURIComponent(q), {credentials: 'same-origin'})
+        .then(function(r){ return r.ok ? r.json() : {results: []}; })
+        .then(function(data){
+          cache[q] = data.results;
+          if (token === q) { items = data.results; active = 0; render(); }
+        });
+    }
+
+    area.addEventListener('input', function(){
+      var m = TOKEN.exec(area.value.slice(0, area.selectionStart));
+      clearTimeout(timer);
+      if (!m || m[2].length < 2) { close(); return; }
+      token = m[2];
+      timer = setTimeout(function(){ lookup(token); }, 120);
+    });
+    area.addEventListener('keydown', function(e){
+      if (!items.length) return;
+      if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+        active = (active + (e.key === 'ArrowDown' ? 1 : items.length - 1)) % items.length;
+        render(); e.preventDefault();
+      } else if (e.key === 'Enter' || e.key === 'Tab') {
+        pick(active); e.preventDefault();
+      } else if (e.key === 'Escape') {
+        close();
+      }
+    });
+    area.addEventListener('blur', close);
+  }
+
+  function scan(root){
+    root.querySelectorAll('textarea[data-autocomplete]:not([data-autocomplete-ready])').forEach(function(area){
+      area.setAttribute('data-autocomplete-ready', '');
+      attach(area);
+    });
+  }
+  scan(document);
+  document.addEventListener('htmx:load', function(e){ scan(e.target); });
+})();
@@ -0,0 +1,15 @@
+// Configuración de Tailwind para `python manage.py build_css` (CSS precompilado).
+// Debe coincidir con `tailwind.config` de templates/base.html (modo desarrollo con CDN).
+module.exports = {
+  content: ['./templates/**/*.html', './core/templatetags/**/*.py', './static/**/*.js'],
+  darkMode: 'class',
+  theme: {
+    extend: {
+      fontFamily: { sans: ['Inter', 'ui-sans-serif', 'system-ui', 'Segoe UI', 'Roboto'] },
+      boxShadow: { 'soft': '0 10px 30px rgba(2,6,23,.08)' },
+      colors: {
+        brand: { 50: '#eef2ff', 100: '#e0e7ff', 500: '#6366f1', 600: '#4f46e5', 700: '#4338ca' }
+      }
+    }
+  }
+}
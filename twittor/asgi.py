@@ -1,4 +1,6 @@
 import os
 from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'twittor.settings')
+# Con ASGI las vistas de lectura son async (core/async_views.py).
+os.environ.setdefault('TWITTOR_ASYNC_VIEWS', '1')
 application = get_asgi_application()
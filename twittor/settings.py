@@ -22,10 +22,15 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.AdmissionMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.PerformanceMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.CachedAuthenticationMiddleware',
+    'core.middleware.RateLimitMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -43,20 +48,107 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.assets',
             ],
         },
     },
 ]
 
 WSGI_APPLICATION = 'twittor.wsgi.application'
+# Control de admisión (core/ratelimit.py): límites por usuario/IP y clase de endpoint
+# (p. ej. RATE_LIMITS = {'post': {'user': '10/m'}}), caché compartida opcional para
+# los cubos y tope de peticiones en curso por proceso (0 = sin tope).
+RATE_LIMIT_ENABLED = os.environ.get('TWITTOR_RATE_LIMIT', '1') == '1'
+RATE_LIMITS = {}
+RATE_LIMIT_CACHE = os.environ.get('TWITTOR_RATE_LIMIT_CACHE') or None
+# Tras un proxy: cabecera con la IP real ('HTTP_X_REAL_IP' o 'HTTP_X_FORWARDED_FOR') y
+# número de proxies propios que añaden entradas a X-Forwarded-For.
+RATE_LIMIT_IP_HEADER = None
+RATE_LIMIT_TRUSTED_PROXIES = 1
+MAX_CONCURRENT_REQUESTS = int(os.environ.get('TWITTOR_MAX_CONCURRENT_REQUESTS', '0'))
+
+# Caché (sesiones, usuario de la petición). Por defecto local a cada proceso; con
+# TWITTOR_REDIS_URL se comparte entre workers y las invalidaciones llegan a todos.
+CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'twittor'}}
+if os.environ.get('TWITTOR_REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['TWITTOR_REDIS_URL'],
+    }
+
+# Sesiones en caché con escritura en la base de datos (core/sessions.py) y usuario +
+# perfil de la petición en caché (core/auth.py). Los plazos acotan lo que un worker
+# puede tardar en enterarse de un logout o de un cambio de contraseña hecho en otro.
+SESSION_ENGINE = 'core.sessions'
+SESSION_CACHE_SECONDS = 3600 if os.environ.get('TWITTOR_REDIS_URL') else 60
+AUTH_USER_CACHE_SECONDS = 300 if os.environ.get('TWITTOR_REDIS_URL') else 60
+
+# Vistas de lectura async (core/async_views.py); twittor/asgi.py lo activa por defecto.
+ASYNC_VIEWS = os.environ.get('TWITTOR_ASYNC_VIEWS', '0') == '1'
 
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.environ.get('TWITTOR_DB_NAME', BASE_DIR / 'db.sqlite3'),
     }
 }
 
+# Perfil de base de datos: "dev" (por defecto) o "production" (SQLite afinado para
+# varios workers). Ver core/db.py y core/writequeue.py.
+DB_PROFILE = os.environ.get('TWITTOR_DB_PROFILE', 'dev')
+SQLITE_PRAGMAS = {}
+WRITE_QUEUE_ENABLED = False
+
+if DB_PROFILE == 'production':
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': 600,           # conexiones persistentes entre peticiones
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'timeout': 20},    # espera del driver antes de "database is locked"
+    })
+    import django
+    if django.VERSION >= (5, 1):
+        # BEGIN IMMEDIATE: el bloqueo de escritura se toma al abrir la transacción,
+        # no al primer INSERT (esa promoción no respeta busy_timeout).
+        DATABASES['default']['OPTIONS']['transaction_mode'] = 'IMMEDIATE'
+    SQLITE_PRAGMAS = {
+        'busy_timeout': 20000,         # igual que 'timeout'; va primero para cubrir el cambio a WAL
+        'journal_mode': 'WAL',         # lectores no bloquean al escritor
+        'synchronous': 'NORMAL',       # fsync en checkpoints, seguro con WAL
+        'cache_size': -65536,          # 64 MiB de caché de páginas
+        'mmap_size': 268435456,        # 256 MiB mapeados en memoria
+        'temp_store': 'MEMORY',
+    }
+    WRITE_QUEUE_ENABLED = True
+
+# Archivo (core/archive.py, `manage.py archive`): antigüedad a partir de la cual se
+# archivan tweets/likes/notificaciones y días que se guardan las notificaciones leídas.
+ARCHIVE_AFTER_DAYS = 180
+NOTIFICATION_RETENTION_DAYS = 30
+
+# Ranking de explore (core/explore.py, `manage.py rank_explore`): tweets de las últimas
+# N horas, vida media de la puntuación y tweets por autor en el primer tramo.
+EXPLORE_WINDOW_HOURS = 72
+EXPLORE_HALF_LIFE_HOURS = 12
+EXPLORE_MAX_PER_AUTHOR = 3
+EXPLORE_SIZE = 500
+
+# Réplicas de solo lectura (core/db.py: ReplicaRouter). Lista de archivos separada por
+# comas; cada uno se registra como alias "replica1", "replica2", ... En tests apuntan a
+# la base de datos principal (MIRROR).
+DATABASE_REPLICAS = []
+for _i, _name in enumerate(filter(None, os.environ.get('TWITTOR_DB_REPLICAS', '').split(',')), 1):
+    DATABASES[f'replica{_i}'] = {
+        **DATABASES['default'],
+        'NAME': _name.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{_i}')
+DATABASE_ROUTERS = ['core.db.ReplicaRouter']
+# Tras una escritura, las lecturas de ese navegador van a la principal durante este
+# tiempo (cookie READ_YOUR_WRITES_COOKIE), para no ver datos atrasados de una réplica.
+READ_YOUR_WRITES_SECONDS = 10
+READ_YOUR_WRITES_COOKIE = 'twittor_rw'
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -73,9 +165,44 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Estáticos de producción (core/staticfiles.py): nombres con hash + .gz/.br en collectstatic.
+STORAGES = {
+    # Subidas con nombre por contenido (core/media.py): cacheables como inmutables.
+    'default': {'BACKEND': 'core.media.ContentAddressedStorage'},
+    # Las miniaturas necesitan el nombre exacto que calcula easy_thumbnails (ya lleva el hash
+    # del original): con el storage por contenido se renombrarían y nunca se encontrarían.
+    'easy_thumbnails': {'BACKEND': 'easy_thumbnails.storage.ThumbnailFileSystemStorage'},
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage' if DEBUG
+        else 'core.staticfiles.CompressedManifestStaticFilesStorage',
+    },
+}
+# CSS precompilado (`manage.py build_css`) en vez del CDN de Tailwind que compila en el navegador.
+# Opt-in: static/css/app.css no está en el repositorio (si falta, se sigue usando el CDN).
+PREBUILT_CSS = os.environ.get('TWITTOR_PREBUILT_CSS', '0') == '1'
+TAILWIND_CLI = os.environ.get('TWITTOR_TAILWIND_CLI', 'npx tailwindcss@3')
+# Sin DEBUG, Django sirve STATIC_ROOT si no hay un servidor web delante que lo haga.
+SERVE_STATIC = os.environ.get('TWITTOR_SERVE_STATIC', '1') == '1'
+
+# Media (core/media.py: serve_media). MEDIA_SENDFILE: None (FileResponse en streaming),
+# "x-accel-redirect" (nginx, location interna MEDIA_ACCEL_PREFIX) o "x-sendfile".
+SERVE_MEDIA = os.environ.get('TWITTOR_SERVE_MEDIA', '1') == '1'
+MEDIA_SENDFILE = os.environ.get('TWITTOR_MEDIA_SENDFILE') or None
+MEDIA_ACCEL_PREFIX = '/_media/'
+MEDIA_MAX_AGE = 3600  # nombres que no van por contenido (p. ej. miniaturas)
+
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Subidas (core/uploads.py): se validan mientras llegan y se cortan al pasarse.
+MAX_UPLOAD_IMAGES = 4
+MAX_UPLOAD_IMAGE_SIZE = 10 * 1024 * 1024
+FILE_UPLOAD_HANDLERS = [
+    'core.uploads.ImageUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_REDIRECT_URL = 'timeline'
@@ -85,3 +212,32 @@ from easy_thumbnails.conf import Settings as thumbnail_settings
 THUMBNAIL_PROCESSORS = (
     'image_cropping.thumbnail_processors.crop_corners',
 ) + thumbnail_settings.THUMBNAIL_PROCESSORS
+# Alias por campo: `{% lazy_img %}` los usa como src/srcset (core/imagemeta.py) y
+# `manage.py warm_thumbnails` los genera por adelantado.
+THUMBNAIL_ALIASES = {
+    'core.UserProfile.avatar': {'avatar': {'size': (96, 96), 'crop': True}},
+    'core.Tweet.image': {
+        'feed': {'size': (1200, 0), 'upscale': False},
+        'feed_small': {'size': (600, 0), 'upscale': False},
+    },
+}
+# Miniatura con la extensión del original: su nombre se puede calcular sin generarla
+# (si no, easy_thumbnails elige .png o .jpg según la transparencia del resultado).
+THUMBNAIL_PRESERVE_EXTENSIONS = True
+# Generar las miniaturas de una imagen al subirla (tras el commit).
+THUMBNAILS_ON_UPLOAD = True
+
+# Autocompletado de @usuarios y #hashtags (core/autocomplete.py): índices en memoria
+# que se reconstruyen cada N segundos; los hashtags puntúan por usos recientes.
+AUTOCOMPLETE_REFRESH_SECONDS = 300
+AUTOCOMPLETE_TAG_DAYS = 7
+
+# Presupuestos de consultas por vista (core/querybudget.py): "off", "warn" o "raise".
+QUERY_BUDGET_MODE = os.environ.get('TWITTOR_QUERY_BUDGET', 'warn' if DEBUG else 'off')
+
+# Instrumentación por petición (core/middleware.py): fracción de peticiones medidas.
+# /metrics: staff, `Authorization: Bearer $TWITTOR_METRICS_TOKEN` o las redes de
+# METRICS_ALLOWED_NETWORKS (vacío: detrás de nginx todo llega desde el loopback).
+PERF_SAMPLE_RATE = float(os.environ.get('TWITTOR_PERF_SAMPLE_RATE', '1.0' if DEBUG else '0.05'))
+METRICS_TOKEN = os.environ.get('TWITTOR_METRICS_TOKEN', '')
+METRICS_ALLOWED_NETWORKS = ()